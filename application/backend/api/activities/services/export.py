@@ -0,0 +1,95 @@
+"""Constant-memory export of ActivityEvent history.
+
+Rows are read in keyset-paginated batches on (published_at, id) rather than
+with a single ``.iterator()`` because the MySQL driver buffers a whole result
+set client-side; each batch is a bounded, index-ordered range scan.
+Output is produced incrementally either as NDJSON (one event per line) or as
+an ActivityStreams 2.0 OrderedCollection whose ``orderedItems`` array is
+streamed item by item.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from ...models import ActivityEvent
+from .retention import ARCHIVE_FIELDS
+
+AS2_CONTEXT = "https://www.w3.org/ns/activitystreams"
+EXPORT_FORMATS = ("ndjson", "as2")
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def event_row_to_dict(row: dict) -> dict:
+    """Shape a ``.values()`` row like ActivityEventSerializer output."""
+    out = dict(row)
+    out["id"] = str(out["id"])
+    out["published_at"] = _iso(out["published_at"])
+    return out
+
+
+def user_events_queryset(actor_id: str, since: Optional[datetime] = None, until: Optional[datetime] = None):
+    qs = ActivityEvent.objects.filter(actor_id=actor_id)
+    if since is not None:
+        qs = qs.filter(published_at__gte=since)
+    if until is not None:
+        qs = qs.filter(published_at__lte=until)
+    return qs
+
+
+def iter_event_rows(queryset, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """Yield rows oldest-first, holding at most ``chunk_size`` rows in memory."""
+    base = queryset.order_by("published_at", "id").values(*ARCHIVE_FIELDS)
+    last = None
+    while True:
+        batch = base
+        if last is not None:
+            batch = batch.filter(
+                Q(published_at__gt=last["published_at"])
+                | Q(published_at=last["published_at"], id__gt=last["id"])
+            )
+        rows = list(batch[:chunk_size])
+        if not rows:
+            return
+        for row in rows:
+            yield event_row_to_dict(row)
+        last = rows[-1]
+        if len(rows) < chunk_size:
+            return
+
+
+def _dumps(item: dict) -> str:
+    return json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def stream_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield _dumps(row) + "\n"
+
+
+def stream_as2_collection(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Stream an AS2 OrderedCollection. totalItems is emitted after the items,
+    which is valid JSON and avoids a separate COUNT(*) over the history.
+    """
+    yield '{"@context": "%s", "type": "OrderedCollection", "orderedItems": [' % AS2_CONTEXT
+    total = 0
+    for row in rows:
+        yield ("," if total else "") + _dumps(row)
+        total += 1
+    yield '], "totalItems": %d}\n' % total
+
+
+def stream_events(queryset, fmt: str = "ndjson", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    rows = iter_event_rows(queryset, chunk_size=chunk_size)
+    return stream_ndjson(rows) if fmt == "ndjson" else stream_as2_collection(rows)
@@ -0,0 +1,193 @@
+"""Retention and archival for ActivityEvent rows.
+
+ActivityEvent rows are bucketed into calendar-month partitions by
+``published_at``. Months that lie completely outside the hot window are
+streamed into gzip-compressed JSONL files and removed from the
+``activity_event`` table, so the table (and its indexes) only ever holds the
+hot window regardless of how much history accumulates.
+
+Every archived file is recorded in ``ActivityEventArchive`` so cold data can
+be located (and re-imported) later.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from ...models import ActivityEvent, ActivityEventArchive
+
+
+ARCHIVE_FIELDS = [
+    "id",
+    "as2_json",
+    "actor_id",
+    "type",
+    "object_type",
+    "object_id",
+    "community_id",
+    "published_at",
+    "visibility",
+    "summary",
+]
+
+
+@dataclass
+class ArchivedPartition:
+    partition: str
+    path: Optional[str]
+    row_count: int
+
+
+def get_archive_root() -> Path:
+    """
+    Directory archives are written to.
+    Defaults to a non-public folder: MEDIA_ROOT is served over HTTP, so it is
+    only used when explicitly configured via ACTIVITY_ARCHIVE_ROOT.
+    """
+    root = getattr(settings, "ACTIVITY_ARCHIVE_ROOT", None)
+    return Path(root) if root else Path(settings.BASE_DIR) / "archives" / "activity_events"
+
+
+def month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(dt: datetime) -> datetime:
+    return month_start(month_start(dt) + timedelta(days=32))
+
+
+def iter_cold_partitions(cutoff: datetime) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Yield [start, end) month ranges that end on or before ``cutoff`` and still
+    hold rows. Only whole months are archived, so a partition is immutable
+    once it has been written out.
+    """
+    oldest = (
+        ActivityEvent.objects.filter(published_at__lt=cutoff)
+        .order_by("published_at")
+        .values_list("published_at", flat=True)
+        .first()
+    )
+    if oldest is None:
+        return
+
+    start = month_start(oldest)
+    while True:
+        end = next_month(start)
+        if end > cutoff:
+            return
+        if ActivityEvent.objects.filter(published_at__gte=start, published_at__lt=end).exists():
+            yield start, end
+        start = end
+
+
+def _partition_label(start: datetime) -> str:
+    return start.strftime("%Y-%m")
+
+
+def _archive_path(root: Path, label: str) -> Path:
+    """First free file name for the partition (late rows get a numbered part)."""
+    base = root / f"activity_events_{label.replace('-', '_')}.jsonl.gz"
+    if not base.exists():
+        return base
+    part = 2
+    while True:
+        candidate = root / f"activity_events_{label.replace('-', '_')}.part{part}.jsonl.gz"
+        if not candidate.exists():
+            return candidate
+        part += 1
+
+
+def _write_partition(path: Path, start: datetime, end: datetime, batch_size: int) -> List:
+    """Stream the partition into ``path`` and return the pks that were written."""
+    rows = (
+        ActivityEvent.objects.filter(published_at__gte=start, published_at__lt=end)
+        .order_by("published_at", "id")
+        .values(*ARCHIVE_FIELDS)
+        .iterator(chunk_size=batch_size)
+    )
+    tmp_path = path.with_name(path.name + ".tmp")
+    written = []
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+        for row in rows:
+            fh.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+            fh.write("\n")
+            written.append(row["id"])
+    # Publish the file only once it is complete.
+    os.replace(tmp_path, path)
+    return written
+
+
+def _delete_archived_rows(ids: List, batch_size: int) -> int:
+    """
+    Delete exactly the rows that were written to the archive, in small batches
+    so each transaction holds its locks only briefly. Rows that land in the
+    month afterwards (e.g. backdated events) stay for the next run's part file.
+    """
+    deleted = 0
+    for i in range(0, len(ids), batch_size):
+        with transaction.atomic():
+            count, _ = ActivityEvent.objects.filter(pk__in=ids[i:i + batch_size]).delete()
+        deleted += count
+    return deleted
+
+
+def archive_activity_events(
+    older_than_days: Optional[int] = None,
+    archive_root: Optional[Path] = None,
+    batch_size: int = 5000,
+    dry_run: bool = False,
+    now: Optional[datetime] = None,
+) -> List[ArchivedPartition]:
+    """
+    Move every whole month older than ``older_than_days`` to cold storage.
+
+    Returns one ArchivedPartition per processed month. With ``dry_run`` the
+    rows are only counted.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, "ACTIVITY_EVENT_RETENTION_DAYS", 180)
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=older_than_days)
+    root = Path(archive_root) if archive_root else get_archive_root()
+
+    results: List[ArchivedPartition] = []
+    for start, end in iter_cold_partitions(cutoff):
+        label = _partition_label(start)
+        if dry_run:
+            count = ActivityEvent.objects.filter(published_at__gte=start, published_at__lt=end).count()
+            results.append(ArchivedPartition(partition=label, path=None, row_count=count))
+            continue
+
+        root.mkdir(parents=True, exist_ok=True)
+        path = _archive_path(root, label)
+        archived_ids = _write_partition(path, start, end, batch_size)
+        count = len(archived_ids)
+        ActivityEventArchive.objects.create(
+            partition=label,
+            path=str(path),
+            row_count=count,
+            range_start=start,
+            range_end=end,
+        )
+        _delete_archived_rows(archived_ids, batch_size)
+        results.append(ArchivedPartition(partition=label, path=str(path), row_count=count))
+    return results
+
+
+def read_archive(path) -> Iterator[dict]:
+    """Stream rows back out of an archive file."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
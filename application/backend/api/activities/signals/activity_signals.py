@@ -14,10 +14,17 @@ from django.apps import apps
 UserChallenge = apps.get_model('challenges', 'UserChallenge') if apps.is_installed('challenges') else None
 
 from ..utils.event_writer import EventWriter
+from ..utils.field_tracker import FieldTracker
 from ...models import Visibility
 
 User = get_user_model()
 
+# Only changes to these fields are worth an "Update" activity; saves that just
+# bump counters (likes, points, CO2 totals, last_login) are skipped.
+user_tracker = FieldTracker(User, ["username", "bio", "profile_image"])
+post_tracker = FieldTracker(Posts, ["text", "image"])
+comment_tracker = FieldTracker(Comments, ["content"])
+
 # ----------------------------
 # helpers
 # ----------------------------
@@ -59,6 +66,8 @@ def user_created(sender, instance: User, created: bool, **kwargs):
 def user_updated(sender, instance: User, created: bool, **kwargs):
     if created:
         return
+    if not user_tracker.pop_changes(instance, kwargs.get("update_fields")):
+        return
     transaction.on_commit(lambda: EventWriter.log_event(
         activity_type="Update",
         actor_id=uname(instance),
@@ -101,6 +110,8 @@ def post_created(sender, instance: Posts, created: bool, **kwargs):
 def post_updated(sender, instance: Posts, created: bool, **kwargs):
     if created:
         return
+    if not post_tracker.pop_changes(instance, kwargs.get("update_fields")):
+        return
     actor = getattr(instance, "creator", None)
     transaction.on_commit(lambda: EventWriter.log_event(
         activity_type="Update",
@@ -145,6 +156,8 @@ def comment_created(sender, instance: Comments, created: bool, **kwargs):
 def comment_updated(sender, instance: Comments, created: bool, **kwargs):
     if created:
         return
+    if not comment_tracker.pop_changes(instance, kwargs.get("update_fields")):
+        return
     actor = getattr(instance, "author", None)
     transaction.on_commit(lambda: EventWriter.log_event(
         activity_type="Update",
@@ -288,8 +301,8 @@ def report_deleted(sender, instance: Report, **kwargs):
 
 @receiver(post_save, sender=UserWastes, dispatch_uid="as2_user_waste_create")
 def user_waste_created(sender, instance: UserWastes, created: bool, **kwargs):
-    if not created:
-        return
+    if not created or instance.defer_side_effects:
+        return  # pipeline writes are logged in bulk by api.waste.pipeline
     if not should_publish_waste_and_achievements(instance.user):
         return
     transaction.on_commit(lambda: EventWriter.log_event(
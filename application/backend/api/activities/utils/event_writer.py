@@ -70,9 +70,10 @@ class EventWriter:
         return as2
 
     @staticmethod
-    def log_event(*, activity_type: str, actor_id: str, object_type: str, object_id: str,
-                  summary: str = "", community_id: str | None = None,
-                  visibility: str = Visibility.PUBLIC) -> ActivityEvent:
+    def build_event(*, activity_type: str, actor_id: str, object_type: str, object_id: str,
+                    summary: str = "", community_id: str | None = None,
+                    visibility: str = Visibility.PUBLIC) -> ActivityEvent:
+        """Unsaved ActivityEvent, for callers that insert many at once."""
         domain_type = EventWriter.domain_specific_type(activity_type, object_type)
         as2_json = EventWriter.build_as2(
             activity_type=domain_type,
@@ -82,7 +83,7 @@ class EventWriter:
             summary=summary,
             visibility=visibility,
         )
-        return ActivityEvent.objects.create(
+        return ActivityEvent(
             as2_json=as2_json,
             actor_id=actor_id,
             type=domain_type,
@@ -92,3 +93,27 @@ class EventWriter:
             visibility=visibility,
             summary=summary or "",
         )
+
+    @staticmethod
+    def log_event(*, activity_type: str, actor_id: str, object_type: str, object_id: str,
+                  summary: str = "", community_id: str | None = None,
+                  visibility: str = Visibility.PUBLIC) -> ActivityEvent:
+        event = EventWriter.build_event(
+            activity_type=activity_type,
+            actor_id=actor_id,
+            object_type=object_type,
+            object_id=object_id,
+            summary=summary,
+            community_id=community_id,
+            visibility=visibility,
+        )
+        event.save(force_insert=True)
+        return event
+
+    @staticmethod
+    def log_events(events: list[dict], batch_size: int = 1000) -> list[ActivityEvent]:
+        """Insert many events (each a log_event kwargs dict) with bulk_create."""
+        return ActivityEvent.objects.bulk_create(
+            [EventWriter.build_event(**kwargs) for kwargs in events],
+            batch_size=batch_size,
+        )
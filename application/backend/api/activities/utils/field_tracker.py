@@ -0,0 +1,89 @@
+# api/activities/utils/field_tracker.py
+from collections import defaultdict
+
+from django.db.models.signals import post_init
+
+_MISSING = object()
+
+
+class FieldTracker:
+    """
+    Remembers the values of a model's user-visible fields as loaded from the DB
+    so post_save receivers can tell a real edit apart from a counter-only save
+    (e.g. like/dislike counters on Posts, point totals on Users).
+
+    refresh_from_db() copies values onto the instance without post_init, so
+    tracked models call FieldTracker.reset_all() after it (see
+    Users.refresh_from_db); otherwise the stale snapshot would turn the
+    refreshed values into a phantom edit on the next save.
+    """
+
+    _trackers = defaultdict(list)
+
+    def __init__(self, model, fields, name="activity"):
+        # `name` keeps several trackers on one model from sharing a snapshot.
+        self.model = model
+        self.fields = tuple(fields)
+        self.snapshot_attr = f"_{name}_tracked_snapshot"
+        FieldTracker._trackers[model].append(self)
+        post_init.connect(
+            self._on_init,
+            sender=model,
+            weak=False,
+            dispatch_uid=f"{name}_tracker_{model._meta.label_lower}",
+        )
+
+    def _read(self, instance):
+        # Only read values already loaded; touching a deferred field would
+        # issue an extra query per instance.
+        return {f: instance.__dict__.get(f, _MISSING) for f in self.fields}
+
+    def _on_init(self, sender, instance, **kwargs):
+        setattr(instance, self.snapshot_attr, self._read(instance))
+
+    def previous(self, instance, field, default=None):
+        """Value of `field` at the last snapshot (load or save), or `default` if unknown."""
+        value = getattr(instance, self.snapshot_attr, {}).get(field, _MISSING)
+        return default if value is _MISSING else value
+
+    def changed_fields(self, instance, update_fields=None):
+        """Tracked fields whose value differs from the last snapshot."""
+        candidates = self.fields
+        if update_fields is not None:
+            candidates = [f for f in self.fields if f in update_fields]
+        snapshot = getattr(instance, self.snapshot_attr, {})
+        current = self._read(instance)
+        changed = []
+        for f in candidates:
+            old = snapshot.get(f, _MISSING)
+            # A field that was deferred at load time has no known old value.
+            if old is _MISSING or old != current[f]:
+                if current[f] is not _MISSING:
+                    changed.append(f)
+        return changed
+
+    def pop_changes(self, instance, update_fields=None):
+        """Return the changed fields and make the current values the new baseline."""
+        changed = self.changed_fields(instance, update_fields)
+        snapshot = getattr(instance, self.snapshot_attr, {})
+        current = self._read(instance)
+        # Fields left out of update_fields were not written, so keep their old baseline.
+        for f in self.fields if update_fields is None else [f for f in self.fields if f in update_fields]:
+            snapshot[f] = current[f]
+        setattr(instance, self.snapshot_attr, snapshot)
+        return changed
+
+    def reset(self, instance, fields=None):
+        """Make the current values of `fields` (default: all tracked) the new baseline."""
+        snapshot = getattr(instance, self.snapshot_attr, {})
+        current = self._read(instance)
+        for f in self.fields:
+            if fields is None or f in fields:
+                snapshot[f] = current[f]
+        setattr(instance, self.snapshot_attr, snapshot)
+
+    @classmethod
+    def reset_all(cls, instance, fields=None):
+        """reset() every tracker registered for the instance's model."""
+        for tracker in cls._trackers.get(type(instance), ()):
+            tracker.reset(instance, fields)
@@ -19,6 +19,8 @@ class ActivityEventViewSet(viewsets.ModelViewSet):
                    published_at__gte, published_at__lte
       - Search: summary
       - Ordering: published_at (default newest first), actor_id, type
+      - Listings are limited to the hot window (ACTIVITY_EVENT_RETENTION_DAYS)
+        unless published_at__gte is given
     """
     queryset = ActivityEvent.objects.all().order_by("-published_at")
     serializer_class = ActivityEventSerializer
@@ -39,6 +41,14 @@ class ActivityEventViewSet(viewsets.ModelViewSet):
     ordering_fields = ["published_at", "actor_id", "type"]
     ordering = ["-published_at"]
 
+    def get_queryset(self):
+        qs = super().get_queryset()
+        # Listings only touch the hot window unless the client asks for an explicit lower bound;
+        # older months live in the archive (see archive_activity_events).
+        if self.action in ("list", "recent") and "published_at__gte" not in self.request.query_params:
+            qs = qs.hot()
+        return qs
+
     @decorators.action(methods=["get"], detail=False, url_path="recent")
     @extend_schema(
         summary="Recent activity events (AS2)",
@@ -64,7 +64,8 @@ class FollowingActivityEventsView(APIView):
         )
 
         qs = (
-            ActivityEvent.objects.filter(actor_id__in=following_usernames)
+            ActivityEvent.objects.hot()
+            .filter(actor_id__in=following_usernames)
             .exclude(visibility="direct")
             .order_by("-published_at")
         )
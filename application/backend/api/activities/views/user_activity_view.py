@@ -3,10 +3,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status,permissions
-from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter, OpenApiResponse
 
 from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
 from ...models import ActivityEvent
+from ..services.export import EXPORT_FORMATS, stream_events, user_events_queryset
 from ..serializers.activity_serializer import ActivityEventSerializer
 from ..serializers.user_activity_serializers import (
     UserActivityEventsRequestSerializer,
@@ -87,7 +90,7 @@ class UserActivityEventsView(APIView):
                 )
 
         # Fetch ActivityEvents belonging to this user
-        events = ActivityEvent.objects.filter(actor_id=user.username).order_by("-published_at")
+        events = ActivityEvent.objects.hot().filter(actor_id=user.username).order_by("-published_at")
 
         serializer = ActivityEventSerializer(events, many=True)
         data = {
@@ -97,3 +100,81 @@ class UserActivityEventsView(APIView):
             "items": serializer.data,
         }
         return Response(data, status=status.HTTP_200_OK)
+
+
+class UserActivityEventsExportView(APIView):
+    """
+    GET endpoint that streams a user's complete ActivityEvent history.
+    - Users may export their own history; admins may export anyone's
+    - Output is NDJSON (default) or a streamed AS2 OrderedCollection
+    - Memory use is constant regardless of history length
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Export a user's activity history (streaming)",
+        description=(
+            "Streams every ActivityEvent of the user, oldest first, without loading the history into memory.\n\n"
+            "`output=ndjson` (default) returns one JSON event per line; `output=as2` returns an "
+            "ActivityStreams 2.0 OrderedCollection with `totalItems` after `orderedItems`. "
+            "Unlike the listing endpoints this includes events outside the hot window that have not been archived yet."
+        ),
+        parameters=[
+            OpenApiParameter(name="username", type=str, location=OpenApiParameter.QUERY, required=False, description="Defaults to the current user; other users require admin"),
+            OpenApiParameter(name="since", type=str, location=OpenApiParameter.QUERY, required=False, description="ISO-8601 lower bound on published_at (inclusive)"),
+            OpenApiParameter(name="until", type=str, location=OpenApiParameter.QUERY, required=False, description="ISO-8601 upper bound on published_at (inclusive)"),
+            OpenApiParameter(name="output", type=str, location=OpenApiParameter.QUERY, required=False, enum=list(EXPORT_FORMATS), description="ndjson (default) or as2"),
+        ],
+        responses={
+            200: OpenApiResponse(description="Streamed NDJSON or AS2 OrderedCollection"),
+            400: OpenApiResponse(description="Invalid date range or output format"),
+            403: OpenApiResponse(description="Exporting another user's history requires admin"),
+            404: OpenApiResponse(description="User not found"),
+        },
+        tags=["Activity"],
+    )
+    def get(self, request):
+        username = request.query_params.get("username")
+        if not username or username == request.user.username:
+            user = request.user
+        else:
+            if not request.user.is_staff:
+                return Response(
+                    {"error": "You can only export your own activity history."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            try:
+                user = User.objects.get(username=username)
+            except User.DoesNotExist:
+                return Response(
+                    {"error": f"User '{username}' not found."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        bounds = {}
+        for name in ("since", "until"):
+            raw = request.query_params.get(name)
+            if not raw:
+                continue
+            parsed = parse_datetime(raw)
+            if parsed is None:
+                return Response(
+                    {"error": f"'{name}' must be an ISO-8601 datetime."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            bounds[name] = parsed
+
+        queryset = user_events_queryset(user.username, since=bounds.get("since"), until=bounds.get("until"))
+        content_type = "application/x-ndjson" if output == "ndjson" else "application/activity+json"
+        extension = "ndjson" if output == "ndjson" else "json"
+
+        response = StreamingHttpResponse(stream_events(queryset, fmt=output), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="activity_{user.username}.{extension}"'
+        return response
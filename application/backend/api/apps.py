@@ -8,4 +8,5 @@ class ApiConfig(AppConfig):
     def ready(self):
         print("✅ ApiConfig.ready() called") 
         from .activities.signals import activity_signals  # noqa: F401
-        from .utils import badge_signals  # noqa: F401
\ No newline at end of file
+        from .utils import badge_signals  # noqa: F401
+        from .utils import system_stats_signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.activities.services.retention import archive_activity_events, get_archive_root
+
+
+class Command(BaseCommand):
+    help = "Archive monthly ActivityEvent partitions older than N days to compressed JSONL files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'ACTIVITY_EVENT_RETENTION_DAYS', 180),
+            help='Archive whole months older than this many days (default: ACTIVITY_EVENT_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Directory for archive files (default: ACTIVITY_ARCHIVE_ROOT)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows read and deleted per batch (default: 5000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report which partitions would be archived',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        output = options['output'] or get_archive_root()
+
+        partitions = archive_activity_events(
+            older_than_days=options['days'],
+            archive_root=output,
+            batch_size=options['batch_size'],
+            dry_run=dry_run,
+        )
+
+        if not partitions:
+            self.stdout.write(self.style.SUCCESS("No partitions older than the retention window."))
+            return
+
+        total = 0
+        for part in partitions:
+            total += part.row_count
+            if dry_run:
+                self.stdout.write(self.style.WARNING(f"[DRY RUN] Would archive {part.row_count} event(s) from {part.partition}"))
+            else:
+                self.stdout.write(f"Archived {part.row_count} event(s) from {part.partition} -> {part.path}")
+
+        prefix = "[DRY RUN] Would archive" if dry_run else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {total} event(s) across {len(partitions)} partition(s)."))
@@ -0,0 +1,57 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.waste.rollups import fold_new_wastes, rebuild_rollups
+from api.waste.waste_views import point_coefficients
+
+
+class Command(BaseCommand):
+    help = "Fold new waste logs into the daily per-user and global rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Waste rows folded per transaction (default: 5000)',
+        )
+        parser.add_argument(
+            '--rebuild-since',
+            type=str,
+            default=None,
+            help='Recompute all buckets from this day (YYYY-MM-DD) on, e.g. after factor changes',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and fold new rows as they arrive',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=60.0,
+            help='Seconds between passes (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild_since']:
+            try:
+                since = date.fromisoformat(options['rebuild_since'])
+            except ValueError:
+                raise CommandError("--rebuild-since must be a date in YYYY-MM-DD format")
+            rows = rebuild_rollups(point_coefficients, since, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups since {since} from {rows} waste row(s)."))
+
+        if not options['loop']:
+            folded = fold_new_wastes(point_coefficients, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Folded {folded} new waste row(s) into rollups."))
+            return
+
+        self.stdout.write(self.style.SUCCESS("Waste rollup job started."))
+        while True:
+            folded = fold_new_wastes(point_coefficients, batch_size=options['batch_size'])
+            if folded:
+                self.stdout.write(f"Folded {folded} waste row(s).")
+            time.sleep(options['poll_interval'])
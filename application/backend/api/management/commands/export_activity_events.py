@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from api.activities.services.export import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    stream_events,
+    user_events_queryset,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream a user's ActivityEvent history to a file (or stdout) as NDJSON or an AS2 collection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', type=str, required=True, help='Actor whose history is exported')
+        parser.add_argument('--since', type=str, default=None, help='ISO-8601 lower bound on published_at')
+        parser.add_argument('--until', type=str, default=None, help='ISO-8601 upper bound on published_at')
+        parser.add_argument('--format', type=str, choices=EXPORT_FORMATS, default='ndjson', help='Output format (default: ndjson)')
+        parser.add_argument('--output', type=str, default=None, help='Destination file (default: stdout)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows fetched per batch (default: {DEFAULT_CHUNK_SIZE})',
+        )
+
+    def _parse(self, name, value):
+        if value is None:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f"--{name} must be an ISO-8601 datetime")
+        return parsed
+
+    def handle(self, *args, **options):
+        queryset = user_events_queryset(
+            options['username'],
+            since=self._parse('since', options['since']),
+            until=self._parse('until', options['until']),
+        )
+        chunks = stream_events(queryset, fmt=options['format'], chunk_size=options['chunk_size'])
+
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported activity history of {options['username']} to {options['output']}"))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.recycling_centers.catalog import load_catalog
+from api.recycling_centers.catalog_io import FORMATS, CatalogFormatError, read_centers
+
+
+class Command(BaseCommand):
+    help = "Load recycling centers from a CSV or JSON Lines file into the catalog tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (header: city,district,address,note,lat,lon,waste_types) or .jsonl file')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete the current catalog before loading (in the same transaction)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Records inserted per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = load_catalog(
+                read_centers(options['path'], options['format']),
+                replace=options['replace'],
+                batch_size=options['batch_size'],
+            )
+        except (CatalogFormatError, OSError) as exc:
+            raise CommandError(f"Could not load {options['path']}: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {report.read} center(s): {report.created} created, {report.skipped} already present. "
+            f"Catalog version {report.version}."
+        ))
@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.waste.pipeline import process_waste_events, retry_failed_events
+
+
+class Command(BaseCommand):
+    help = "Apply challenge progress, badges and activity for pending waste-log events."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'WASTE_EVENTS_BATCH_SIZE', 500),
+            help='Events claimed per batch (default: WASTE_EVENTS_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for new events instead of draining once',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Queue events that were given up on (failed) again before processing',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when no events are due (with --loop)',
+        )
+
+    def drain(self, batch_size):
+        processed = failed = 0
+        while True:
+            done, errors = process_waste_events(batch_size=batch_size)
+            processed += done
+            failed += errors
+            # A short batch means nothing else is due right now.
+            if done + errors < batch_size:
+                return processed, failed
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if options['retry_failed']:
+            self.stdout.write(f"Requeued {retry_failed_events()} failed waste event(s).")
+        if not options['loop']:
+            processed, failed = self.drain(batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f"Processed {processed} waste event(s); {failed} rescheduled or failed."
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS("Waste event worker started."))
+        while True:
+            processed, failed = self.drain(batch_size)
+            if failed:
+                self.stdout.write(self.style.WARNING(f"{failed} waste event(s) failed and were rescheduled or given up on."))
+            if not processed and not failed:
+                time.sleep(options['poll_interval'])
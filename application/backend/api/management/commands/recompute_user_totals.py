@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+
+from api.waste.recompute import recompute_user_totals
+from api.waste.waste_views import point_coefficients
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute users' total_points and total_co2 from their waste logs with the "
+        "current emission factors and point coefficients, and report the drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-id',
+            type=int,
+            default=None,
+            help='First user id to process (inclusive)',
+        )
+        parser.add_argument(
+            '--end-id',
+            type=int,
+            default=None,
+            help='Stop before this user id (exclusive); run disjoint ranges in parallel',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Users aggregated and updated per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=1e-6,
+            help='Ignore differences up to this size (default: 1e-6)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drift; do not write',
+        )
+
+    def handle(self, *args, **options):
+        report = recompute_user_totals(
+            point_coefficients,
+            start_id=options['start_id'],
+            end_id=options['end_id'],
+            chunk_size=options['chunk_size'],
+            tolerance=options['tolerance'],
+            dry_run=options['dry_run'],
+        )
+
+        self.stdout.write(
+            f"Scanned {report.users_scanned} user(s) (last id {report.last_id}); "
+            f"{report.users_changed} drifted."
+        )
+        self.stdout.write(
+            f"Net drift: points {report.points_drift:+.4f}, CO2 {report.co2_drift:+.6f} kg"
+        )
+        for d_points, d_co2, user_id in report.worst:
+            self.stdout.write(f"  user {user_id}: |points| {d_points:.4f}, |co2| {d_co2:.6f}")
+
+        prefix = "[DRY RUN] Would update" if options['dry_run'] else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {report.users_changed} user(s)."))
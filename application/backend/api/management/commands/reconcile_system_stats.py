@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from api.utils.system_stats import CACHE_KEY, reconcile_system_stats
+
+
+class Command(BaseCommand):
+    help = "Reset the system statistics counters from the source tables and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and reconcile periodically',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'STATISTICS_RECONCILE_INTERVAL', 900),
+            help='Seconds between reconciliations (with --loop; default: STATISTICS_RECONCILE_INTERVAL)',
+        )
+
+    def reconcile(self, verbose):
+        drifted = 0
+        for name, (counted, actual) in reconcile_system_stats().items():
+            drift = actual - counted
+            if abs(drift) > 1e-6:
+                drifted += 1
+                self.stdout.write(self.style.WARNING(f"{name}: counter {counted:g}, actual {actual:g} (drift {drift:+g})"))
+            elif verbose:
+                self.stdout.write(f"{name}: {actual:g}")
+        # CACHES is shared (Redis), so this also drops the web process's snapshot.
+        cache.delete(CACHE_KEY)
+        return drifted
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            drifted = self.reconcile(verbose=True)
+            self.stdout.write(self.style.SUCCESS(f"Reconciled system statistics; {drifted} counter(s) had drifted."))
+            return
+
+        self.stdout.write(self.style.SUCCESS("System statistics reconciler started."))
+        while True:
+            self.reconcile(verbose=False)
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 23:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_account_deletion_cancel_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEventArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('partition', models.CharField(db_index=True, max_length=7)),
+                ('path', models.CharField(max_length=512)),
+                ('row_count', models.IntegerField(default=0)),
+                ('range_start', models.DateTimeField()),
+                ('range_end', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'activity_event_archive',
+                'ordering': ['-partition', '-archived_at'],
+            },
+        ),
+    ]
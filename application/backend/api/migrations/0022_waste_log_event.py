@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 23:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_activity_event_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WasteLogEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.FloatField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('user_waste', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_events', to='api.userwastes')),
+            ],
+            options={
+                'db_table': 'waste_log_event',
+                'indexes': [models.Index(fields=['processed_at', 'next_attempt_at'], name='waste_event_pending_idx')],
+            },
+        ),
+    ]
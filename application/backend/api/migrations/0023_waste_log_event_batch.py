@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_waste_log_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wastelogevent',
+            name='batch_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-19 00:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_waste_log_event_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemStatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32)),
+                ('slot', models.PositiveSmallIntegerField(default=0)),
+                ('value', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'system_stat_counter',
+                'constraints': [models.UniqueConstraint(fields=('name', 'slot'), name='uniq_system_stat_counter_slot')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-19 00:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_system_stat_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rollup_watermark',
+            },
+        ),
+        migrations.CreateModel(
+            name='WasteDailyGlobalRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('waste_type', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('amount', models.FloatField(default=0)),
+                ('co2', models.FloatField(default=0)),
+                ('points', models.FloatField(default=0)),
+                ('entries', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'waste_daily_global_rollup',
+                'constraints': [models.UniqueConstraint(fields=('day', 'waste_type'), name='uniq_waste_rollup_day_type')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WasteDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('waste_type', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('amount', models.FloatField(default=0)),
+                ('co2', models.FloatField(default=0)),
+                ('points', models.FloatField(default=0)),
+                ('entries', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waste_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'waste_daily_rollup',
+                'constraints': [models.UniqueConstraint(fields=('user', 'day', 'waste_type'), name='uniq_waste_rollup_user_day_type')],
+            },
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2 on 2026-10-19 00:44
+
+import json
+import os
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen with this migration: later edits to the catalog code or files must not change what it loads.
+SEED_PATH = os.path.join(os.path.dirname(__file__), '0026_recycling_catalog_seed.jsonl')
+
+
+def read_seed():
+    with open(SEED_PATH, encoding='utf-8') as f:
+        for text in f:
+            if text.strip():
+                yield json.loads(text)
+
+
+def load_seed(apps, schema_editor):
+    """Load the centers that used to be hard-coded in recycling_data.py."""
+    City = apps.get_model('api', 'RecyclingCity')
+    District = apps.get_model('api', 'RecyclingDistrict')
+    Center = apps.get_model('api', 'RecyclingCenter')
+    WasteType = apps.get_model('api', 'RecyclingCenterWasteType')
+    Version = apps.get_model('api', 'RecyclingCatalogVersion')
+
+    cities, districts = {}, {}
+    for row in read_seed():
+        if row['city'] not in cities:
+            cities[row['city']] = City.objects.create(name=row['city'])
+        key = (row['city'], row['district'])
+        if key not in districts:
+            districts[key] = District.objects.create(city=cities[row['city']], name=row['district'])
+        center = Center.objects.create(
+            district=districts[key], address=row['address'], note=row['note'], lat=row['lat'], lon=row['lon']
+        )
+        WasteType.objects.bulk_create([WasteType(center=center, waste_type=t) for t in row['waste_types']])
+    Version.objects.create(version=1)
+
+
+def unload_seed(apps, schema_editor):
+    apps.get_model('api', 'RecyclingCity').objects.all().delete()
+    apps.get_model('api', 'RecyclingCatalogVersion').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_waste_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecyclingCatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'recycling_catalog_version',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecyclingCity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'db_table': 'recycling_city',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecyclingDistrict',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='districts', to='api.recyclingcity')),
+            ],
+            options={
+                'db_table': 'recycling_district',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecyclingCenter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=255)),
+                ('note', models.TextField(blank=True, default='')),
+                ('lat', models.FloatField(blank=True, null=True)),
+                ('lon', models.FloatField(blank=True, null=True)),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='centers', to='api.recyclingdistrict')),
+            ],
+            options={
+                'db_table': 'recycling_center',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecyclingCenterWasteType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('waste_type', models.CharField(max_length=50)),
+                ('center', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waste_types', to='api.recyclingcenter')),
+            ],
+            options={
+                'db_table': 'recycling_center_waste_type',
+                'indexes': [models.Index(fields=['waste_type', 'center'], name='recycling_type_center_idx')],
+                'constraints': [models.UniqueConstraint(fields=('center', 'waste_type'), name='uniq_recycling_center_waste_type')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='recyclingdistrict',
+            constraint=models.UniqueConstraint(fields=('city', 'name'), name='uniq_recycling_district_city_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='recyclingcenter',
+            constraint=models.UniqueConstraint(fields=('district', 'address'), name='uniq_recycling_center_district_address'),
+        ),
+        migrations.RunPython(load_seed, unload_seed),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-19 01:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_markers(apps, schema_editor):
+    WasteLogEvent = apps.get_model('api', 'WasteLogEvent')
+    WasteLogEvent.objects.filter(processed_at__isnull=False).update(
+        challenges_done=True, badges_done=True, activity_done=True
+    )
+    # Events the worker had stopped claiming (attempts at the limit) become dead letters.
+    WasteLogEvent.objects.filter(
+        processed_at__isnull=True, attempts__gte=getattr(settings, 'WASTE_EVENTS_MAX_ATTEMPTS', 5)
+    ).update(failed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_recycling_catalog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wastelogevent',
+            name='activity_done',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='wastelogevent',
+            name='badges_done',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='wastelogevent',
+            name='challenges_done',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='wastelogevent',
+            name='failed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_markers, migrations.RunPython.noop),
+    ]
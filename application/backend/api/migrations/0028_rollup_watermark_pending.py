@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_waste_event_consumer_markers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='pending_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='pending_seen_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -65,6 +65,13 @@ class Users(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # The reloaded values are the new baseline for the field trackers
+        # (system stats CO2, activity); post_init does not run for self here.
+        from api.activities.utils.field_tracker import FieldTracker
+        FieldTracker.reset_all(self, fields)
+
     @property
     def profile_image_url(self):
         """
@@ -256,10 +263,44 @@ class UserWastes(models.Model):
     amount = models.FloatField(blank=False, null=False)
     date = models.DateTimeField(default=timezone.now)
 
+    # Set on instances written through the waste-log pipeline: their badge and
+    # activity side effects come from WasteLogEvent consumers, not post_save.
+    defer_side_effects = False
+
     class Meta:
         db_table = 'UserWastes'
         ordering = ['-date']
 
+
+class WasteLogEvent(models.Model):
+    """
+    Domain event recorded in the same transaction as a UserWastes row.
+    Challenge progress, badges and activity for the log are applied by
+    api.waste.pipeline after commit (by `process_waste_events`), each
+    consumer setting its own *_done flag.
+    """
+    user = models.ForeignKey('Users', on_delete=models.CASCADE)
+    user_waste = models.ForeignKey(UserWastes, on_delete=models.CASCADE, related_name='log_events')
+    amount = models.FloatField()
+    # Shared by the events of one bulk import; their challenge progress is applied as one delta.
+    batch_id = models.UUIDField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    challenges_done = models.BooleanField(default=False)
+    badges_done = models.BooleanField(default=False)
+    activity_done = models.BooleanField(default=False)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    # Set once attempts reach WASTE_EVENTS_MAX_ATTEMPTS; the worker skips the event from then on.
+    failed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        db_table = 'waste_log_event'
+        indexes = [
+            models.Index(fields=['processed_at', 'next_attempt_at'], name='waste_event_pending_idx'),
+        ]
+
 class PostLikes(models.Model):
     REACTION_CHOICES = [
         ('LIKE', 'Like'),
@@ -348,6 +389,7 @@ class Follow(models.Model):
 # activities/models.py
 import uuid
 from copy import deepcopy
+from datetime import timedelta
 
 
 class Visibility(models.TextChoices):
@@ -366,6 +408,18 @@ def _deep_merge(a: dict, b: dict) -> dict:
             out[k] = v
     return out
 
+def activity_hot_cutoff():
+    """Oldest published_at still considered part of the hot (un-archived) activity window."""
+    days = getattr(settings, "ACTIVITY_EVENT_RETENTION_DAYS", 180)
+    return timezone.now() - timedelta(days=days)
+
+
+class ActivityEventQuerySet(models.QuerySet):
+    def hot(self):
+        """Restrict to the hot window so index range scans never touch archived months."""
+        return self.filter(published_at__gte=activity_hot_cutoff())
+
+
 class ActivityEvent(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -385,6 +439,8 @@ class ActivityEvent(models.Model):
 
     summary = models.TextField(blank=True, default="")
 
+    objects = ActivityEventQuerySet.as_manager()
+
     class Meta:
         db_table = "activity_event"
         
@@ -448,6 +504,27 @@ class ActivityEvent(models.Model):
         super().save(*args, **kwargs)
 
 
+class ActivityEventArchive(models.Model):
+    """
+    Manifest entry for a monthly ActivityEvent partition that was moved out of
+    the activity_event table into a compressed JSONL file.
+    A month can have several entries if late rows were archived in a later run.
+    """
+    partition = models.CharField(max_length=7, db_index=True)  # "YYYY-MM"
+    path = models.CharField(max_length=512)
+    row_count = models.IntegerField(default=0)
+    range_start = models.DateTimeField()
+    range_end = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "activity_event_archive"
+        ordering = ["-partition", "-archived_at"]
+
+    def __str__(self):
+        return f"ActivityEventArchive({self.partition}, rows={self.row_count})"
+
+
 class AccountDeletionRequest(models.Model):
     user = models.OneToOneField('Users', on_delete=models.CASCADE, related_name='account_deletion_request')
     requested_at = models.DateTimeField()
@@ -460,3 +537,143 @@ class AccountDeletionRequest(models.Model):
 
     def __str__(self):
         return f"AccountDeletionRequest(user={self.user_id}, delete_after={self.delete_after.isoformat()})"
+
+
+class SystemStatCounter(models.Model):
+    """
+    Sharded counter behind the system statistics endpoint. Writers bump a
+    random slot so concurrent updates don't queue on one row; the value of a
+    counter is the sum of its slots. See api.utils.system_stats.
+    """
+    name = models.CharField(max_length=32)
+    slot = models.PositiveSmallIntegerField(default=0)
+    value = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'system_stat_counter'
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'slot'], name='uniq_system_stat_counter_slot'),
+        ]
+
+    def __str__(self):
+        return f"SystemStatCounter({self.name}[{self.slot}]={self.value})"
+
+
+class WasteDailyRollup(models.Model):
+    """Waste logged per user, waste type and UTC day; filled by api.waste.rollups."""
+    user = models.ForeignKey('Users', on_delete=models.CASCADE, related_name='waste_rollups')
+    waste_type = models.CharField(max_length=50)
+    day = models.DateField()
+    amount = models.FloatField(default=0)
+    co2 = models.FloatField(default=0)
+    points = models.FloatField(default=0)
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'waste_daily_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day', 'waste_type'], name='uniq_waste_rollup_user_day_type'),
+        ]
+
+
+class WasteDailyGlobalRollup(models.Model):
+    """System-wide waste logged per waste type and UTC day."""
+    waste_type = models.CharField(max_length=50)
+    day = models.DateField()
+    amount = models.FloatField(default=0)
+    co2 = models.FloatField(default=0)
+    points = models.FloatField(default=0)
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'waste_daily_global_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'waste_type'], name='uniq_waste_rollup_day_type'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """High-water mark (last source row id folded in) of an incremental rollup job."""
+    name = models.CharField(max_length=64, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    # Largest source id seen at pending_seen_at; folded once the safety lag has passed.
+    pending_id = models.BigIntegerField(default=0)
+    pending_seen_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'rollup_watermark'
+
+    def __str__(self):
+        return f"RollupWatermark({self.name}={self.last_id})"
+
+
+class RecyclingCity(models.Model):
+    """City of the recycling center catalog (loaded by `load_recycling_centers`)."""
+    name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        db_table = 'recycling_city'
+
+    def __str__(self):
+        return self.name
+
+
+class RecyclingDistrict(models.Model):
+    city = models.ForeignKey(RecyclingCity, on_delete=models.CASCADE, related_name='districts')
+    name = models.CharField(max_length=150)
+
+    class Meta:
+        db_table = 'recycling_district'
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'name'], name='uniq_recycling_district_city_name'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} / {self.city_id}"
+
+
+class RecyclingCenter(models.Model):
+    district = models.ForeignKey(RecyclingDistrict, on_delete=models.CASCADE, related_name='centers')
+    address = models.CharField(max_length=255)
+    note = models.TextField(blank=True, default='')
+    # Approximate; only used to rank centers by distance.
+    lat = models.FloatField(null=True, blank=True)
+    lon = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'recycling_center'
+        constraints = [
+            models.UniqueConstraint(fields=['district', 'address'], name='uniq_recycling_center_district_address'),
+        ]
+
+    def __str__(self):
+        return self.address
+
+
+class RecyclingCenterWasteType(models.Model):
+    """Waste type accepted by a center; indexed by type for type lookups."""
+    center = models.ForeignKey(RecyclingCenter, on_delete=models.CASCADE, related_name='waste_types')
+    waste_type = models.CharField(max_length=50)
+
+    class Meta:
+        db_table = 'recycling_center_waste_type'
+        constraints = [
+            models.UniqueConstraint(fields=['center', 'waste_type'], name='uniq_recycling_center_waste_type'),
+        ]
+        indexes = [
+            models.Index(fields=['waste_type', 'center'], name='recycling_type_center_idx'),
+        ]
+
+
+class RecyclingCatalogVersion(models.Model):
+    """Single row bumped on every catalog load; workers reload their cached index when it changes."""
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recycling_catalog_version'
+
+    def __str__(self):
+        return f"RecyclingCatalogVersion({self.version})"
@@ -15,26 +15,7 @@ from django.shortcuts import get_object_or_404
 from ..comment.comment_serializer import CommentSerializer
 from django.db import transaction
 
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-
-
-#function to send real-time notification via channels
-def send_realtime_notification(user_id, message, notif_id, created_at):
-    channel_layer = get_channel_layer()
-
-    async_to_sync(channel_layer.group_send)(
-        f"user_{user_id}",
-        {
-            "type": "notify",
-            "data": {
-                "id": notif_id,
-                "message": message,
-                "created_at": created_at.isoformat(),
-                "read": False
-            }
-        }
-    )
+from notifications.outbox import queue_realtime_notification as send_realtime_notification
 
 @extend_schema(
     summary="Create a new post",
@@ -560,9 +541,10 @@ def like_post(request, post_id):
                         user=post.creator,
                         message=notif_message,
                         created_at=timezone.now(),
-                        read=False
+                        read=False,
+                        category=Notification.SOCIAL
                     )
-                    #send real-time notification
+                    #queue real-time notification for the dispatcher
                     send_realtime_notification(
                         user_id=post.creator.id,
                         message=notif_message,
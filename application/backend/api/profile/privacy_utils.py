@@ -7,10 +7,11 @@ PRIVACY_FOLLOWERS = 'followers'
 VALID_PRIVACY_VALUES = {PRIVACY_PUBLIC, PRIVACY_PRIVATE, PRIVACY_FOLLOWERS}
 
 
-def can_view_profile_field(viewer, profile_owner, privacy_value: str) -> bool:
+def can_view_profile_field(viewer, profile_owner, privacy_value: str, viewer_follows=None) -> bool:
     """
     Returns whether `viewer` can see a profile field on `profile_owner`
     with the given privacy_value.
+    `viewer_follows` may carry an already-known follow state to skip the Follow query.
     """
     if viewer and getattr(viewer, 'is_authenticated', False) and getattr(viewer, 'id', None) == profile_owner.id:
         return True
@@ -20,13 +21,15 @@ def can_view_profile_field(viewer, profile_owner, privacy_value: str) -> bool:
 
     if privacy_value == PRIVACY_FOLLOWERS:
         if viewer and getattr(viewer, 'is_authenticated', False):
+            if viewer_follows is not None:
+                return bool(viewer_follows)
             return Follow.objects.filter(follower=viewer, following=profile_owner).exists()
         return False
 
     return False
 
 
-def can_view_waste_stats(viewer, profile_owner) -> bool:
+def can_view_waste_stats(viewer, profile_owner, viewer_follows=None) -> bool:
     """
     Waste stats visibility:
     - Owner can always view
@@ -37,4 +40,6 @@ def can_view_waste_stats(viewer, profile_owner) -> bool:
         return True
     if getattr(profile_owner, 'is_anonymous', False):
         return False
-    return can_view_profile_field(viewer, profile_owner, getattr(profile_owner, 'waste_stats_privacy', PRIVACY_PUBLIC))
+    return can_view_profile_field(
+        viewer, profile_owner, getattr(profile_owner, 'waste_stats_privacy', PRIVACY_PUBLIC), viewer_follows
+    )
@@ -0,0 +1,182 @@
+"""
+Recycling center catalog tables: bulk loading and reading.
+
+`load_catalog` streams center records (see catalog_io) into the city,
+district, center and waste-type tables in batches, inside one transaction,
+and bumps RecyclingCatalogVersion so every worker drops its cached query
+results (recycling_index.get_index) on its next version check. The readers
+below run the queries those results are built from.
+"""
+from dataclasses import dataclass
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+
+from api.models import (
+    RecyclingCatalogVersion,
+    RecyclingCenter,
+    RecyclingCenterWasteType,
+    RecyclingCity,
+    RecyclingDistrict,
+)
+
+
+@dataclass
+class LoadReport:
+    read: int = 0
+    created: int = 0
+    skipped: int = 0
+    version: int = 0
+
+
+def current_version():
+    row = RecyclingCatalogVersion.objects.order_by("id").values_list("version", flat=True).first()
+    return row or 0
+
+
+def bump_version():
+    if not RecyclingCatalogVersion.objects.update(version=F("version") + 1):
+        RecyclingCatalogVersion.objects.create(version=1)
+    return current_version()
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _ensure_cities(names, city_ids):
+    missing = [name for name in dict.fromkeys(names) if name not in city_ids]
+    if missing:
+        RecyclingCity.objects.bulk_create([RecyclingCity(name=name) for name in missing], ignore_conflicts=True)
+        city_ids.update(RecyclingCity.objects.filter(name__in=missing).values_list("name", "id"))
+
+
+def _ensure_districts(keys, district_ids):
+    missing = [key for key in dict.fromkeys(keys) if key not in district_ids]
+    if missing:
+        RecyclingDistrict.objects.bulk_create(
+            [RecyclingDistrict(city_id=city_id, name=name) for city_id, name in missing], ignore_conflicts=True
+        )
+        for city_id, name, pk in RecyclingDistrict.objects.filter(
+            city_id__in={city_id for city_id, _ in missing}, name__in={name for _, name in missing}
+        ).values_list("city_id", "name", "id"):
+            district_ids[(city_id, name)] = pk
+
+
+def _delete_catalog():
+    # Leaf tables first, so each DELETE is a single statement with nothing left to cascade.
+    for model in (RecyclingCenterWasteType, RecyclingCenter, RecyclingDistrict, RecyclingCity):
+        model.objects.all().delete()
+
+
+def load_catalog(rows, replace=False, batch_size=1000):
+    """
+    Load center records. Centers already present (same district and address)
+    are skipped; with `replace` the existing catalog is deleted first. The
+    whole load is one transaction, so readers never see half a catalog.
+    """
+    report = LoadReport()
+    with transaction.atomic():
+        if replace:
+            _delete_catalog()
+        city_ids = dict(RecyclingCity.objects.values_list("name", "id"))
+        district_ids = {
+            (city_id, name): pk for city_id, name, pk in RecyclingDistrict.objects.values_list("city_id", "name", "id")
+        }
+
+        for batch in _batches(rows, batch_size):
+            report.read += len(batch)
+            _ensure_cities([row["city"] for row in batch], city_ids)
+            _ensure_districts([(city_ids[row["city"]], row["district"]) for row in batch], district_ids)
+
+            keyed = {}
+            for row in batch:
+                keyed.setdefault((district_ids[(city_ids[row["city"]], row["district"])], row["address"]), row)
+            existing = set(
+                RecyclingCenter.objects.filter(
+                    district_id__in={d for d, _ in keyed}, address__in={a for _, a in keyed}
+                ).values_list("district_id", "address")
+            )
+            new = {key: row for key, row in keyed.items() if key not in existing}
+            report.skipped += len(batch) - len(new)
+            if not new:
+                continue
+
+            RecyclingCenter.objects.bulk_create([
+                RecyclingCenter(district_id=d, address=a, note=row["note"], lat=row["lat"], lon=row["lon"])
+                for (d, a), row in new.items()
+            ], batch_size=batch_size)
+            # Read ids back: MySQL's bulk_create does not return them.
+            center_ids = {
+                (d, a): pk for d, a, pk in RecyclingCenter.objects.filter(
+                    district_id__in={d for d, _ in new}, address__in={a for _, a in new}
+                ).values_list("district_id", "address", "id")
+            }
+            RecyclingCenterWasteType.objects.bulk_create([
+                RecyclingCenterWasteType(center_id=center_ids[key], waste_type=waste_type)
+                for key, row in new.items()
+                for waste_type in row["waste_types"]
+            ], batch_size=batch_size)
+            report.created += len(new)
+
+        report.version = bump_version()
+    return report
+
+
+def city_names():
+    """Cities that have centers, in load order."""
+    return list(
+        RecyclingCity.objects.filter(districts__centers__isnull=False)
+        .distinct().order_by("id").values_list("name", flat=True)
+    )
+
+
+def district_names(city):
+    """Sorted districts of `city` that have centers; empty when the city is unknown."""
+    return sorted(set(
+        RecyclingDistrict.objects.filter(city__name=city, centers__isnull=False).values_list("name", flat=True)
+    ))
+
+
+def filter_centers(queryset, waste_types=()):
+    # One join per type, so a center must accept all of them (through recycling_type_center_idx).
+    for waste_type in waste_types:
+        queryset = queryset.filter(waste_types__waste_type=waste_type)
+    return queryset
+
+
+def center_rows(queryset):
+    """
+    (id, city, center) for the centers in `queryset`, in load order; center is
+    {ilce, adres, lat, lon, not, turler}. Two queries, whatever the size.
+    """
+    queryset = queryset.order_by("id")
+    waste_types = {}
+    for center_id, waste_type in RecyclingCenterWasteType.objects.filter(
+        center__in=queryset.values("id")
+    ).order_by("id").values_list("center_id", "waste_type"):
+        waste_types.setdefault(center_id, []).append(waste_type)
+    return [
+        (center_id, city, {
+            "ilce": district,
+            "adres": address,
+            "lat": lat,
+            "lon": lon,
+            "not": note,
+            "turler": waste_types.get(center_id, []),
+        })
+        for center_id, city, district, address, note, lat, lon in queryset.values_list(
+            "id", "district__city__name", "district__name", "address", "note", "lat", "lon"
+        )
+    ]
+
+
+def center_coordinates():
+    """(id, lat, lon) of every center that has coordinates."""
+    return RecyclingCenter.objects.filter(lat__isnull=False, lon__isnull=False).values_list("id", "lat", "lon")
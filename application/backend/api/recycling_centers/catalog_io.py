@@ -0,0 +1,80 @@
+"""
+Streaming readers for recycling center catalog files.
+
+Both formats hold one center per record:
+
+- CSV with a header row: city, district, address, note, lat, lon,
+  waste_types (types separated by ";").
+- JSON Lines: {"city", "district", "address", "note", "lat", "lon",
+  "waste_types": [...]} per line.
+
+Records are yielded one at a time, so files of any size load in constant
+memory.
+"""
+import csv
+import json
+import os
+
+FORMATS = ("csv", "jsonl")
+
+
+class CatalogFormatError(ValueError):
+    pass
+
+
+def _coordinate(value, line):
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise CatalogFormatError(f"line {line}: invalid coordinate {value!r}")
+
+
+def normalize(record, line):
+    """Validated center dict from a raw record."""
+    missing = [key for key in ("city", "district", "address") if not str(record.get(key) or "").strip()]
+    if missing:
+        raise CatalogFormatError(f"line {line}: missing {', '.join(missing)}")
+    waste_types = record.get("waste_types") or []
+    if isinstance(waste_types, str):
+        waste_types = waste_types.split(";")
+    return {
+        "city": record["city"].strip(),
+        "district": record["district"].strip(),
+        "address": record["address"].strip(),
+        "note": (record.get("note") or "").strip(),
+        "lat": _coordinate(record.get("lat"), line),
+        "lon": _coordinate(record.get("lon"), line),
+        # Deduplicated, in file order.
+        "waste_types": list(dict.fromkeys(t.strip() for t in waste_types if t and t.strip())),
+    }
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson"):
+        return "jsonl"
+    if ext == "csv":
+        return "csv"
+    raise CatalogFormatError(f"cannot tell the format of {path}; use .csv or .jsonl")
+
+
+def read_centers(path, fmt=None):
+    """Yield normalized center dicts from a CSV or JSON Lines file."""
+    fmt = fmt or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                yield normalize(record, line)
+        elif fmt == "jsonl":
+            for line, text in enumerate(f, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    record = json.loads(text)
+                except json.JSONDecodeError as exc:
+                    raise CatalogFormatError(f"line {line}: {exc}")
+                yield normalize(record, line)
+        else:
+            raise CatalogFormatError(f"unknown format {fmt!r}")
@@ -1,229 +0,0 @@
-# Recycling centers data for Turkey
-RECYCLING_CENTERS_DATA = [
-    {
-        "il": "Istanbul",
-        "merkezler": [
-            {
-                "ilce": "Sultangazi",
-                "adres": "Esentepe Mah. Kucuk San. Sit. 2951 Sokak 9.Blok No:28/1 Sultangazi / Istanbul",
-                "not": "Elektronik Atik Toplama Merkezi",
-                "turler": ["electronic"]
-            },
-            {
-                "ilce": "Beylikduzu",
-                "adres": "Beylikduzu 1. Sinif Atik Getirme Merkezi",
-                "not": "Kagit, plastik, cam, metal, atik piller ve elektrikli-elektronik esyalar kabul ediliyor.",
-                "turler": ["paper", "plastic", "glass", "metal", "battery", "electronic"]
-            },
-            {
-                "ilce": "Atasehir",
-                "adres": "Barbaros Mah. Sebboy Sok. No:4 PK:34746 Atasehir / Istanbul",
-                "not": "Elektronik atik toplama kutusu talebi hizmeti mevcut.",
-                "turler": ["electronic", "battery"]
-            }
-        ]
-    },
-    {
-        "il": "Ankara",
-        "merkezler": [
-            {
-                "ilce": "Cankaya (Birlik Mah.)",
-                "adres": "451. Cadde (Fen Isleri Kampusu) Cankaya / Ankara",
-                "not": "Cankaya Belediyesi 1. Sinif Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "metal", "glass", "textile", "battery", "electronic", "medicine", "oil_fats", "tire", "bulky"]
-            },
-            {
-                "ilce": "Cankaya (Cayyolu)",
-                "adres": "Alacaatli Cad. 2889/1 Sok. Cankaya / Ankara",
-                "not": "Cankaya Belediyesi 2. Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "metal", "glass", "textile", "battery", "electronic", "medicine", "oil_fats", "tire", "bulky"]
-            },
-            {
-                "ilce": "Mamak",
-                "adres": "Huseyingazi Mah. Mamak Cad. No:181 Mamak / Ankara",
-                "not": "Mamak Belediyesi 1. Sinif Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "metal", "glass", "wood", "textile", "electronic", "battery", "fluorescent", "accumulator", "medicine", "oil_fats", "tire"]
-            },
-            {
-                "ilce": "Yenimahalle (Ivedik OSB)",
-                "adres": "Hurdacilar Sitesi B-7 Blok No:341 Yenimahalle / Ankara",
-                "not": "TBT Elektronik Geri Donusum",
-                "turler": ["electronic", "metal", "plastic"]
-            },
-            {
-                "ilce": "Kecioren",
-                "adres": "Yozgat Bulvari No:99A Kecioren / Ankara",
-                "not": "Kecioren Belediyesi Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "metal", "glass", "battery", "electronic", "oil_fats", "tire", "textile"]
-            }
-        ]
-    },
-    {
-        "il": "Izmir",
-        "merkezler": [
-            {
-                "ilce": "Karsiyaka",
-                "adres": "Mavisehir, Zubeyde Hanim, Bahcelievler, Ornekköy mahallelerinde seyyar atik getirme merkezleri / Izmir",
-                "not": "Elektrikli ve elektronik esya atiklari seyyar merkezlerde toplanıyor.",
-                "turler": ["electronic", "paper", "plastic", "metal", "glass", "battery"]
-            },
-            {
-                "ilce": "Buca",
-                "adres": "Buca Belediyesi Atik Toplama Merkezi",
-                "not": "Plastik, cam, metal, ahsap, elektronik atiklar kabul ediliyor.",
-                "turler": ["plastic", "glass", "metal", "wood", "electronic"]
-            }
-        ]
-    },
-    {
-        "il": "Bursa",
-        "merkezler": [
-            {
-                "ilce": "Nilufer",
-                "adres": "Alaaddinbey Mah. 611. Sok. Nilufer / Bursa",
-                "not": "Nilufer Belediyesi 1. Sinif Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "metal", "glass", "textile", "wood", "electronic", "battery", "accumulator", "oil_fats", "tire", "medicine", "bulky"]
-            },
-            {
-                "ilce": "Osmangazi",
-                "adres": "Demirtas Cumhuriyet Mah. Osmangazi / Bursa",
-                "not": "Osmangazi Belediyesi Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "glass", "metal", "electronic", "battery"]
-            },
-            {
-                "ilce": "Yildirim",
-                "adres": "Ahmet Taner Kislali Meydani No:2 Yildirim / Bursa",
-                "not": "Belediye hizmet binasinda atik getirme noktasi",
-                "turler": ["electronic", "battery", "paper", "plastic", "glass"]
-            },
-            {
-                "ilce": "Nilufer (Bursa OSB)",
-                "adres": "Hasanaga OSB 9. Cad. No:12 Nilufer / Bursa",
-                "not": "Benli Geri Donusum Fabrikasi",
-                "turler": ["plastic", "textile", "paper", "metal", "wood"]
-            },
-            {
-                "ilce": "Inegol",
-                "adres": "Organize Sanayi Bolgesi, Inegol / Bursa",
-                "not": "Inegol Belediyesi 1. Sinif Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "glass", "metal", "electronic", "battery", "oil_fats", "tire", "textile", "wood"]
-            }
-        ]
-    },
-    {
-        "il": "Antalya",
-        "merkezler": [
-            {
-                "ilce": "Konyaalti",
-                "adres": "Zumrut Mah. Cumhuriyet Cad. Konyaalti / Antalya",
-                "not": "Konyaalti Belediyesi 1. Sinif Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "metal", "glass", "textile", "battery", "electronic", "medicine", "oil_fats", "tire", "organic"]
-            },
-            {
-                "ilce": "Muratpasa",
-                "adres": "Yuksekalan Mah. Adnan Menderes Bulv. No:20 Muratpasa / Antalya",
-                "not": "Atik Yonetimi Sube Mudurlugu",
-                "turler": ["paper", "plastic", "glass", "metal", "electronic", "oil_fats", "battery"]
-            },
-            {
-                "ilce": "Kepez (Kizilli)",
-                "adres": "Kizilli Mah. Karaoz Sok. No:127 Kepez / Antalya",
-                "not": "Buyuksehir Entegre Atik Degerlendirme Tesisi",
-                "turler": ["organic", "paper", "plastic", "glass", "metal"]
-            },
-            {
-                "ilce": "Manavgat",
-                "adres": "Sanayi Mah. 2058 Sok. No:4 Manavgat / Antalya",
-                "not": "1. Sinif Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "glass", "metal", "textile", "battery", "accumulator", "oil_fats", "electronic", "fluorescent", "tire", "wood", "medicine", "bulky"]
-            },
-            {
-                "ilce": "Dosemealti",
-                "adres": "Komurcular OSB Mah. Azizoglu Sok. No:89 Dosemealti / Antalya",
-                "not": "SBC Geri Donusum A.S.",
-                "turler": ["electronic", "metal", "hazardous"]
-            }
-        ]
-    },
-    {
-        "il": "Adana",
-        "merkezler": [
-            {
-                "ilce": "Seyhan",
-                "adres": "Yesiloba Mah. Seyhan / Adana",
-                "not": "Adana'nin ilk 1. sinif atik getirme merkezi",
-                "turler": ["electronic", "battery", "plastic", "paper", "metal", "glass", "textile", "medicine", "oil_fats", "tire", "bulky"]
-            },
-            {
-                "ilce": "Seyhan",
-                "adres": "Doseme Mah. Turhan Cemal Beriker Bulv. No:57 Seyhan / Adana",
-                "not": "Seyhan Belediyesi Atik Getirme Merkezi",
-                "turler": ["glass", "paper", "plastic", "metal", "textile", "battery", "electronic", "medicine", "oil_fats", "tire"]
-            },
-            {
-                "ilce": "Yuregir",
-                "adres": "Atakent Mah. 2874 Sok. No:31 Yuregir / Adana",
-                "not": "Katkisan Geri Donusum",
-                "turler": ["electronic", "battery", "cable", "it_equipment"]
-            },
-            {
-                "ilce": "Cukurova",
-                "adres": "Turkmenbasi Bulv. No:61 Cukurova / Adana",
-                "not": "Belediye hizmet binasinda atik toplama noktasi",
-                "turler": ["oil_fats", "battery", "accumulator", "medicine"]
-            },
-            {
-                "ilce": "Saricam",
-                "adres": "Yesil Cevre Sanayi Sitesi, Saricam / Adana",
-                "not": "Ozel geri donusum tesisi",
-                "turler": ["electronic", "metal", "plastic", "hazardous"]
-            }
-        ]
-    },
-    {
-        "il": "Gaziantep",
-        "merkezler": [
-            {
-                "ilce": "Sehitkamil",
-                "adres": "Aydinlar Mah. 1. Sinif Atik Getirme Merkezi Sehitkamil / Gaziantep",
-                "not": "Hane ve isyerlerinden atik kabulu icin kurulan merkez",
-                "turler": ["electronic", "paper", "plastic", "glass", "metal", "battery", "oil_fats", "textile"]
-            }
-        ]
-    },
-    {
-        "il": "Aydin",
-        "merkezler": [
-            {
-                "ilce": "Efeler (Merkez)",
-                "adres": "Belediye Hizmet Binasi yani, Cumhuriyet Mah. Efeler / Aydin",
-                "not": "Atik Market ve 1. Sinif Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "glass", "metal", "electronic", "battery", "oil_fats", "textile"]
-            },
-            {
-                "ilce": "Efeler (Ovaeymir)",
-                "adres": "Ovaeymir Mah. 199 Ada 1 Parsel Efeler / Aydin",
-                "not": "Buyuksehir Atik Getirme Merkezi",
-                "turler": ["paper", "plastic", "glass", "metal", "electronic", "battery", "accumulator", "medicine", "oil_fats"]
-            },
-            {
-                "ilce": "Kusadasi",
-                "adres": "Davutlar Mah. Atik Getirme Merkezi Kusadasi / Aydin",
-                "not": "Lisansli merkez; 16 kategoride atik ayristirma",
-                "turler": ["paper", "plastic", "glass", "metal", "textile", "electronic", "battery", "accumulator", "oil_fats", "tire", "wood", "construction"]
-            },
-            {
-                "ilce": "Incirliova",
-                "adres": "Organize Sanayi Bolgesi, Incirliova / Aydin",
-                "not": "Aydin Hurdaci - ozel geri donusum merkezi",
-                "turler": ["metal", "plastic", "paper", "glass", "electronic"]
-            },
-            {
-                "ilce": "Didim",
-                "adres": "Sanayi Bolgesi, Gecici Atik Toplama Noktasi Didim / Aydin",
-                "not": "Mobil atik getirme ve bitkisel atik yag konteynerleri",
-                "turler": ["paper", "plastic", "glass", "metal", "oil_fats", "battery", "electronic"]
-            }
-        ]
-    }
-]
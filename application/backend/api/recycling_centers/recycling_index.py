@@ -0,0 +1,166 @@
+"""
+Versioned in-process cache of recycling center query results.
+
+The catalog lives in the database (api.recycling_centers.catalog); workers
+only keep the results of the queries they have served. `get_index` re-reads
+RecyclingCatalogVersion at most every RECYCLING_CATALOG_CHECK_INTERVAL
+seconds and starts an empty cache when a load has bumped it, so nothing is
+rebuilt up front and a worker never holds the whole catalog.
+
+Cities, districts and center lists are read through the catalog indexes and
+kept JSON-encoded, together with their ETag, in a memo bounded to
+RECYCLING_QUERY_CACHE_SIZE entries, so a repeated query is a dict lookup and
+no serialization. Nearest-center search needs every center's position: the
+k-d tree holds only (lat, lon) and the center id, is built on the first
+nearest query of a catalog version, and the matching centers' details and
+waste types are read from the database.
+"""
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+
+from api.models import RecyclingCenter
+
+from .catalog import center_coordinates, center_rows, city_names, current_version, district_names, filter_centers
+from .spatial import KDTree
+
+# Centers checked per query while filtering nearest candidates by waste type.
+CANDIDATE_CHUNK = 500
+
+
+def encode(data):
+    """JSON bytes as DRF's JSONRenderer would produce them, and their ETag."""
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+
+@dataclass(frozen=True)
+class Payload:
+    data: object
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, data):
+        return cls(data, *encode(data))
+
+
+class RecyclingIndex:
+    """Query results for one catalog version."""
+
+    def __init__(self, version=None):
+        self.version = version
+        # Payload, or None for a query with no result (e.g. an unknown city).
+        self._payloads = {}
+        self._tree = None
+        self._tree_lock = threading.Lock()
+
+    def cities_payload(self):
+        return self._memo(("cities",), city_names)
+
+    def districts_payload(self, city):
+        """Payload of the city's districts, or None when the city is unknown."""
+        return self._memo(("districts", city), lambda: district_names(city) or None)
+
+    def centers_payload(self, city, district=None, waste_types=()):
+        """
+        Payload of the centers in `city` (and `district`) accepting every type
+        in `waste_types`, or None when nothing matches.
+        """
+        def build():
+            queryset = RecyclingCenter.objects.filter(district__city__name=city)
+            if district:
+                queryset = queryset.filter(district__name=district)
+            return [center for _, _, center in center_rows(filter_centers(queryset, waste_types))] or None
+
+        return self._memo(("centers", city, district, tuple(sorted(set(waste_types)))), build)
+
+    def nearest(self, lat, lon, k=5, radius_km=None, waste_types=()):
+        """
+        Up to `k` centers closest to (lat, lon) within `radius_km` that accept
+        every type in `waste_types`, nearest first, each with `il` and
+        `distance_km` added.
+        """
+        tree = self._coordinates()
+        if tree is None:
+            return []
+        # Widen the search until k candidates accept the types or the radius is exhausted.
+        matched, checked, want = [], 0, k
+        while True:
+            hits = tree.nearest(lat, lon, k=want, radius_km=radius_km)
+            new = hits[checked:]
+            accepted = _accepting([i for _, i in new], waste_types) if waste_types else None
+            matched += [(distance, i) for distance, i in new if accepted is None or i in accepted]
+            checked = len(hits)
+            if len(matched) >= k or len(hits) < want:
+                break
+            want *= 4
+        matched = matched[:k]
+
+        rows = {
+            center_id: (city, center)
+            for center_id, city, center in center_rows(RecyclingCenter.objects.filter(pk__in=[i for _, i in matched]))
+        }
+        return [
+            {**rows[i][1], "il": rows[i][0], "distance_km": round(distance, 3)}
+            for distance, i in matched
+            if i in rows
+        ]
+
+    def _coordinates(self) -> Optional[KDTree]:
+        if self._tree is None:
+            with self._tree_lock:
+                if self._tree is None:
+                    points = list(center_coordinates())
+                    self._tree = KDTree([(lat, lon) for _, lat, lon in points], [i for i, _, _ in points])
+        return self._tree if len(self._tree) else None
+
+    def _memo(self, key, build):
+        if key in self._payloads:
+            return self._payloads[key]
+        data = build()
+        payload = None if data is None else Payload.of(data)
+        limit = getattr(settings, "RECYCLING_QUERY_CACHE_SIZE", 2048)
+        while len(self._payloads) >= limit:
+            # Oldest first; another thread may have removed it already.
+            self._payloads.pop(next(iter(self._payloads), None), None)
+        self._payloads[key] = payload
+        return payload
+
+
+def _accepting(center_ids, waste_types):
+    """The ids among `center_ids` of centers accepting every type in `waste_types`."""
+    accepted = set()
+    for start in range(0, len(center_ids), CANDIDATE_CHUNK):
+        queryset = RecyclingCenter.objects.filter(pk__in=center_ids[start:start + CANDIDATE_CHUNK])
+        accepted.update(filter_centers(queryset, waste_types).values_list("id", flat=True))
+    return accepted
+
+
+_lock = threading.Lock()
+_cache = {"index": None, "checked_at": 0.0}
+
+
+def get_index():
+    """The cache for the current catalog version; replaced when a load has bumped it."""
+    interval = getattr(settings, "RECYCLING_CATALOG_CHECK_INTERVAL", 30)
+    index = _cache["index"]
+    if index is not None and time.monotonic() - _cache["checked_at"] < interval:
+        return index
+    version = current_version()
+    with _lock:
+        if _cache["index"] is None or _cache["index"].version != version:
+            _cache["index"] = RecyclingIndex(version)
+        _cache["checked_at"] = time.monotonic()
+        return _cache["index"]
+
+
+def reset_index():
+    """Drop this process's cached results; the next get_index() starts empty."""
+    with _lock:
+        _cache.update(index=None, checked_at=0.0)
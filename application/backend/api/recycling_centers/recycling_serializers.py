@@ -9,6 +9,14 @@ class RecyclingCenterSerializer(serializers.Serializer):
     adres = serializers.CharField(
         help_text="Full street address of the recycling center"
     )
+    lat = serializers.FloatField(
+        required=False,
+        help_text="Approximate latitude of the recycling center (district level)"
+    )
+    lon = serializers.FloatField(
+        required=False,
+        help_text="Approximate longitude of the recycling center (district level)"
+    )
     not_field = serializers.CharField(
         source='not',
         help_text="Additional notes about services, operating hours, or special instructions"
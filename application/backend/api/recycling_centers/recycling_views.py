@@ -4,13 +4,43 @@ from rest_framework.response import Response
 from rest_framework import status
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter, OpenApiExample, inline_serializer
 from rest_framework import serializers
-from .recycling_data import RECYCLING_CENTERS_DATA
+from django.conf import settings
+from api.utils.conditional import if_none_match
+from .recycling_index import get_index
 from .recycling_serializers import RecyclingCenterSerializer, ErrorResponseSerializer
 
 
+class PreRenderedResponse(Response):
+    """
+    Response whose JSON body was encoded ahead of time. `data` is kept for the
+    browsable API and tests; JSON requests get the stored bytes as-is.
+    """
+    def __init__(self, payload, **kwargs):
+        super().__init__(payload.data, **kwargs)
+        self.payload = payload
+
+    @property
+    def rendered_content(self):
+        if getattr(self, 'accepted_renderer', None) is None or self.accepted_renderer.format != 'json':
+            return super().rendered_content
+        self['Content-Type'] = 'application/json'
+        return self.payload.body
+
+
+def cached_response(request, payload):
+    """200 with the pre-encoded payload, or 304 when If-None-Match matches its ETag."""
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": f"public, max-age={getattr(settings, 'RECYCLING_CENTERS_MAX_AGE', 3600)}",
+    }
+    if if_none_match(request, payload.etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return PreRenderedResponse(payload, status=status.HTTP_200_OK, headers=headers)
+
+
 @extend_schema(
     summary="Get all cities with recycling centers",
-    description="Retrieve a list of all cities in Turkey that have registered recycling centers. This endpoint returns city names that can be used to query for districts and recycling centers in subsequent API calls. No authentication is required. Returns an array of city name strings.",
+    description="Retrieve a list of all cities in Turkey that have registered recycling centers. This endpoint returns city names that can be used to query for districts and recycling centers in subsequent API calls. No authentication is required. Returns an array of city name strings. Responses carry an ETag and Cache-Control; a matching If-None-Match returns 304.",
     responses={
         200: OpenApiResponse(
             response=inline_serializer(
@@ -38,8 +68,7 @@ def get_cities(request):
     Get all cities with recycling centers.
     Returns a list of city names.
     """
-    cities = [city_data["il"] for city_data in RECYCLING_CENTERS_DATA]
-    return Response(cities, status=status.HTTP_200_OK)
+    return cached_response(request, get_index().cities_payload())
 
 
 @extend_schema(
@@ -122,25 +151,20 @@ def get_districts(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Find the city data
-    city_data = next((c for c in RECYCLING_CENTERS_DATA if c["il"] == city), None)
-    
-    if not city_data:
+    payload = get_index().districts_payload(city)
+
+    if payload is None:
         return Response(
             {"error": "City not found"},
             status=status.HTTP_404_NOT_FOUND
         )
-    
-    # Extract unique districts
-    districts = list(set([center["ilce"] for center in city_data["merkezler"]]))
-    districts.sort()
-    
-    return Response(districts, status=status.HTTP_200_OK)
+
+    return cached_response(request, payload)
 
 
 @extend_schema(
     summary="Get recycling centers by city and district",
-    description="Retrieve detailed information about recycling centers filtered by city and optionally by district. This is the main endpoint for finding recycling centers. It returns complete center information including addresses, notes about services, and the types of waste accepted at each location. City parameter is required (case-sensitive). District parameter is optional for filtering. Response fields: ilce (district name), adres (full address), not (service notes), turler (array of waste types). Common waste types include: paper, plastic, glass, metal, electronic, battery, textile, wood, medicine, oil_fats, tire, organic, hazardous, bulky, accumulator, fluorescent, construction, cable, it_equipment. Error codes: 400 (missing city parameter), 404 (city/district not found or no centers match filters).",
+    description="Retrieve detailed information about recycling centers filtered by city and optionally by district. This is the main endpoint for finding recycling centers. It returns complete center information including addresses, notes about services, and the types of waste accepted at each location. City parameter is required (case-sensitive). District parameter is optional for filtering, as is waste_type (centers accepting all of the comma-separated types). Responses carry an ETag and Cache-Control; a matching If-None-Match returns 304. Response fields: ilce (district name), adres (full address), not (service notes), turler (array of waste types). Common waste types include: paper, plastic, glass, metal, electronic, battery, textile, wood, medicine, oil_fats, tire, organic, hazardous, bulky, accumulator, fluorescent, construction, cable, it_equipment. Error codes: 400 (missing city parameter), 404 (city/district not found or no centers match filters).",
     parameters=[
         OpenApiParameter(
             name='city',
@@ -165,6 +189,17 @@ def get_districts(request):
                 OpenApiExample('Mamak', value='Mamak'),
                 OpenApiExample('Nilufer', value='Nilufer')
             ]
+        ),
+        OpenApiParameter(
+            name='waste_type',
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description='Only centers accepting this waste type (optional; comma-separate several to require all of them)',
+            required=False,
+            examples=[
+                OpenApiExample('Batteries', value='battery'),
+                OpenApiExample('Glass and metal', value='glass,metal')
+            ]
         )
     ],
     responses={
@@ -259,6 +294,7 @@ def get_recycling_centers(request):
     Get recycling centers filtered by city and optionally by district.
     Requires 'city' query parameter.
     Optional 'district' query parameter for filtering.
+    Optional 'waste_type' query parameter (comma-separated) to keep only centers accepting all given types.
     Returns a list of recycling centers with their details.
     """
     city = request.query_params.get('city')
@@ -270,24 +306,110 @@ def get_recycling_centers(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Find the city data
-    city_data = next((c for c in RECYCLING_CENTERS_DATA if c["il"] == city), None)
-    
-    if not city_data:
+    index = get_index()
+    if index.districts_payload(city) is None:
         return Response(
             {"error": "City not found"},
             status=status.HTTP_404_NOT_FOUND
         )
-    
-    # Filter centers by district if provided
-    centers = city_data["merkezler"]
-    if district:
-        centers = [c for c in centers if c["ilce"] == district]
-    
+
+    waste_types = [t.strip() for t in request.query_params.get('waste_type', '').split(',') if t.strip()]
+    payload = index.centers_payload(city, district, waste_types)
+
+    if payload is None:
+        return Response(
+            {"error": "No recycling centers found for the given filters"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    return cached_response(request, payload)
+
+
+def _float_param(request, name):
+    value = request.query_params.get(name)
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+@extend_schema(
+    summary="Find the nearest recycling centers",
+    description="Return up to `k` recycling centers closest to a point, nearest first, optionally limited to centers accepting every given waste type. Distances are great-circle kilometres from the center's approximate (district-level) coordinates. Each result has the usual center fields plus `il` (city) and `distance_km`. Error codes: 400 (missing or invalid lat/lon, radius or k), 404 (no center within the radius matches the filters).",
+    parameters=[
+        OpenApiParameter(name='lat', type=float, location=OpenApiParameter.QUERY, required=True,
+                         description='Latitude in degrees (-90 to 90)'),
+        OpenApiParameter(name='lon', type=float, location=OpenApiParameter.QUERY, required=True,
+                         description='Longitude in degrees (-180 to 180)'),
+        OpenApiParameter(name='radius', type=float, location=OpenApiParameter.QUERY, required=False,
+                         description='Search radius in km (default 50, max RECYCLING_NEAREST_MAX_RADIUS_KM)'),
+        OpenApiParameter(name='k', type=int, location=OpenApiParameter.QUERY, required=False,
+                         description='Number of centers to return (default 5, max RECYCLING_NEAREST_MAX_K)'),
+        OpenApiParameter(name='waste_type', type=str, location=OpenApiParameter.QUERY, required=False,
+                         description='Only centers accepting this waste type (comma-separate several to require all of them)',
+                         examples=[OpenApiExample('Batteries', value='battery')]),
+    ],
+    responses={
+        200: OpenApiResponse(
+            description="Nearest recycling centers",
+            examples=[
+                OpenApiExample(
+                    'Nearest battery drop-off',
+                    value=[
+                        {
+                            "il": "Istanbul",
+                            "ilce": "Atasehir",
+                            "adres": "Barbaros Mah. Sebboy Sok. No:4 PK:34746 Atasehir / Istanbul",
+                            "lat": 40.983,
+                            "lon": 29.127,
+                            "not": "Elektronik atik toplama kutusu talebi hizmeti mevcut.",
+                            "turler": ["electronic", "battery"],
+                            "distance_km": 10.826
+                        }
+                    ],
+                    response_only=True
+                )
+            ]
+        ),
+        400: OpenApiResponse(response=ErrorResponseSerializer, description="Invalid query parameters"),
+        404: OpenApiResponse(response=ErrorResponseSerializer, description="No recycling centers found for the given filters"),
+    },
+    tags=['Recycling Centers']
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_nearest_recycling_centers(request):
+    """
+    Get the recycling centers closest to 'lat'/'lon'.
+    Optional 'radius' (km), 'k' and 'waste_type' (comma-separated) parameters.
+    """
+    max_radius = getattr(settings, 'RECYCLING_NEAREST_MAX_RADIUS_KM', 1000)
+    max_k = getattr(settings, 'RECYCLING_NEAREST_MAX_K', 50)
+    try:
+        lat = _float_param(request, 'lat')
+        lon = _float_param(request, 'lon')
+        radius = _float_param(request, 'radius')
+        k = int(request.query_params.get('k', 5))
+    except ValueError:
+        return Response({"error": "lat, lon, radius and k must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if lat is None or lon is None:
+        return Response({"error": "lat and lon parameters are required"}, status=status.HTTP_400_BAD_REQUEST)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return Response({"error": "lat must be within [-90, 90] and lon within [-180, 180]"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    radius = 50.0 if radius is None else radius
+    if not 0 < radius <= max_radius:
+        return Response({"error": f"radius must be between 0 and {max_radius} km"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= k <= max_k:
+        return Response({"error": f"k must be between 1 and {max_k}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    waste_types = [t.strip() for t in request.query_params.get('waste_type', '').split(',') if t.strip()]
+    centers = get_index().nearest(lat, lon, k=k, radius_km=radius, waste_types=waste_types)
+
     if not centers:
         return Response(
             {"error": "No recycling centers found for the given filters"},
             status=status.HTTP_404_NOT_FOUND
         )
-    
+
     return Response(centers, status=status.HTTP_200_OK)
@@ -0,0 +1,86 @@
+"""
+k-d tree for nearest recycling center search.
+
+Points are stored as unit vectors on the sphere, so Euclidean (chord)
+distance orders points exactly like great-circle distance and there is no
+special-casing of the antimeridian or the poles. The tree is implicit: points
+are arranged so that the median of every range is its node, and a query is
+a pruned depth-first walk with a bounded max-heap of the best k candidates.
+"""
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+class KDTree:
+    def __init__(self, coordinates, ids):
+        """`coordinates` are (lat, lon) pairs; `ids` the values returned by queries."""
+        items = [(to_unit_vector(lat, lon), item_id) for (lat, lon), item_id in zip(coordinates, ids)]
+        self._arrange(items, 0, len(items), 0)
+        self.points = [point for point, _ in items]
+        self.ids = [item_id for _, item_id in items]
+
+    def __len__(self):
+        return len(self.points)
+
+    @classmethod
+    def _arrange(cls, items, lo, hi, axis):
+        if hi - lo <= 1:
+            return
+        items[lo:hi] = sorted(items[lo:hi], key=lambda item: item[0][axis])
+        mid = (lo + hi) // 2
+        cls._arrange(items, lo, mid, (axis + 1) % 3)
+        cls._arrange(items, mid + 1, hi, (axis + 1) % 3)
+
+    def nearest(self, lat, lon, k=1, radius_km=None, accept=None):
+        """
+        Up to `k` (distance_km, id) pairs closest to (lat, lon), nearest first,
+        within `radius_km` and, when given, for which accept(id) is true.
+        """
+        if k <= 0 or not self.points:
+            return []
+        qx, qy, qz = query = to_unit_vector(lat, lon)
+        limit = km_to_chord(radius_km) ** 2 if radius_km is not None else math.inf
+        points, ids = self.points, self.ids
+        best = []  # max-heap of (-distance², id)
+
+        def bound():
+            return limit if len(best) < k else min(limit, -best[0][0])
+
+        # (lo, hi, axis, lower bound of distance² to any point in the range)
+        stack = [(0, len(points), 0, 0.0)]
+        while stack:
+            lo, hi, axis, min_d2 = stack.pop()
+            if lo >= hi or min_d2 > bound():
+                continue
+            mid = (lo + hi) // 2
+            px, py, pz = point = points[mid]
+            d2 = (px - qx) ** 2 + (py - qy) ** 2 + (pz - qz) ** 2
+            if d2 <= bound() and (accept is None or accept(ids[mid])):
+                if len(best) < k:
+                    heapq.heappush(best, (-d2, ids[mid]))
+                else:
+                    heapq.heapreplace(best, (-d2, ids[mid]))
+            diff = query[axis] - point[axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            next_axis = (axis + 1) % 3
+            # The far side is popped after the near one, and skipped if the
+            # splitting plane is farther away than the kth best by then.
+            stack.append((far[0], far[1], next_axis, max(min_d2, diff * diff)))
+            stack.append((near[0], near[1], next_axis, min_d2))
+        return [(chord_to_km(math.sqrt(-d2)), item_id) for d2, item_id in sorted(best, reverse=True)]
@@ -1,30 +1,25 @@
-from django.db.models import F, Q, Sum
-from django.utils import timezone
+from django.conf import settings
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
-from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from api.models import Posts, Tips, Users
+from api.models import Follow, Posts, Users
 from api.profile.privacy_utils import can_view_waste_stats
-from challenges.models import Challenge
+from api.utils.conditional import if_none_match
+from api.utils.system_stats import active_challenges_queryset as _active_challenges_queryset, get_system_snapshot
+from challenges.models import Challenge, UserChallenge
 from challenges.serializers import ChallengeSerializer
 
 
-def _active_challenges_queryset():
-    """Return challenges that are not completed and not past their deadline."""
-    now = timezone.now()
-    return Challenge.objects.filter(
-        Q(target_amount__isnull=True) | Q(current_progress__lt=F("target_amount"))
-    ).filter(Q(deadline__isnull=True) | Q(deadline__gt=now))
-
-
-
 @extend_schema(
     summary="Get system-wide statistics",
-    description="Aggregate system-wide statistics for tips, posts, challenges, and CO2.",
+    description="Aggregate system-wide statistics for tips, posts, challenges, and CO2. `all_challenges` lists active challenges only (soonest deadline first, capped at STATISTICS_CHALLENGE_LIMIT). The snapshot is cached for a few seconds; responses carry an ETag, and a matching If-None-Match returns 304.",
     responses={
         200: OpenApiResponse(
             response={
@@ -73,6 +68,7 @@ def _active_challenges_queryset():
                 )
             ]
         ),
+        304: OpenApiResponse(description="Not modified (If-None-Match matched the current ETag)"),
         500: OpenApiResponse(description="Internal server error")
     },
     tags=["Statistics"]
@@ -82,32 +78,47 @@ def _active_challenges_queryset():
 def get_system_statistics(request):
     """
     Aggregate system-wide statistics for tips, posts, challenges, and CO2.
+
+    Served from a cached snapshot (see api.utils.system_stats); clients can
+    revalidate with If-None-Match.
     """
     try:
-        active_challenges = _active_challenges_queryset()
-        total_co2 = Users.objects.aggregate(total=Sum("total_co2"))["total"] or 0
-
-        data = {
-            "total_tip_count": Tips.objects.count(),
-            "total_post_count": Posts.objects.count(),
-            "total_active_challenges": active_challenges.count(),
-            "all_challenges": ChallengeSerializer(Challenge.objects.all(), many=True).data,
-            "total_co2": round(total_co2, 4),
+        data, etag = get_system_snapshot()
+        etag = f'"{etag}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={getattr(settings, 'STATISTICS_CACHE_TTL', 30)}",
         }
+        if if_none_match(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
         return Response(
             {"message": "Statistics retrieved successfully", "data": data},
             status=status.HTTP_200_OK,
+            headers=headers,
         )
     except Exception as exc:  # pragma: no cover - defensive catch for API response
         return Response({"error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 
+def _count_subquery(queryset, group_field):
+    """COUNT(*) of `queryset` per outer row, as an annotation."""
+    counted = queryset.order_by().values(group_field).annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counted[:1], output_field=IntegerField()), 0)
+
+
+def _page_link(request, page):
+    return replace_query_param(request.build_absolute_uri(), "page", page)
+
+
 @extend_schema(
     summary="Get statistics for a user",
-    description="Aggregate statistics for a specific user. Tip count remains system-wide because tips are not user-owned.",
-    parameters=[],
+    description="Aggregate statistics for a specific user. Tip count remains system-wide because tips are not user-owned. The user's challenges are paginated (`page`, `page_size`); `challenges_pagination.count` is the total.",
+    parameters=[
+        OpenApiParameter(name='page', type=int, location=OpenApiParameter.QUERY, description='Challenge page number (default: 1)'),
+        OpenApiParameter(name='page_size', type=int, location=OpenApiParameter.QUERY, description='Challenges per page (default: 20, max: 100)'),
+    ],
     responses={
         200: OpenApiResponse(
             response={
@@ -122,6 +133,15 @@ def get_system_statistics(request):
                             'total_post_count': {'type': 'integer'},
                             'total_active_challenges': {'type': 'integer'},
                             'challenges': {'type': 'array', 'items': {'type': 'object'}},
+                            'challenges_pagination': {
+                                'type': 'object',
+                                'properties': {
+                                    'count': {'type': 'integer'},
+                                    'next': {'type': ['string', 'null']},
+                                    'previous': {'type': ['string', 'null']},
+                                    'page_size': {'type': 'integer'},
+                                }
+                            },
                             'total_co2': {'type': ['number', 'null'], 'format': 'float', 'description': 'Visible only if privacy allows'},
                         }
                     }
@@ -184,25 +204,62 @@ def get_user_statistics(request, username):
     """
     Aggregate statistics for a specific user.
     Tip count remains system-wide because tips are not user-owned.
+
+    All per-user counters (and the viewer's follow state) come from one
+    annotated query; the challenge list is paginated.
+    Query parameters:
+    - page: challenge page number (default: 1)
+    - page_size: challenges per page (default: 20, max: 100)
     """
     try:
-        user = Users.objects.get(username=username)
-    except Users.DoesNotExist:
+        page = max(1, int(request.query_params.get('page', 1)))
+        page_size = min(100, max(1, int(request.query_params.get('page_size', 20))))
+    except (TypeError, ValueError):
+        return Response({"error": "page and page_size must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    viewer = request.user if request.user.is_authenticated else None
+    user = (
+        Users.objects.filter(username=username)
+        .annotate(
+            post_count=_count_subquery(Posts.objects.filter(creator=OuterRef("pk")), "creator"),
+            challenge_count=_count_subquery(UserChallenge.objects.filter(user=OuterRef("pk")), "user"),
+            active_challenge_count=_count_subquery(
+                UserChallenge.objects.filter(
+                    user=OuterRef("pk"),
+                    challenge__in=_active_challenges_queryset(),
+                ),
+                "user",
+            ),
+            viewer_follows=Exists(Follow.objects.filter(follower=viewer, following=OuterRef("pk")))
+            if viewer else Value(False),
+        )
+        .first()
+    )
+    if user is None:
         return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
     try:
-        user_challenges = Challenge.objects.filter(userchallenge__user=user).distinct()
-        active_user_challenges = user_challenges.filter(
-            id__in=_active_challenges_queryset().values_list("id", flat=True)
+        offset = (page - 1) * page_size
+        challenges = (
+            Challenge.objects.filter(userchallenge__user=user)
+            .select_related("last_contributor")
+            .order_by("id")[offset:offset + page_size]
         )
 
-        can_view_co2 = can_view_waste_stats(request.user, user)
+        can_view_co2 = can_view_waste_stats(request.user, user, viewer_follows=user.viewer_follows)
+        system, _ = get_system_snapshot()
         data = {
             "username": user.username,
-            "total_tip_count": Tips.objects.count(),
-            "total_post_count": Posts.objects.filter(creator=user).count(),
-            "total_active_challenges": active_user_challenges.count(),
-            "challenges": ChallengeSerializer(user_challenges, many=True).data,
+            "total_tip_count": system["total_tip_count"],
+            "total_post_count": user.post_count,
+            "total_active_challenges": user.active_challenge_count,
+            "challenges": ChallengeSerializer(challenges, many=True, context={"request": request}).data,
+            "challenges_pagination": {
+                "count": user.challenge_count,
+                "next": _page_link(request, page + 1) if offset + page_size < user.challenge_count else None,
+                "previous": _page_link(request, page - 1) if page > 1 else None,
+                "page_size": page_size,
+            },
             "total_co2": round(user.total_co2, 4) if can_view_co2 else None,
         }
 
@@ -0,0 +1,67 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.activities.services.export import iter_event_rows, user_events_queryset
+from api.tests.test_activity_retention import make_event
+
+User = get_user_model()
+
+EXPORT_URL = "/api/user-activity-events/export/"
+
+
+def body(response) -> str:
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+class ActivityExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="exp@example.com", username="exporter", password="pw")
+        self.other = User.objects.create_user(email="other@example.com", username="other", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now()
+        # Includes an event far outside the hot window: exports cover full history.
+        for days in (400, 10, 2, 1):
+            make_event(now - timedelta(days=days), actor_id="exporter", object_id=f"note:{days}")
+        make_event(now, actor_id="other", object_id="note:other")
+
+    def test_keyset_batches_cover_every_row_in_order(self):
+        rows = list(iter_event_rows(user_events_queryset("exporter"), chunk_size=1))
+        self.assertEqual([r["object_id"] for r in rows], ["note:400", "note:10", "note:2", "note:1"])
+
+    def test_ndjson_export_streams_own_history(self):
+        resp = self.client.get(EXPORT_URL)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(l) for l in body(resp).splitlines()]
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all(l["actor_id"] == "exporter" for l in lines))
+
+    def test_as2_export_with_range(self):
+        since = (timezone.now() - timedelta(days=5)).isoformat()
+        resp = self.client.get(EXPORT_URL, {"output": "as2", "since": since})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        doc = json.loads(body(resp))
+        self.assertEqual(doc["type"], "OrderedCollection")
+        self.assertEqual(doc["totalItems"], 2)
+        self.assertEqual([i["object_id"] for i in doc["orderedItems"]], ["note:2", "note:1"])
+
+    def test_rejects_other_users_and_bad_params(self):
+        self.assertEqual(self.client.get(EXPORT_URL, {"username": "other"}).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(EXPORT_URL, {"output": "xml"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(EXPORT_URL, {"since": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_writes_ndjson(self):
+        out = StringIO()
+        call_command("export_activity_events", "--username", "other", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["object_id"], "note:other")
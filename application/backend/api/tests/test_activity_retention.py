@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.activities.services import retention
+from api.activities.services.retention import archive_activity_events, read_archive
+from api.models import ActivityEvent, ActivityEventArchive, Visibility
+
+User = get_user_model()
+
+
+def make_event(published_at, **kwargs) -> ActivityEvent:
+    defaults = {
+        "as2_json": {},
+        "actor_id": "u:alice",
+        "type": "create-post",
+        "object_type": "Note",
+        "object_id": f"note:{uuid.uuid4()}",
+        "visibility": Visibility.PUBLIC,
+        "summary": "hello",
+        "published_at": published_at,
+    }
+    defaults.update(kwargs)
+    return ActivityEvent.objects.create(**defaults)
+
+
+class ActivityRetentionTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        self.now = timezone.now()
+        self.old = make_event(self.now - timedelta(days=400), object_id="note:old")
+        self.recent = make_event(self.now - timedelta(days=1), object_id="note:recent")
+
+    def test_archive_moves_old_months_to_jsonl(self):
+        partitions = archive_activity_events(older_than_days=180, archive_root=self.archive_dir)
+
+        self.assertEqual(len(partitions), 1)
+        self.assertEqual(partitions[0].row_count, 1)
+        self.assertFalse(ActivityEvent.objects.filter(pk=self.old.pk).exists())
+        self.assertTrue(ActivityEvent.objects.filter(pk=self.recent.pk).exists())
+
+        manifest = ActivityEventArchive.objects.get()
+        self.assertEqual(manifest.row_count, 1)
+        rows = list(read_archive(manifest.path))
+        self.assertEqual(rows[0]["object_id"], "note:old")
+        self.assertEqual(rows[0]["id"], str(self.old.pk))
+
+    def test_rows_landing_after_the_archive_is_written_are_kept(self):
+        write_partition = retention._write_partition
+        late = []
+
+        def write_then_backdate(*args):
+            written = write_partition(*args)
+            late.append(make_event(self.old.published_at, object_id="note:late"))
+            return written
+
+        with patch.object(retention, "_write_partition", side_effect=write_then_backdate):
+            archive_activity_events(older_than_days=180, archive_root=self.archive_dir)
+
+        self.assertFalse(ActivityEvent.objects.filter(pk=self.old.pk).exists())
+        self.assertTrue(ActivityEvent.objects.filter(pk=late[0].pk).exists())
+
+        # The next run archives it into a part file for the same month.
+        partitions = archive_activity_events(older_than_days=180, archive_root=self.archive_dir)
+        self.assertEqual([p.row_count for p in partitions], [1])
+        self.assertIn(".part2.", partitions[0].path)
+        self.assertEqual([r["object_id"] for r in read_archive(partitions[0].path)], ["note:late"])
+        self.assertFalse(ActivityEvent.objects.filter(pk=late[0].pk).exists())
+
+    def test_dry_run_keeps_rows(self):
+        partitions = archive_activity_events(older_than_days=180, archive_root=self.archive_dir, dry_run=True)
+
+        self.assertEqual(partitions[0].row_count, 1)
+        self.assertIsNone(partitions[0].path)
+        self.assertTrue(ActivityEvent.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(ActivityEventArchive.objects.exists())
+
+    def test_command_reports_archived_rows(self):
+        out = StringIO()
+        call_command("archive_activity_events", "--days", "180", "--output", self.archive_dir, stdout=out)
+        self.assertIn("Archived 1 event(s) across 1 partition(s)", out.getvalue())
+
+    def test_hot_queryset_excludes_events_outside_window(self):
+        ids = set(ActivityEvent.objects.hot().values_list("object_id", flat=True))
+        self.assertIn("note:recent", ids)
+        self.assertNotIn("note:old", ids)
+
+    @override_settings(ACTIVITY_EVENT_RETENTION_DAYS=30)
+    def test_listing_routes_to_hot_window_unless_range_given(self):
+        admin = User.objects.create_superuser(email="ret_admin@example.com", username="ret_admin", password="pw")
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        resp = client.get("/api/activity-events/", {"actor_id": "u:alice"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([i["object_id"] for i in resp.data["items"]], ["note:recent"])
+
+        since = (self.now - timedelta(days=500)).isoformat()
+        resp = client.get("/api/activity-events/", {"actor_id": "u:alice", "published_at__gte": since})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["totalItems"], 2)
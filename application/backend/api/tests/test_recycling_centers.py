@@ -1,8 +1,19 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from api.models import RecyclingCenter, RecyclingCenterWasteType
+from api.recycling_centers.catalog import current_version
+from api.recycling_centers.recycling_index import get_index, reset_index
+
 
 class RecyclingCentersTests(TestCase):
     """Test suite for recycling centers endpoints"""
@@ -238,3 +249,158 @@ class RecyclingCentersTests(TestCase):
         self.assertIsInstance(center['adres'], str)
         self.assertIsInstance(center['not'], str)
         self.assertIsInstance(center['turler'], list)
+
+    def test_filter_by_waste_type(self):
+        """Test that waste_type keeps only centers accepting every given type"""
+        url = reverse('get_recycling_centers')
+        response = self.client.get(url, {'city': 'Istanbul', 'waste_type': 'battery'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(c['ilce'] for c in response.data), ['Atasehir', 'Beylikduzu'])
+
+        response = self.client.get(url, {'city': 'Istanbul', 'waste_type': 'battery,glass'})
+        self.assertEqual([c['ilce'] for c in response.data], ['Beylikduzu'])
+
+        response = self.client.get(url, {'city': 'Istanbul', 'waste_type': 'tire'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['error'], 'No recycling centers found for the given filters')
+
+    def test_responses_are_cacheable(self):
+        """Test that responses carry ETag/Cache-Control and honour If-None-Match"""
+        url = reverse('get_districts')
+        response = self.client.get(url, {'city': 'Ankara'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), response.data)
+        self.assertIn('max-age', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get(url, {'city': 'Ankara'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(url, {'city': 'Izmir'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_nearest_centers(self):
+        """Test nearest-center search by distance, radius and waste type"""
+        url = reverse('get_nearest_recycling_centers')
+        # Kadikoy, Istanbul
+        response = self.client.get(url, {'lat': 40.99, 'lon': 29.03, 'k': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c['ilce'] for c in response.data], ['Atasehir', 'Sultangazi'])
+        self.assertEqual(response.data[0]['il'], 'Istanbul')
+        self.assertLess(response.data[0]['distance_km'], response.data[1]['distance_km'])
+
+        response = self.client.get(url, {'lat': 40.99, 'lon': 29.03, 'waste_type': 'battery,glass'})
+        self.assertEqual([c['ilce'] for c in response.data], ['Beylikduzu'])
+
+        response = self.client.get(url, {'lat': 40.99, 'lon': 29.03, 'radius': 5})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_nearest_centers_invalid_parameters(self):
+        """Test that nearest-center search validates its parameters"""
+        url = reverse('get_nearest_recycling_centers')
+        for params in ({'lat': 40.99}, {'lat': 'x', 'lon': 29}, {'lat': 95, 'lon': 29},
+                       {'lat': 40, 'lon': 29, 'k': 0}, {'lat': 40, 'lon': 29, 'radius': -1}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn('error', response.data)
+
+
+@override_settings(RECYCLING_CATALOG_CHECK_INTERVAL=0)
+class RecyclingCatalogLoaderTests(TestCase):
+    """Test suite for the recycling center catalog loader"""
+
+    def setUp(self):
+        self.client = APIClient()
+        reset_index()
+        self.addCleanup(reset_index)
+
+    def write(self, suffix, text):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def load(self, path, *args):
+        out = StringIO()
+        call_command('load_recycling_centers', path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_seed_catalog_is_loaded(self):
+        """Test that the migration loaded the former hard-coded centers"""
+        self.assertEqual(RecyclingCenter.objects.count(), 31)
+        self.assertTrue(RecyclingCenterWasteType.objects.filter(waste_type='battery').exists())
+
+    def test_csv_load_is_served_after_version_bump(self):
+        """Test that loaded centers show up in the API and reloads skip known centers"""
+        path = self.write('.csv', (
+            "city,district,address,note,lat,lon,waste_types\n"
+            "Eskisehir,Tepebasi,Sanayi Cad. No:1,Atik Getirme Merkezi,39.79,30.50,paper;glass;battery\n"
+            "Istanbul,Kadikoy,Rihtim Cad. No:2,,40.99,29.02,battery\n"
+        ))
+        version = current_version()
+        self.assertIn("2 created", self.load(path))
+        self.assertEqual(current_version(), version + 1)
+
+        response = self.client.get(reverse('get_cities'))
+        self.assertIn('Eskisehir', response.data)
+        response = self.client.get(reverse('get_districts'), {'city': 'Istanbul'})
+        self.assertIn('Kadikoy', response.data)
+        response = self.client.get(reverse('get_nearest_recycling_centers'), {'lat': 40.99, 'lon': 29.03, 'k': 1})
+        self.assertEqual(response.data[0]['ilce'], 'Kadikoy')
+
+        self.assertIn("0 created, 2 already present", self.load(path))
+
+    def test_jsonl_replace(self):
+        """Test that --replace swaps the whole catalog"""
+        path = self.write('.jsonl', json.dumps({
+            "city": "Mersin", "district": "Yenisehir", "address": "Gazi Mah.", "waste_types": ["metal"],
+        }) + "\n")
+        self.load(path, '--replace')
+
+        self.assertEqual(RecyclingCenter.objects.count(), 1)
+        response = self.client.get(reverse('get_cities'))
+        self.assertEqual(response.data, ['Mersin'])
+
+    def test_invalid_file(self):
+        """Test that malformed records abort the load"""
+        path = self.write('.jsonl', '{"city": "Mersin", "address": "x"}\n')
+        with self.assertRaises(CommandError):
+            self.load(path)
+        self.assertFalse(RecyclingCenter.objects.filter(address='x').exists())
+
+    def test_query_results_are_bounded_and_versioned(self):
+        """Test that workers keep a bounded set of query results per catalog version"""
+        index = get_index()
+        with override_settings(RECYCLING_QUERY_CACHE_SIZE=2):
+            for city in ('Istanbul', 'Ankara', 'Izmir'):
+                self.client.get(reverse('get_districts'), {'city': city})
+            self.assertEqual(len(index._payloads), 2)
+        self.assertIs(get_index(), index)
+
+        path = self.write('.jsonl', json.dumps({
+            "city": "Ankara", "district": "Etimesgut", "address": "Istasyon Cad.", "waste_types": ["glass"],
+        }) + "\n")
+        self.load(path)
+        self.assertIsNot(get_index(), index)
+        response = self.client.get(reverse('get_districts'), {'city': 'Ankara'})
+        self.assertIn('Etimesgut', response.data)
+
+    def test_nearest_widens_the_search_for_waste_types(self):
+        """Test that a waste type accepted only far away is still found"""
+        lines = [
+            json.dumps({"city": "Mersin", "district": f"D{i}", "address": f"A{i}", "lat": 36.8 + i / 1000,
+                        "lon": 34.6, "waste_types": ["paper"]})
+            for i in range(12)
+        ]
+        lines.append(json.dumps({"city": "Mersin", "district": "Far", "address": "Far", "lat": 37.0, "lon": 34.6,
+                                 "waste_types": ["paper", "tire"]}))
+        self.load(self.write('.jsonl', "\n".join(lines) + "\n"), '--replace')
+
+        response = self.client.get(reverse('get_nearest_recycling_centers'),
+                                   {'lat': 36.8, 'lon': 34.6, 'k': 1, 'waste_type': 'tire'})
+        self.assertEqual([c['ilce'] for c in response.data], ['Far'])
+        self.assertEqual(response.data[0]['turler'], ['paper', 'tire'])
@@ -269,3 +269,32 @@ class ActivitySignalTests(TransactionTestCase):
         ev_delete = latest_event_for(object_type="UserChallenge")
         self.assertIsNotNone(ev_delete)
         self.assertEqual(ev_delete.type, "delete-challenge")
+
+    def test_counter_only_saves_do_not_log_update(self):
+        """Saves that only touch counters/totals must not log Update events."""
+        user = self.User.objects.create_user(email="ct1@example.com", password="pw", username="ct1")
+        post = Posts.objects.create(creator=user, text="counted", date=timezone.now())
+
+        post.like_count = 1
+        post.save()
+        user.total_points = 10
+        user.save()
+        self.assertFalse(ActivityEvent.objects.filter(type__in=["update-post", "update-user"]).exists())
+
+        # Reloaded instances are tracked as well
+        post = Posts.objects.get(pk=post.pk)
+        post.text = "edited"
+        post.save()
+        ev_update = latest_event_for(object_type="Note", object_id=str(post.pk))
+        self.assertEqual(ev_update.type, "update-post")
+
+        user.bio = "new bio"
+        user.save(update_fields=["bio"])
+        ev_user = latest_event_for(object_type="Person", object_id=str(user.pk))
+        self.assertEqual(ev_user.type, "update-user")
+
+        # Saving again without changes is a no-op
+        before = ActivityEvent.objects.count()
+        post.save()
+        user.save()
+        self.assertEqual(ActivityEvent.objects.count(), before)
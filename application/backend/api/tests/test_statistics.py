@@ -1,5 +1,9 @@
 from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
+from django.core.cache import cache, caches
+from django.core.management import call_command
 from django.db.models import F, Q, Sum
 from django.test import TestCase
 from django.urls import reverse
@@ -8,12 +12,15 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from api.models import Posts, Tips, Users
+from api.utils.system_stats import CACHE_KEY, TOTAL_CO2, bump
 from challenges.models import Challenge, UserChallenge
 
 
 class StatisticsViewTests(TestCase):
     def setUp(self):
         self.client = APIClient()
+        cache.delete(CACHE_KEY)
+        self.addCleanup(cache.delete, CACHE_KEY)
 
         # Baseline system counts before creating fixtures
         now = timezone.now()
@@ -85,12 +92,76 @@ class StatisticsViewTests(TestCase):
         self.assertEqual(data["total_post_count"], self.baseline_post_count + 3)
         # only the newly created active challenge adds to baseline actives
         self.assertEqual(data["total_active_challenges"], self.baseline_active_challenges + 1)
-        self.assertEqual(len(data["all_challenges"]), Challenge.objects.count())
+        # only active challenges are listed
+        self.assertEqual(len(data["all_challenges"]), self.baseline_active_challenges + 1)
+        self.assertIn(self.active_challenge.id, [c["id"] for c in data["all_challenges"]])
+        self.assertNotIn(self.completed_challenge.id, [c["id"] for c in data["all_challenges"]])
         self.assertEqual(
             data["total_co2"],
             round(self.baseline_total_co2 + self.user1.total_co2 + self.user2.total_co2, 4),
         )
 
+    def test_system_statistics_supports_conditional_get(self):
+        url = reverse("system-statistics")
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertIn("max-age", response["Cache-Control"])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        for header in (f'"other", W/{etag}', "*"):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, header)
+        # A tag that merely contains the current one is not a match.
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"x{etag[1:]}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_counters_follow_signals_and_reconcile(self):
+        url = reverse("system-statistics")
+        self.client.get(url)  # seeds the counters
+
+        Tips.objects.create(title="Tip 3", text="Do Z")
+        Posts.objects.filter(creator=self.user2).delete()
+        self.user2.total_co2 = 2.25
+        self.user2.save()
+        cache.delete(CACHE_KEY)
+
+        data = self.client.get(url).data["data"]
+        self.assertEqual(data["total_tip_count"], Tips.objects.count())
+        self.assertEqual(data["total_post_count"], Posts.objects.count())
+        self.assertEqual(data["total_co2"], round(Users.objects.aggregate(total=Sum("total_co2"))["total"], 4))
+
+        # Writes the signals cannot see are fixed by reconciliation, which runs in
+        # its own container and drops the snapshot through its own cache connection.
+        Users.objects.filter(pk=self.user1.pk).update(total_co2=100)
+        with patch("api.management.commands.reconcile_system_stats.cache", caches.create_connection("default")):
+            call_command("reconcile_system_stats", stdout=StringIO())
+        data = self.client.get(url).data["data"]
+        self.assertEqual(data["total_co2"], round(Users.objects.aggregate(total=Sum("total_co2"))["total"], 4))
+
+    def test_refresh_from_db_does_not_double_count_co2(self):
+        url = reverse("system-statistics")
+        self.client.get(url)  # seeds the counters
+
+        # A queryset UPDATE that bumps the counter itself (as the waste pipeline does).
+        Users.objects.filter(pk=self.user2.pk).update(total_co2=F("total_co2") + 5)
+        bump(TOTAL_CO2, 5)
+        self.user2.refresh_from_db()
+        self.user2.bio = "edited"
+        self.user2.save()
+        cache.delete(CACHE_KEY)
+
+        data = self.client.get(url).data["data"]
+        self.assertEqual(data["total_co2"], round(Users.objects.aggregate(total=Sum("total_co2"))["total"], 4))
+
+    def test_reconcile_command_runs_in_a_loop(self):
+        with patch("api.management.commands.reconcile_system_stats.time.sleep", side_effect=KeyboardInterrupt), \
+                patch("api.management.commands.reconcile_system_stats.reconcile_system_stats", return_value={}) as reconcile:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command("reconcile_system_stats", "--loop", "--poll-interval", "5", stdout=StringIO())
+        reconcile.assert_called_once()
+
     def test_user_statistics_respects_privacy(self):
         url = reverse("user-statistics", kwargs={"username": self.user1.username})
         response = self.client.get(url)
@@ -116,3 +187,27 @@ class StatisticsViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         data = response.data["data"]
         self.assertEqual(data["total_co2"], round(self.user1.total_co2, 4))
+
+    def test_user_statistics_uses_one_counter_query_and_paginates(self):
+        from api.models import Follow
+
+        self.user1.waste_stats_privacy = "followers"
+        self.user1.save(update_fields=["waste_stats_privacy"])
+        Follow.objects.create(follower=self.user2, following=self.user1)
+        self.client.force_authenticate(user=self.user2)
+        url = reverse("user-statistics", kwargs={"username": self.user1.username})
+        self.client.get(url)  # warm the system snapshot cache
+
+        # One annotated user query (counters + follow state) and one challenge page.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"page_size": 2})
+
+        data = response.data["data"]
+        self.assertEqual(data["total_co2"], round(self.user1.total_co2, 4))
+        self.assertEqual(len(data["challenges"]), 2)
+        self.assertEqual(data["challenges_pagination"]["count"], 3)
+        self.assertIsNotNone(data["challenges_pagination"]["next"])
+
+        data = self.client.get(url, {"page_size": 2, "page": 2}).data["data"]
+        self.assertEqual(len(data["challenges"]), 1)
+        self.assertIsNone(data["challenges_pagination"]["next"])
@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import RollupWatermark, Users, UserWastes, Waste, WasteDailyGlobalRollup, WasteDailyRollup
+from api.waste.rollups import fold_new_wastes, rebuild_rollups, waste_series
+from api.waste.waste_views import get_co2_emission, point_coefficients
+
+
+def at(y, m, d, h=12):
+    return datetime(y, m, d, h, tzinfo=dt_timezone.utc)
+
+
+@override_settings(WASTE_ROLLUP_SAFETY_LAG=0)
+class WasteRollupTests(TestCase):
+    def setUp(self):
+        self.plastic, _ = Waste.objects.get_or_create(type='PLASTIC')
+        self.paper, _ = Waste.objects.get_or_create(type='PAPER')
+        self.alice = Users.objects.create_user(username="rollalice", email="ra@example.com", password="pw")
+        self.bob = Users.objects.create_user(username="rollbob", email="rb@example.com", password="pw")
+        self.log(self.alice, self.plastic, 1.0, at(2025, 3, 3))
+        self.log(self.alice, self.plastic, 2.0, at(2025, 3, 3, 18))
+        self.log(self.alice, self.paper, 0.5, at(2025, 3, 5))
+        self.log(self.bob, self.plastic, 4.0, at(2025, 3, 12))
+
+    def log(self, user, waste, amount, when):
+        return UserWastes.objects.create(user=user, waste=waste, amount=amount, date=when)
+
+    def test_fold_builds_user_and_global_buckets_once(self):
+        self.assertEqual(fold_new_wastes(point_coefficients, batch_size=3), 4)
+        self.assertEqual(fold_new_wastes(point_coefficients), 0)
+
+        bucket = WasteDailyRollup.objects.get(user=self.alice, day=date(2025, 3, 3), waste_type='PLASTIC')
+        self.assertEqual((bucket.amount, bucket.entries), (3.0, 2))
+        self.assertAlmostEqual(bucket.co2, get_co2_emission(1.0, 'PLASTIC') + get_co2_emission(2.0, 'PLASTIC'))
+        self.assertAlmostEqual(bucket.points, 3.0 * point_coefficients['PLASTIC'])
+        self.assertEqual(WasteDailyGlobalRollup.objects.get(day=date(2025, 3, 3), waste_type='PLASTIC').amount, 3.0)
+
+        # New rows are folded into the existing buckets.
+        self.log(self.bob, self.plastic, 1.0, at(2025, 3, 3))
+        self.assertEqual(fold_new_wastes(point_coefficients), 1)
+        self.assertEqual(WasteDailyGlobalRollup.objects.get(day=date(2025, 3, 3), waste_type='PLASTIC').entries, 3)
+        self.assertEqual(RollupWatermark.objects.get().last_id, UserWastes.objects.latest('id').id)
+
+    def test_rows_committed_late_below_the_watermark_are_folded(self):
+        now = at(2025, 4, 1)
+        paper = UserWastes.objects.get(waste=self.paper)
+        late_id = paper.id
+        paper.delete()  # frees an id below the current maximum
+        highest = UserWastes.objects.latest('id').id
+
+        # The first pass only records the current maximum id as the candidate.
+        self.assertEqual(fold_new_wastes(point_coefficients, lag=60, now=now), 0)
+        # A transaction that held the lower id commits after the maximum was seen.
+        UserWastes.objects.create(id=late_id, user=self.alice, waste=self.paper, amount=0.5, date=at(2025, 3, 5))
+        self.log(self.bob, self.paper, 1.0, at(2025, 3, 12))
+
+        self.assertEqual(fold_new_wastes(point_coefficients, lag=60, now=now + timedelta(seconds=30)), 0)
+        self.assertEqual(fold_new_wastes(point_coefficients, lag=60, now=now + timedelta(seconds=61)), 4)
+        self.assertEqual(RollupWatermark.objects.get().last_id, highest)
+        self.assertTrue(WasteDailyRollup.objects.filter(user=self.alice, waste_type='PAPER').exists())
+        # The row above the old candidate is folded on a later pass.
+        self.assertEqual(fold_new_wastes(point_coefficients, lag=60, now=now + timedelta(seconds=122)), 1)
+
+    def test_series_by_granularity(self):
+        fold_new_wastes(point_coefficients)
+
+        days = waste_series(date(2025, 3, 3), date(2025, 3, 5), 'day', user=self.alice)
+        self.assertEqual([d['amount'] for d in days], [3.0, 0, 0.5])
+
+        weeks = waste_series(date(2025, 3, 1), date(2025, 3, 16), 'week')
+        self.assertEqual([w['period'] for w in weeks], ['2025-02-24', '2025-03-03', '2025-03-10'])
+        self.assertEqual([w['amount'] for w in weeks], [0, 3.5, 4.0])
+
+        months = waste_series(date(2025, 1, 15), date(2025, 3, 31), 'month', waste_type='PLASTIC')
+        self.assertEqual([(m['period'], m['entries']) for m in months],
+                         [('2025-01-01', 0), ('2025-02-01', 0), ('2025-03-01', 3)])
+
+    def test_rebuild_recomputes_from_day(self):
+        fold_new_wastes(point_coefficients)
+        UserWastes.objects.filter(user=self.bob).delete()
+
+        rebuild_rollups(point_coefficients, date(2025, 3, 10))
+
+        self.assertFalse(WasteDailyRollup.objects.filter(user=self.bob).exists())
+        self.assertEqual(WasteDailyRollup.objects.filter(user=self.alice).count(), 2)
+
+    def test_series_endpoint(self):
+        call_command('build_waste_rollups', stdout=StringIO())
+        client = APIClient()
+        url = '/api/waste/series/'
+
+        response = client.get(url, {'start': '2025-03-01', 'end': '2025-03-31'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = client.get(url, {'scope': 'global', 'granularity': 'month', 'start': '2025-03-01', 'end': '2025-03-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['series'][0]['amount'], 7.5)
+
+        client.force_authenticate(user=self.alice)
+        response = client.get(url, {'granularity': 'week', 'start': '2025-03-03', 'end': '2025-03-09'})
+        self.assertEqual(response.data['data']['series'][0]['entries'], 3)
+
+        response = client.get(url, {'start': '2020-01-01', 'end': '2025-12-31'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
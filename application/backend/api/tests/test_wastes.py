@@ -1,10 +1,14 @@
 from decimal import Decimal
 from email.mime import image
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIRequestFactory, force_authenticate, APIClient
 from rest_framework import status
-from api.models import Users, Waste, UserWastes
+from api.models import ActivityEvent, Achievements, UserAchievements, Users, Waste, UserWastes, WasteLogEvent
 from challenges.models import Challenge, UserChallenge
+from challenges.progress import advance_challenge_progress
+from api.waste.pipeline import process_waste_events, retry_failed_events
 from api.waste.waste_views import create_user_waste, get_user_wastes, get_top_users, point_coefficients,get_co2_emission
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
@@ -635,6 +639,7 @@ class WasteViewsTests(TestCase):
         self.assertGreaterEqual(len(response.data['data']), 1)
 
 
+@override_settings(WASTE_EVENTS_PROCESS_ON_COMMIT=True)
 class WasteChallengeProgressionTests(TestCase):
     """Test cases for challenge progression when logging waste"""
     
@@ -711,11 +716,12 @@ class WasteChallengeProgressionTests(TestCase):
         """
         self.client.force_authenticate(user=self.user)
         
-        # Log waste
-        response = self.client.post('/api/waste/', {
-            'waste_type': 'PLASTIC',
-            'amount': 10.0
-        }, format='json')
+        # Log waste (challenge progress is applied once the log commits)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/waste/', {
+                'waste_type': 'PLASTIC',
+                'amount': 10.0
+            }, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
@@ -739,11 +745,12 @@ class WasteChallengeProgressionTests(TestCase):
         self.challenge1.current_progress = 100
         self.challenge1.save()
         
-        # Log waste
-        response = self.client.post('/api/waste/', {
-            'waste_type': 'PLASTIC',
-            'amount': 15.0
-        }, format='json')
+        # Log waste (challenge progress is applied once the log commits)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/waste/', {
+                'waste_type': 'PLASTIC',
+                'amount': 15.0
+            }, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
@@ -771,11 +778,12 @@ class WasteChallengeProgressionTests(TestCase):
         self.challenge2.current_progress = 100
         self.challenge2.save()
         
-        # Log waste
-        response = self.client.post('/api/waste/', {
-            'waste_type': 'PLASTIC',
-            'amount': 20.0
-        }, format='json')
+        # Log waste (challenge progress is applied once the log commits)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/waste/', {
+                'waste_type': 'PLASTIC',
+                'amount': 20.0
+            }, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
@@ -804,11 +812,12 @@ class WasteChallengeProgressionTests(TestCase):
         self.challenge3.current_progress = 100
         self.challenge3.save()
         
-        # Log waste
-        response = self.client.post('/api/waste/', {
-            'waste_type': 'PLASTIC',
-            'amount': 25.0
-        }, format='json')
+        # Log waste (challenge progress is applied once the log commits)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/waste/', {
+                'waste_type': 'PLASTIC',
+                'amount': 25.0
+            }, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
@@ -843,11 +852,12 @@ class WasteChallengeProgressionTests(TestCase):
             self.challenge1.reward = reward
             self.challenge1.save()
         
-        # Log enough waste to complete the challenge
-        response = self.client.post('/api/waste/', {
-            'waste_type': 'PLASTIC',
-            'amount': 10.0
-        }, format='json')
+        # Log enough waste to complete the challenge (challenge progress is applied once the log commits)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/waste/', {
+                'waste_type': 'PLASTIC',
+                'amount': 10.0
+            }, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
@@ -861,4 +871,302 @@ class WasteChallengeProgressionTests(TestCase):
         
         # Check that challenge is marked as complete
         self.challenge1.refresh_from_db()
-        self.assertEqual(self.challenge1.current_progress, 100)
\ No newline at end of file
+        self.assertEqual(self.challenge1.current_progress, 100)
+
+    def test_completion_awards_all_participants_in_bulk(self):
+        """
+        Completing a challenge awards every participant (skipping existing holders)
+        with a number of queries that does not grow with participant count.
+        """
+        reward = Achievements.objects.create(title="Bulk reward")
+        self.challenge1.reward = reward
+        self.challenge1.current_progress = 90
+        self.challenge1.save()
+
+        others = [
+            Users.objects.create_user(username=f"part{i}", email=f"part{i}@example.com", password="pw")
+            for i in range(30)
+        ]
+        for user in others:
+            UserChallenge.objects.create(user=user, challenge=self.challenge1, joined_date=timezone.now())
+        UserAchievements.objects.create(user=others[0], achievement=reward, earned_at=timezone.now())
+
+        with CaptureQueriesContext(connection) as queries:
+            result = advance_challenge_progress(self.user, 25.0)
+
+        self.assertLess(len(queries), len(others))
+        self.assertTrue(result.completed)
+        self.assertEqual(result.awarded, 30)
+        self.assertEqual(UserAchievements.objects.filter(achievement=reward).count(), 31)
+        self.challenge1.refresh_from_db()
+        self.assertEqual(self.challenge1.current_progress, 100)
+        self.challenge2.refresh_from_db()
+        self.assertEqual(self.challenge2.current_progress, 0)
+
+
+class WasteLogPipelineTests(TestCase):
+    """The request path stores the log and totals; the rest runs from WasteLogEvent."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Users.objects.create_user(
+            username="pipeuser",
+            email="pipe@example.com",
+            password="testpass123",
+            total_points=0,
+            total_co2=0
+        )
+        Waste.objects.get_or_create(type='PLASTIC')
+        self.challenge = Challenge.objects.create(
+            title="Pipeline Challenge",
+            description="",
+            is_public=True,
+            target_amount=100,
+            current_progress=0,
+            creator=self.user
+        )
+        UserChallenge.objects.create(user=self.user, challenge=self.challenge, joined_date=timezone.now())
+        self.client.force_authenticate(user=self.user)
+
+    def _log(self, amount):
+        return self.client.post('/api/waste/', {'waste_type': 'PLASTIC', 'amount': amount}, format='json')
+
+    def test_log_records_event_and_totals_in_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._log(10.0)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.user.refresh_from_db()
+        self.assertAlmostEqual(self.user.total_points, 10.0 * point_coefficients['PLASTIC'])
+        event = WasteLogEvent.objects.get(user=self.user)
+        self.assertEqual(event.user_waste_id, response.data['data']['id'])
+        # Nothing downstream runs in the request; the worker picks the event up.
+        self.assertIsNone(event.processed_at)
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.current_progress, 0)
+
+    def test_worker_processes_pending_events_per_user(self):
+        self._log(10.0)
+        self._log(5.0)
+
+        processed, failed = process_waste_events()
+
+        self.assertEqual((processed, failed), (2, 0))
+        self.assertFalse(WasteLogEvent.objects.filter(processed_at__isnull=True).exists())
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.current_progress, 15.0)
+        self.assertEqual(
+            ActivityEvent.objects.filter(actor_id=self.user.username, object_type="UserWaste").count(), 2
+        )
+        # Processed events are not claimed again.
+        self.assertEqual(process_waste_events(), (0, 0))
+
+    def test_failing_consumer_is_retried_alone(self):
+        self._log(10.0)
+
+        with patch('api.waste.pipeline.advance_challenge_progress', side_effect=RuntimeError("boom")):
+            processed, failed = process_waste_events()
+
+        self.assertEqual((processed, failed), (0, 1))
+        event = WasteLogEvent.objects.get(user=self.user)
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn("boom", event.last_error)
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        # Badges and activity went through; only the challenge step is pending.
+        self.assertEqual((event.challenges_done, event.badges_done, event.activity_done), (False, True, True))
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.current_progress, 0)
+
+        WasteLogEvent.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_waste_events(), (1, 0))
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.current_progress, 10.0)
+        self.assertEqual(ActivityEvent.objects.filter(object_type="UserWaste").count(), 1)
+
+    def test_contended_progress_is_retried(self):
+        self._log(10.0)
+        Challenge.objects.filter(pk=self.challenge.pk).update(current_progress=F('target_amount'))
+
+        # Every UPDATE misses, as if concurrent logs kept winning the row.
+        with patch('challenges.progress.first_incomplete_challenge', return_value=(self.challenge.id, 100.0)):
+            self.assertEqual(process_waste_events(), (0, 1))
+        event = WasteLogEvent.objects.get(user=self.user)
+        self.assertFalse(event.challenges_done)
+        self.assertIn("gave up after", event.last_error)
+
+        Challenge.objects.filter(pk=self.challenge.pk).update(current_progress=0)
+        WasteLogEvent.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_waste_events(), (1, 0))
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.current_progress, 10.0)
+
+    @override_settings(WASTE_EVENTS_MAX_ATTEMPTS=1)
+    def test_events_out_of_attempts_are_marked_failed(self):
+        self._log(10.0)
+
+        with patch('api.waste.pipeline.check_and_award_badges', side_effect=RuntimeError("boom")), \
+                self.assertLogs('api.waste.pipeline', level='ERROR'):
+            self.assertEqual(process_waste_events(), (0, 1))
+
+        event = WasteLogEvent.objects.get(user=self.user)
+        self.assertIsNotNone(event.failed_at)
+        WasteLogEvent.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_waste_events(), (0, 0))
+
+        self.assertEqual(retry_failed_events(), 1)
+        self.assertEqual(process_waste_events(), (1, 0))
+
+
+@override_settings(WASTE_EVENTS_PROCESS_ON_COMMIT=True)
+class BulkWasteImportTests(TestCase):
+    """POST /api/waste/bulk/ validates rows together and applies side effects once."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Users.objects.create_user(
+            username="bulkuser",
+            email="bulk@example.com",
+            password="testpass123",
+            total_points=0,
+            total_co2=0
+        )
+        Waste.objects.get_or_create(type='PLASTIC')
+        Waste.objects.get_or_create(type='PAPER')
+        self.challenge = Challenge.objects.create(
+            title="Bulk Challenge",
+            description="",
+            is_public=True,
+            target_amount=100,
+            current_progress=0,
+            creator=self.user
+        )
+        UserChallenge.objects.create(user=self.user, challenge=self.challenge, joined_date=timezone.now())
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_import_creates_rows_and_applies_one_delta(self):
+        entries = [{'waste_type': 'PLASTIC', 'amount': 1.0} for _ in range(20)]
+        entries.append({'waste_type': 'PAPER', 'amount': 2.0, 'date': '2025-01-05T10:00:00Z'})
+
+        with patch('api.waste.pipeline.advance_challenge_progress', wraps=advance_challenge_progress) as advance, \
+                patch('api.waste.pipeline.check_and_award_badges') as badges:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/api/waste/bulk/', {'entries': entries}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 21)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(UserWastes.objects.filter(user=self.user).count(), 21)
+        self.assertEqual(advance.call_count, 1)
+        self.assertEqual(badges.call_count, 1)
+        self.assertFalse(WasteLogEvent.objects.filter(processed_at__isnull=True).exists())
+
+        self.user.refresh_from_db()
+        expected = 20 * point_coefficients['PLASTIC'] + 2.0 * point_coefficients['PAPER']
+        self.assertAlmostEqual(self.user.total_points, expected)
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.current_progress, 22.0)
+        paper = UserWastes.objects.get(user=self.user, waste__type='PAPER')
+        self.assertEqual(paper.date.year, 2025)
+
+    def test_bulk_import_reads_ids_back_without_returning(self):
+        """MySQL path: bulk_create leaves pks unset and the new ids are read back."""
+        earlier = self.client.post('/api/waste/', {'waste_type': 'PLASTIC', 'amount': 9.0}, format='json')
+        entries = [{'waste_type': 'PLASTIC', 'amount': float(i + 1)} for i in range(5)]
+
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/waste/bulk/', {'entries': entries}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([row['amount'] for row in response.data['data']], [1.0, 2.0, 3.0, 4.0, 5.0])
+        events = WasteLogEvent.objects.filter(batch_id__isnull=False).select_related('user_waste')
+        self.assertEqual(len(events), 5)
+        for event in events:
+            self.assertNotEqual(event.user_waste_id, earlier.data['data']['id'])
+            self.assertEqual(event.user_waste.amount, event.amount)
+        # The user row is locked (totals UPDATE) before the floor is read.
+        sql = [q['sql'] for q in queries.captured_queries]
+        lock = next(i for i, q in enumerate(sql) if q.startswith('UPDATE "Users"'))
+        insert = next(i for i, q in enumerate(sql) if q.startswith('INSERT INTO "UserWastes"'))
+        self.assertLess(lock, insert)
+
+    def test_bulk_import_reports_row_errors(self):
+        entries = [
+            {'waste_type': 'PLASTIC', 'amount': 1.5},
+            {'waste_type': 'WOOD', 'amount': 1.0},
+            {'waste_type': 'PAPER', 'amount': -2},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/waste/bulk/', {'entries': entries}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1, 2])
+        self.assertEqual(UserWastes.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_import_rejects_empty_or_oversized_batches(self):
+        response = self.client.post('/api/waste/bulk/', {'entries': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.settings(WASTE_BULK_MAX_ENTRIES=2):
+            response = self.client.post('/api/waste/bulk/', {
+                'entries': [{'waste_type': 'PLASTIC', 'amount': 1}] * 3
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserWastes.objects.filter(user=self.user).exists())
+
+
+class RecomputeUserTotalsTests(TestCase):
+    """recompute_user_totals rebuilds totals from UserWastes with the current factors."""
+
+    def setUp(self):
+        self.plastic, _ = Waste.objects.get_or_create(type='PLASTIC')
+        self.paper, _ = Waste.objects.get_or_create(type='PAPER')
+        self.users = [
+            Users.objects.create_user(username=f"recompute{i}", email=f"recompute{i}@example.com", password="pw")
+            for i in range(3)
+        ]
+        for user in self.users[:2]:
+            UserWastes.objects.create(user=user, waste=self.plastic, amount=2.0)
+            UserWastes.objects.create(user=user, waste=self.paper, amount=1.5)
+
+    def expected(self):
+        points = 2.0 * point_coefficients['PLASTIC'] + 1.5 * point_coefficients['PAPER']
+        co2 = get_co2_emission(2.0, 'PLASTIC') + get_co2_emission(1.5, 'PAPER')
+        return points, co2
+
+    def test_recompute_fixes_drift_and_resets_users_without_logs(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        Users.objects.filter(pk=self.users[0].pk).update(total_points=1, total_co2=0)
+        Users.objects.filter(pk=self.users[2].pk).update(total_points=7, total_co2=3)
+        points, co2 = self.expected()
+        Users.objects.filter(pk=self.users[1].pk).update(total_points=points, total_co2=co2)
+
+        out = StringIO()
+        call_command('recompute_user_totals', '--chunk-size', '2', stdout=out)
+
+        self.assertIn("2 drifted", out.getvalue())
+        for user, (exp_points, exp_co2) in zip(self.users, [(points, co2), (points, co2), (0, 0)]):
+            user.refresh_from_db()
+            self.assertAlmostEqual(user.total_points, exp_points)
+            self.assertAlmostEqual(user.total_co2, exp_co2)
+
+    def test_dry_run_and_id_range(self):
+        from api.waste.recompute import recompute_user_totals
+
+        Users.objects.filter(pk__in=[u.pk for u in self.users]).update(total_points=0, total_co2=0)
+
+        report = recompute_user_totals(point_coefficients, dry_run=True)
+        self.assertEqual(report.users_changed, 2)
+        self.users[0].refresh_from_db()
+        self.assertEqual(self.users[0].total_points, 0)
+
+        report = recompute_user_totals(point_coefficients, start_id=self.users[1].pk, end_id=self.users[2].pk)
+        self.assertEqual((report.users_scanned, report.users_changed), (1, 1))
+        self.users[0].refresh_from_db()
+        self.users[1].refresh_from_db()
+        self.assertEqual(self.users[0].total_points, 0)
+        self.assertAlmostEqual(self.users[1].total_points, self.expected()[0])
@@ -3,7 +3,7 @@ from django.urls import path
 
 from api.invite import invite_views
 # Import JWT token views from rest_framework_simplejwt
-from .activities.views.user_activity_view import UserActivityEventsView
+from .activities.views.user_activity_view import UserActivityEventsView, UserActivityEventsExportView
 from .activities.views.following_activity_view import FollowingActivityEventsView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 from .login_and_signup import login_views
@@ -23,7 +23,7 @@ from .recycling_centers import recycling_views
 from . import statistics_views
 
 # Import notificaion views for notification endpoints
-from notifications.views import NotificationListView, NotificationMarkReadView, NotificationMarkAllReadView
+from notifications.views import NotificationListView, NotificationMarkReadView, NotificationMarkAllReadView, NotificationUnreadCountView
 
 # URL patterns for all API endpoints
 urlpatterns = [
@@ -144,6 +144,8 @@ urlpatterns = [
     
     # POST: Log a new waste entry for the current user (recycling tracking)
     path("api/waste/", waste_views.create_user_waste, name="create_user_waste"),
+    # POST: Log many waste entries at once (offline sync); per-row errors are returned by index
+    path("api/waste/bulk/", waste_views.bulk_create_user_wastes, name="bulk_create_user_wastes"),
     
     # GET: Retrieve the top 10 users based on their waste recycling metrics
     path("api/waste/leaderboard/", waste_views.get_top_users, name="get_top_users"),
@@ -152,6 +154,8 @@ urlpatterns = [
     path("api/waste/get/", waste_views.get_user_wastes, name="get_user_wastes"),
     # GET: Retrieve a user's waste entries (privacy-aware)
     path("api/waste/user/<str:username>/", waste_views.get_user_wastes_by_username, name="get_user_wastes_by_username"),
+    # GET: Waste/CO2 per day, week or month from the daily rollups (scope=me|global)
+    path("api/waste/series/", waste_views.get_waste_series, name="get_waste_series"),
 
       # POST: Report suspicious waste item with description and image
     path("api/waste/report_suspicious/", waste_views.create_suspicious_waste, name="create_suspicious_waste"),
@@ -208,6 +212,7 @@ urlpatterns = [
     path("api/notifications/", NotificationListView.as_view(), name="list-notifications"),
     path("api/notifications/<int:notification_id>/read/", NotificationMarkReadView.as_view(), name="mark-notification-read"),
     path("api/notifications/read-all/", NotificationMarkAllReadView.as_view(), name="mark-all-notifications-read"),
+    path("api/notifications/unread-count/", NotificationUnreadCountView.as_view(), name="notifications-unread-count"),
 
     # Badge System Endpoints
     # ----------------------------------------
@@ -238,6 +243,8 @@ urlpatterns = [
     #get activity events
     path("api/activity-events/", ActivityEventViewSet.as_view({'get': 'list'}), name="activity-event-list"),
     path("api/user-activity-events/", UserActivityEventsView.as_view(), name="user-activity-events"),
+    # GET: Stream a user's full activity history as NDJSON or an AS2 collection
+    path("api/user-activity-events/export/", UserActivityEventsExportView.as_view(), name="user-activity-events-export"),
     path("api/following-activity-events/", FollowingActivityEventsView.as_view(), name="following-activity-events"),
 
     path("api/invite/send/", invite_views.send_invitation_email, name="send_invitation_email"),
@@ -253,4 +260,7 @@ urlpatterns = [
     
     # GET: Retrieve recycling centers by city and optionally by district
     path("api/recycling-centers/", recycling_views.get_recycling_centers, name="get_recycling_centers"),
+
+    # GET: Retrieve the recycling centers nearest to a point
+    path("api/recycling-centers/nearest/", recycling_views.get_nearest_recycling_centers, name="get_nearest_recycling_centers"),
 ]
@@ -12,7 +12,8 @@ def award_badges_on_waste_entry(sender, instance, created, **kwargs):
     """
     Check and award badges when a user logs waste.
     """
-    if created:
+    # Pipeline writes are evaluated once per batch by the WasteLogEvent consumer.
+    if created and not instance.defer_side_effects:
         check_and_award_badges(instance.user)
 
 
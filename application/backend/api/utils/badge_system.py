@@ -8,6 +8,7 @@ from api.models import (
     Users, Badges, UserBadges, UserWastes,
     Posts, Tips, PostLikes, TipLikes
 )
+from notifications.models import Notification
 from notifications.utils import send_notification
 
 
@@ -93,7 +94,8 @@ def check_and_award_badges(user):
             # Send notification for badge earned
             send_notification(
                 user=user,
-                message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!"
+                message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!",
+                category=Notification.BADGE
             )
     
     # Check total waste badges
@@ -113,7 +115,8 @@ def check_and_award_badges(user):
         # Send notification for badge earned
         send_notification(
             user=user,
-            message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!"
+            message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!",
+            category=Notification.BADGE
         )
     
     # Check contribution badges
@@ -133,7 +136,8 @@ def check_and_award_badges(user):
         # Send notification for badge earned
         send_notification(
             user=user,
-            message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!"
+            message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!",
+            category=Notification.BADGE
         )
     
     # Check likes received badges
@@ -153,7 +157,8 @@ def check_and_award_badges(user):
         # Send notification for badge earned
         send_notification(
             user=user,
-            message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!"
+            message=f"🎉 Congratulations! You've earned the {badge.get_level_display()} {badge.get_category_display()} badge!",
+            category=Notification.BADGE
         )
     
     return newly_awarded
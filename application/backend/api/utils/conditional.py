@@ -0,0 +1,20 @@
+"""
+Conditional GET helpers for endpoints that set their own ETag.
+"""
+from django.utils.http import parse_etags
+
+
+def _opaque(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def if_none_match(request, etag):
+    """
+    True when the request's If-None-Match header matches `etag`: "*", or any
+    listed tag equal to it under weak comparison (W/ prefixes ignored).
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
@@ -0,0 +1,125 @@
+"""
+System statistics snapshot for the public /api/statistics/ endpoint.
+
+Tip count, post count and total CO2 are kept in sharded SystemStatCounter
+rows: model signals (and the waste pipeline, which updates totals with
+queryset UPDATEs) add deltas to a random slot, and `reconcile_system_stats`
+periodically resets the counters from the source tables. Slot 0 holds the
+reconciled base; a counter without one is reconciled on first read.
+
+The assembled snapshot (counters, active challenges) is cached for
+STATISTICS_CACHE_TTL seconds together with an ETag for conditional GETs.
+"""
+import hashlib
+import json
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from api.models import Posts, SystemStatCounter, Tips, Users
+
+TIPS = "tips"
+POSTS = "posts"
+TOTAL_CO2 = "total_co2"
+
+SOURCES = {
+    TIPS: lambda: Tips.objects.count(),
+    POSTS: lambda: Posts.objects.count(),
+    TOTAL_CO2: lambda: Users.objects.aggregate(total=Sum("total_co2"))["total"] or 0,
+}
+
+CACHE_KEY = "system-statistics:snapshot"
+
+
+def _slots():
+    return getattr(settings, "STATISTICS_COUNTER_SLOTS", 8)
+
+
+def bump(name, delta):
+    """Add `delta` to counter `name` (runs in the caller's transaction)."""
+    if not delta:
+        return
+    slot = random.randint(1, _slots())
+    rows = SystemStatCounter.objects.filter(name=name, slot=slot)
+    if rows.update(value=F("value") + delta):
+        return
+    try:
+        with transaction.atomic():
+            SystemStatCounter.objects.create(name=name, slot=slot, value=delta)
+    except IntegrityError:
+        # Another writer created the slot first.
+        rows.update(value=F("value") + delta)
+
+
+def reconcile_system_stats(names=None):
+    """
+    Reset counters to the values computed from the source tables.
+    Returns {name: (counted, actual)} so callers can report drift.
+    """
+    result = {}
+    for name in names or SOURCES:
+        with transaction.atomic():
+            # Lock the existing slots first so bumps made while we count wait.
+            rows = list(SystemStatCounter.objects.select_for_update().filter(name=name))
+            counted = sum(row.value for row in rows)
+            actual = float(SOURCES[name]())
+            SystemStatCounter.objects.filter(name=name).exclude(slot=0).delete()
+            SystemStatCounter.objects.update_or_create(name=name, slot=0, defaults={"value": actual})
+        result[name] = (counted, actual)
+    return result
+
+
+def read_counters():
+    totals, seeded = {}, set()
+    for name, slot, value in SystemStatCounter.objects.values_list("name", "slot", "value"):
+        totals[name] = totals.get(name, 0) + value
+        if slot == 0:
+            seeded.add(name)
+    missing = [name for name in SOURCES if name not in seeded]
+    if missing:
+        for name, (_, actual) in reconcile_system_stats(missing).items():
+            totals[name] = actual
+    return totals
+
+
+def active_challenges_queryset():
+    """Return challenges that are not completed and not past their deadline."""
+    from challenges.listing import active_challenges
+
+    return active_challenges()
+
+
+def build_snapshot():
+    from challenges.serializers import ChallengeSerializer
+
+    counters = read_counters()
+    active = active_challenges_queryset()
+    limit = getattr(settings, "STATISTICS_CHALLENGE_LIMIT", 50)
+    return {
+        "total_tip_count": int(counters.get(TIPS, 0)),
+        "total_post_count": int(counters.get(POSTS, 0)),
+        "total_active_challenges": active.count(),
+        # Soonest deadlines first; challenges without one come last.
+        "all_challenges": [
+            dict(row) for row in ChallengeSerializer(
+                active.select_related("last_contributor")
+                .order_by(F("deadline").asc(nulls_last=True), "id")[:limit],
+                many=True,
+            ).data
+        ],
+        "total_co2": round(counters.get(TOTAL_CO2, 0), 4),
+    }
+
+
+def get_system_snapshot():
+    """(data, etag) for the statistics endpoint, served from the cache when fresh."""
+    cached = cache.get(CACHE_KEY)
+    if cached is not None:
+        return cached
+    data = build_snapshot()
+    etag = hashlib.md5(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    cache.set(CACHE_KEY, (data, etag), getattr(settings, "STATISTICS_CACHE_TTL", 30))
+    return data, etag
@@ -0,0 +1,54 @@
+"""
+Signals keeping the system statistics counters up to date
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.activities.utils.field_tracker import FieldTracker
+from api.models import Posts, Tips, Users
+from api.utils.system_stats import POSTS, TIPS, TOTAL_CO2, bump
+
+co2_tracker = FieldTracker(Users, ["total_co2"], name="system_stats")
+
+
+@receiver(post_save, sender=Tips, dispatch_uid="system_stats_tip_created")
+def count_tip_created(sender, instance, created, **kwargs):
+    if created:
+        bump(TIPS, 1)
+
+
+@receiver(post_delete, sender=Tips, dispatch_uid="system_stats_tip_deleted")
+def count_tip_deleted(sender, instance, **kwargs):
+    bump(TIPS, -1)
+
+
+@receiver(post_save, sender=Posts, dispatch_uid="system_stats_post_created")
+def count_post_created(sender, instance, created, **kwargs):
+    if created:
+        bump(POSTS, 1)
+
+
+@receiver(post_delete, sender=Posts, dispatch_uid="system_stats_post_deleted")
+def count_post_deleted(sender, instance, **kwargs):
+    bump(POSTS, -1)
+
+
+@receiver(post_save, sender=Users, dispatch_uid="system_stats_user_co2")
+def track_user_co2(sender, instance, created, **kwargs):
+    """
+    Apply instance saves that change total_co2. Queryset updates (the waste
+    pipeline, recompute_user_totals) bump the counter themselves.
+    """
+    previous = 0.0 if created else co2_tracker.previous(instance, "total_co2")
+    if not co2_tracker.pop_changes(instance, kwargs.get("update_fields")) and not created:
+        return
+    current = instance.total_co2
+    # F() expressions and unknown old values are left to reconciliation.
+    if isinstance(current, (int, float)) and isinstance(previous, (int, float)):
+        bump(TOTAL_CO2, current - previous)
+
+
+@receiver(post_delete, sender=Users, dispatch_uid="system_stats_user_deleted")
+def count_user_deleted(sender, instance, **kwargs):
+    if isinstance(instance.total_co2, (int, float)):
+        bump(TOTAL_CO2, -instance.total_co2)
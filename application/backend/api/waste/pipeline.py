@@ -0,0 +1,257 @@
+"""
+Staged write path for waste logs.
+
+`record_waste_log` is what the request does: it stores the UserWastes row,
+applies the points/CO2 delta to the user's totals and records a
+WasteLogEvent, all in one short transaction. Everything else is applied
+after commit by `process_waste_events`, in batches and per user:
+
+  1. challenges    - advance challenge progress once per log (or bulk import), in order
+  2. badges        - one check_and_award_badges() per user per batch
+  3. activity      - one bulk insert of "logged waste" ActivityEvents
+  4. notifications - challenge/badge notifications go through the outbox
+
+Each consumer (challenges, badges, activity) runs in its own savepoint and
+sets its own done-marker on the events, so a failing consumer rolls back
+only its own work and is the only one retried, with backoff. Events that
+fail WASTE_EVENTS_MAX_ATTEMPTS times are marked failed (dead-lettered) and
+logged; `process_waste_events --retry-failed` queues them again.
+
+By default the request only records the event and the worker does the rest;
+WASTE_EVENTS_PROCESS_ON_COMMIT runs it in the request thread after commit
+instead (for tests and local development without the worker).
+"""
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.activities.utils.event_writer import EventWriter
+from api.models import UserWastes, Users, Visibility, WasteLogEvent
+from api.utils.badge_system import check_and_award_badges
+from api.utils.system_stats import TOTAL_CO2, bump
+from challenges.progress import advance_challenge_progress
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _add_to_totals(user, points, co2_emission):
+    Users.objects.filter(pk=user.pk).update(
+        total_points=F('total_points') + points,
+        total_co2=F('total_co2') + co2_emission,
+    )
+    bump(TOTAL_CO2, co2_emission)
+
+
+def record_waste_log(serializer, user, points, co2_emission):
+    """
+    Save the validated waste serializer for `user` together with the totals
+    delta and the domain event. Returns the UserWastes instance.
+    """
+    with transaction.atomic():
+        # Totals first: the UPDATE row-locks the user before the insert, which
+        # record_waste_batch relies on to read its new ids back.
+        _add_to_totals(user, points, co2_emission)
+        waste_record = serializer.save(user=user, defer_side_effects=True)
+        event = WasteLogEvent.objects.create(user=user, user_waste=waste_record, amount=waste_record.amount)
+
+    if _setting("WASTE_EVENTS_PROCESS_ON_COMMIT", False):
+        # Runs after the atomic block above has committed (or at the end of
+        # the outer transaction); a failure here leaves the event for the worker.
+        transaction.on_commit(lambda: process_waste_events(event_ids=[event.id]))
+    return waste_record
+
+
+def record_waste_batch(user, entries, points, co2_emission):
+    """
+    Bulk variant of `record_waste_log` for offline sync. `entries` are
+    validated dicts with `waste`, `amount` and optional `date`; `points` and
+    `co2_emission` are the batch totals. The rows share one batch_id, so the
+    pipeline advances challenge progress once with their summed amount.
+    Returns the created UserWastes instances, in entry order.
+    """
+    now = timezone.now()
+    batch_id = uuid.uuid4()
+    with transaction.atomic():
+        # The totals UPDATE row-locks the user until commit. Both write paths
+        # take that lock before inserting, so no other log for this user can
+        # land between reading the floor and reading the new ids back.
+        _add_to_totals(user, points, co2_emission)
+        floor = UserWastes.objects.filter(user=user).order_by('-id').values_list('id', flat=True).first() or 0
+        created = UserWastes.objects.bulk_create(
+            [
+                UserWastes(user=user, waste=e['waste'], amount=e['amount'], date=e.get('date') or now)
+                for e in entries
+            ],
+            batch_size=500,
+        )
+        if created and created[0].pk is None:
+            # Backends without INSERT ... RETURNING (MySQL) don't set pks; this
+            # user's new rows are the ones above the previous maximum, in insert order.
+            ids = list(
+                UserWastes.objects.filter(user=user, id__gt=floor).order_by('id').values_list('id', flat=True)
+            )
+            if len(ids) != len(created):
+                raise RuntimeError(f"Expected {len(created)} new waste rows for user {user.pk}, found {len(ids)}")
+            for waste_record, pk in zip(created, ids):
+                waste_record.pk = waste_record.id = pk
+
+        WasteLogEvent.objects.bulk_create(
+            [
+                WasteLogEvent(user=user, user_waste_id=w.id, amount=w.amount, batch_id=batch_id)
+                for w in created
+            ],
+            batch_size=500,
+        )
+
+    if _setting("WASTE_EVENTS_PROCESS_ON_COMMIT", False):
+        def process_batch():
+            ids = list(WasteLogEvent.objects.filter(batch_id=batch_id).values_list('id', flat=True))
+            process_waste_events(batch_size=len(ids), event_ids=ids)
+        transaction.on_commit(process_batch)
+    return created
+
+
+def claim_events(batch_size, lease_seconds=60, event_ids=None, now=None):
+    """Lease up to `batch_size` due events, oldest first."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        # of=("self",): lock the event rows only, not the joined user rows.
+        qs = WasteLogEvent.objects.select_for_update(skip_locked=True, of=("self",)).filter(
+            processed_at__isnull=True, failed_at__isnull=True, next_attempt_at__lte=now
+        )
+        if event_ids is not None:
+            qs = qs.filter(id__in=event_ids)
+        events = list(qs.select_related("user").order_by("id")[:batch_size])
+        if events:
+            WasteLogEvent.objects.filter(id__in=[e.id for e in events]).update(
+                next_attempt_at=now + timedelta(seconds=lease_seconds)
+            )
+    return events
+
+
+def _should_publish(user):
+    # Same rule as activity_signals.should_publish_waste_and_achievements().
+    return not user.is_anonymous and getattr(user, "waste_stats_privacy", "public") == "public"
+
+
+def _advance_challenges(user, events):
+    # One progress step per single log, one per bulk import. ProgressContention
+    # propagates, so the events are retried with backoff like any other error.
+    for _, group in groupby(events, key=lambda e: e.batch_id or e.id):
+        advance_challenge_progress(user, sum(e.amount for e in group))
+
+
+def _award_badges(user, events):
+    check_and_award_badges(user)
+
+
+def _log_activity(user, events):
+    if not _should_publish(user):
+        return
+    EventWriter.log_events([
+        dict(
+            activity_type="Create",
+            actor_id=user.username,
+            object_type="UserWaste",
+            object_id=str(event.user_waste_id),
+            summary=f"User {user.username} logged waste of amount {event.amount} kg",
+            visibility=Visibility.PUBLIC,
+        )
+        for event in events
+    ])
+
+
+# (done-marker field, consumer), applied in this order.
+CONSUMERS = (
+    ("challenges_done", _advance_challenges),
+    ("badges_done", _award_badges),
+    ("activity_done", _log_activity),
+)
+
+
+def _apply_user_events(user, events):
+    """
+    Run every consumer over the events it has not handled yet. Returns the
+    first consumer error, or None once all of them are done.
+    """
+    error = None
+    for marker, consume in CONSUMERS:
+        pending = [e for e in events if not getattr(e, marker)]
+        if not pending:
+            continue
+        try:
+            with transaction.atomic():
+                consume(user, pending)
+                WasteLogEvent.objects.filter(id__in=[e.id for e in pending]).update(**{marker: True})
+        except Exception as e:
+            error = error or e
+            continue
+        for event in pending:
+            setattr(event, marker, True)
+
+    if error is None:
+        WasteLogEvent.objects.filter(id__in=[e.id for e in events]).update(
+            processed_at=timezone.now(), last_error=""
+        )
+    return error
+
+
+def _record_failure(events, error):
+    base = _setting("WASTE_EVENTS_BACKOFF_BASE", 5)
+    max_attempts = _setting("WASTE_EVENTS_MAX_ATTEMPTS", 5)
+    now = timezone.now()
+    for event in events:
+        event.attempts += 1
+        event.last_error = f"{type(error).__name__}: {error}"[:1000]
+        event.next_attempt_at = now + timedelta(seconds=base * (2 ** (event.attempts - 1)))
+        if event.attempts >= max_attempts:
+            event.failed_at = now
+            logger.error(
+                "Waste event %s (user %s) failed %s time(s); giving up: %s",
+                event.id, event.user_id, event.attempts, event.last_error,
+            )
+    WasteLogEvent.objects.bulk_update(events, ["attempts", "last_error", "next_attempt_at", "failed_at"])
+
+
+def retry_failed_events():
+    """Queue dead-lettered events again with a fresh attempt budget. Returns how many."""
+    return WasteLogEvent.objects.filter(processed_at__isnull=True, failed_at__isnull=False).update(
+        failed_at=None, attempts=0, next_attempt_at=timezone.now()
+    )
+
+
+def process_waste_events(batch_size=None, event_ids=None):
+    """
+    Process one batch of pending waste-log events.
+    Returns (processed, failed) event counts.
+    """
+    batch_size = batch_size or _setting("WASTE_EVENTS_BATCH_SIZE", 500)
+    events = claim_events(batch_size, event_ids=event_ids)
+
+    by_user = OrderedDict()
+    for event in events:
+        by_user.setdefault(event.user_id, []).append(event)
+
+    processed = failed = 0
+    for user_events in by_user.values():
+        try:
+            error = _apply_user_events(user_events[0].user, user_events)
+        except Exception as e:
+            error = e
+        if error is None:
+            processed += len(user_events)
+        else:
+            _record_failure(user_events, error)
+            failed += len(user_events)
+    return processed, failed
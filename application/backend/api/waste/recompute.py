@@ -0,0 +1,108 @@
+"""
+Recompute Users.total_points / total_co2 from UserWastes.
+
+The totals are accumulated incrementally on every waste log, so they go stale
+when LOCAL_EMISSION_FACTORS or point_coefficients change. This rebuilds them
+with one grouped aggregate per chunk of users; the current factors are
+inlined into the query as CASE expressions over the waste type.
+
+Each chunk is read and written in one short transaction: the users' stored
+totals and the aggregate come from the same snapshot, and the write applies
+only the difference (total = total + drift), so waste logged concurrently is
+never lost. Only the chunk's own rows are touched.
+"""
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Round
+
+from api.models import Users, UserWastes
+from api.utils.system_stats import TOTAL_CO2, bump
+from carbon.factors import get_factor_table
+
+
+@dataclass
+class RecomputeReport:
+    users_scanned: int = 0
+    users_changed: int = 0
+    points_drift: float = 0.0
+    co2_drift: float = 0.0
+    last_id: int = 0
+    # (abs points drift, abs co2 drift, user id), largest first
+    worst: List[Tuple[float, float, int]] = field(default_factory=list)
+
+
+def _per_type(factors, value):
+    return Case(
+        *[When(waste__type=waste_type, then=value(factor)) for waste_type, factor in factors.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def totals_expressions(point_coefficients):
+    """(points, co2) aggregate expressions for the current factor tables."""
+    table = get_factor_table()
+    co2_factors = {t: table.waste_factor(t) for t in point_coefficients.keys() | table.waste_factors.keys()}
+    points = Sum(_per_type(point_coefficients, lambda c: F('amount') * c))
+    # Per-row rounding matches what get_co2_emission() added on each log.
+    co2 = Sum(_per_type(co2_factors, lambda f: Round(F('amount') * f, table.decimals)))
+    return points, co2
+
+
+def recompute_user_totals(point_coefficients, start_id=None, end_id=None, chunk_size=1000,
+                          tolerance=1e-6, dry_run=False, keep_worst=10):
+    """
+    Recompute totals for users with start_id <= id < end_id (all when None).
+    Disjoint id ranges can run in parallel processes.
+    """
+    points_expr, co2_expr = totals_expressions(point_coefficients)
+    report = RecomputeReport()
+    users = Users.objects.order_by('id')
+    if end_id is not None:
+        users = users.filter(id__lt=end_id)
+    cursor = start_id - 1 if start_id is not None else None
+
+    while True:
+        chunk_users = users.filter(id__gt=cursor) if cursor is not None else users
+        with transaction.atomic():
+            rows = list(chunk_users.values_list('id', 'total_points', 'total_co2')[:chunk_size])
+            if not rows:
+                return report
+            first, last = rows[0][0], rows[-1][0]
+            sums = {
+                row['user_id']: (row['points'] or 0.0, row['co2'] or 0.0)
+                for row in UserWastes.objects.filter(user_id__gte=first, user_id__lte=last)
+                .values('user_id')
+                .annotate(points=points_expr, co2=co2_expr)
+                .order_by()
+            }
+
+            changed = []
+            chunk_co2_drift = 0.0
+            for user_id, stored_points, stored_co2 in rows:
+                points, co2 = sums.get(user_id, (0.0, 0.0))
+                d_points, d_co2 = points - stored_points, co2 - stored_co2
+                if abs(d_points) <= tolerance and abs(d_co2) <= tolerance:
+                    continue
+                report.points_drift += d_points
+                report.co2_drift += d_co2
+                chunk_co2_drift += d_co2
+                report.worst.append((abs(d_points), abs(d_co2), user_id))
+                changed.append(Users(
+                    id=user_id,
+                    total_points=F('total_points') + d_points,
+                    total_co2=F('total_co2') + d_co2,
+                ))
+
+            if changed and not dry_run:
+                Users.objects.bulk_update(changed, ['total_points', 'total_co2'], batch_size=chunk_size)
+                bump(TOTAL_CO2, chunk_co2_drift)
+
+        report.users_scanned += len(rows)
+        report.users_changed += len(changed)
+        report.last_id = last
+        report.worst = sorted(report.worst, reverse=True)[:keep_worst]
+        cursor = last
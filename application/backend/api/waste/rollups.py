@@ -0,0 +1,213 @@
+"""
+Daily waste rollups for charts and recaps.
+
+`fold_new_wastes` folds UserWastes rows with id above the "waste_daily"
+watermark into WasteDailyRollup (user, type, day) and WasteDailyGlobalRollup
+(type, day) buckets, one grouped aggregate per id window, and advances the
+watermark in the same transaction, so every row is counted exactly once.
+Ids are allocated at INSERT but become visible at COMMIT, so the watermark
+only moves up to the highest id seen WASTE_ROLLUP_SAFETY_LAG seconds ago;
+a slower transaction holding a lower id would otherwise be skipped for good.
+`rebuild_rollups` recomputes buckets from a given day on (after factor
+changes or deleted logs). `waste_series` answers day/week/month series for a
+date range by summing at most a few thousand buckets, whatever the size of
+UserWastes.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from api.models import RollupWatermark, UserWastes, WasteDailyGlobalRollup, WasteDailyRollup
+
+from .recompute import totals_expressions
+
+WATERMARK = "waste_daily"
+GRANULARITIES = ("day", "week", "month")
+_FIELDS = ("amount", "co2", "points", "entries")
+
+
+def _aggregate(wastes, point_coefficients):
+    points_expr, co2_expr = totals_expressions(point_coefficients)
+    return (
+        wastes.annotate(day=TruncDate("date"))
+        .values("user_id", "waste__type", "day")
+        # Aliased so F("amount") inside the factor expressions still means the row's amount.
+        .annotate(sum_amount=Sum("amount"), sum_co2=co2_expr, sum_points=points_expr, sum_entries=Count("id"))
+        .order_by()
+    )
+
+
+def _upsert(model, key_fields, deltas):
+    """Add `deltas` ({key tuple: {field: value}}) to existing buckets, creating missing ones."""
+    if not deltas:
+        return
+    lookup = {f"{field}__in": {key[i] for key in deltas} for i, field in enumerate(key_fields)}
+    existing = {
+        tuple(getattr(row, f) for f in key_fields): row
+        for row in model.objects.select_for_update().filter(**lookup)
+    }
+    to_update, to_create = [], []
+    for key, values in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            to_create.append(model(**dict(zip(key_fields, key)), **values))
+            continue
+        for field, value in values.items():
+            setattr(row, field, getattr(row, field) + value)
+        to_update.append(row)
+    model.objects.bulk_update(to_update, _FIELDS, batch_size=1000)
+    model.objects.bulk_create(to_create, batch_size=1000)
+
+
+def _fold(groups):
+    per_user = {}
+    per_day = defaultdict(lambda: dict.fromkeys(_FIELDS, 0))
+    for g in groups:
+        values = {f: g[f"sum_{f}"] or 0 for f in _FIELDS}
+        per_user[(g["user_id"], g["day"], g["waste__type"])] = values
+        bucket = per_day[(g["day"], g["waste__type"])]
+        for f in _FIELDS:
+            bucket[f] += values[f]
+    _upsert(WasteDailyRollup, ("user_id", "day", "waste_type"), per_user)
+    _upsert(WasteDailyGlobalRollup, ("day", "waste_type"), dict(per_day))
+
+
+def _safe_ceiling(lag, now):
+    """
+    Highest id that can be folded now: the largest id observed at least `lag`
+    seconds ago (every transaction that held a lower id has finished by then).
+    Records the current largest id as the next candidate.
+    """
+    with transaction.atomic():
+        mark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        latest = UserWastes.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        if lag <= 0:
+            return latest
+        ceiling = mark.last_id
+        seen_at = mark.pending_seen_at
+        if seen_at is not None and seen_at <= now - timedelta(seconds=lag):
+            ceiling = max(ceiling, mark.pending_id)
+            seen_at = None
+        if seen_at is None:
+            mark.pending_id, mark.pending_seen_at = latest, now
+            mark.save(update_fields=["pending_id", "pending_seen_at"])
+        return ceiling
+
+
+def fold_new_wastes(point_coefficients, batch_size=5000, lag=None, now=None):
+    """
+    Fold rows above the watermark, up to the safe ceiling, into the buckets.
+    Returns the number of rows folded.
+    """
+    if lag is None:
+        lag = getattr(settings, "WASTE_ROLLUP_SAFETY_LAG", 60)
+    ceiling = _safe_ceiling(lag, now or timezone.now())
+    folded = 0
+    while True:
+        with transaction.atomic():
+            # Locking the watermark row also keeps two jobs from folding the same window.
+            mark = RollupWatermark.objects.select_for_update().get(name=WATERMARK)
+            ids = list(
+                UserWastes.objects.filter(id__gt=mark.last_id, id__lte=ceiling)
+                .order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return folded
+            window = UserWastes.objects.filter(id__gt=mark.last_id, id__lte=ids[-1])
+            _fold(_aggregate(window, point_coefficients))
+            mark.last_id = ids[-1]
+            mark.save(update_fields=["last_id", "updated_at"])
+        folded += len(ids)
+        if len(ids) < batch_size:
+            return folded
+
+
+def rebuild_rollups(point_coefficients, since, batch_size=5000):
+    """
+    Recompute all buckets from day `since` on, for rows up to the watermark
+    (rows above it are left to fold_new_wastes). Returns the rows re-folded.
+
+    Each chunk commits on its own, so the tables are not locked for the
+    whole rebuild; until it finishes, buckets from `since` on are partial,
+    and an interrupted rebuild must be run again.
+    """
+    start = datetime.combine(since, time.min, tzinfo=dt_timezone.utc)
+    with transaction.atomic():
+        mark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        WasteDailyRollup.objects.filter(day__gte=since).delete()
+        WasteDailyGlobalRollup.objects.filter(day__gte=since).delete()
+    # Later folds only add rows above this id, so they never overlap the rebuild.
+    rows = UserWastes.objects.filter(date__gte=start, id__lte=mark.last_id)
+    folded = 0
+    cursor = 0
+    while True:
+        ids = list(rows.filter(id__gt=cursor).order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return folded
+        with transaction.atomic():
+            _fold(_aggregate(rows.filter(id__gt=cursor, id__lte=ids[-1]), point_coefficients))
+        folded += len(ids)
+        cursor = ids[-1]
+
+
+def _period_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(day, granularity):
+    if granularity == "week":
+        return day + timedelta(days=7)
+    if granularity == "month":
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return day + timedelta(days=1)
+
+
+def waste_series(start, end, granularity="day", user=None, waste_type=None):
+    """
+    Buckets for start..end (inclusive dates), one per period and zero-filled.
+    Weeks start on Monday. `user=None` reads the global rollup.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if user is None:
+        buckets = WasteDailyGlobalRollup.objects.all()
+    else:
+        buckets = WasteDailyRollup.objects.filter(user=user)
+    buckets = buckets.filter(day__gte=start, day__lte=end)
+    if waste_type:
+        buckets = buckets.filter(waste_type=waste_type)
+
+    totals = defaultdict(lambda: dict.fromkeys(_FIELDS, 0))
+    daily = buckets.values("day").annotate(**{f: Sum(f) for f in _FIELDS}).order_by()
+    for row in daily:
+        bucket = totals[_period_start(row["day"], granularity)]
+        for f in _FIELDS:
+            bucket[f] += row[f] or 0
+
+    series = []
+    period = _period_start(start, granularity)
+    while period <= end:
+        values = totals.get(period, dict.fromkeys(_FIELDS, 0))
+        series.append({
+            "period": period.isoformat(),
+            "amount": round(values["amount"], 4),
+            "co2": round(values["co2"], 4),
+            "points": round(values["points"], 4),
+            "entries": values["entries"],
+        })
+        period = _next_period(period, granularity)
+    return series
+
+
+def rollup_updated_at():
+    mark = RollupWatermark.objects.filter(name=WATERMARK).only("updated_at").first()
+    return mark.updated_at if mark else None
@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 from ..models import Waste, UserWastes
 
@@ -17,10 +18,40 @@ class UserWasteSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         waste_type = validated_data.pop('waste_type')
+        defer_side_effects = validated_data.pop('defer_side_effects', False)
         waste = Waste.objects.filter(type=waste_type.upper()).first()
         if not waste:
             raise serializers.ValidationError(f"Invalid waste type: {waste_type}")
-        return UserWastes.objects.create(
+        user_waste = UserWastes(
             waste=waste,
             **validated_data
-        )
\ No newline at end of file
+        )
+        user_waste.defer_side_effects = defer_side_effects
+        user_waste.save(force_insert=True)
+        return user_waste
+
+class BulkWasteEntrySerializer(serializers.Serializer):
+    """
+    One row of a bulk waste import. Expects `wastes` (type -> Waste) in the
+    context so a whole batch is validated without per-row queries.
+    """
+    waste_type = serializers.ChoiceField(choices=Waste.WASTE_TYPES)
+    amount = serializers.FloatField()
+    date = serializers.DateTimeField(required=False)
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Amount must be greater than zero.")
+        return value
+
+    def validate_date(self, value):
+        if value > timezone.now():
+            raise serializers.ValidationError("Date cannot be in the future.")
+        return value
+
+    def validate(self, attrs):
+        waste = self.context['wastes'].get(attrs['waste_type'].upper())
+        if waste is None:
+            raise serializers.ValidationError({'waste_type': f"Invalid waste type: {attrs['waste_type']}"})
+        attrs['waste'] = waste
+        return attrs
@@ -2,18 +2,21 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from .waste_serializer import UserWasteSerializer
+from .waste_serializer import UserWasteSerializer, BulkWasteEntrySerializer
 from django.core.exceptions import ObjectDoesNotExist
-from ..models import SuspiciousWaste, UserWastes, Waste, Users, UserAchievements
+from ..models import SuspiciousWaste, UserWastes, Waste, Users
 from api.profile.privacy_utils import can_view_waste_stats
 from api.profile.anonymity_utils import display_name_for_viewer, can_show_profile_image
-from challenges.models import UserChallenge
+from .pipeline import record_waste_log, record_waste_batch
+from .rollups import GRANULARITIES, rollup_updated_at, waste_series
+from carbon.factors import waste_co2, waste_co2_batch
+from datetime import date, timedelta
 from django.db.models import Sum, F
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter, OpenApiExample
 import requests
 from django.utils import timezone
 from rest_framework.permissions import IsAdminUser
-from notifications.utils import send_notification, send_bulk_notifications
+from notifications.utils import send_notification
 
 
 # Point coefficients for different waste types
@@ -30,7 +33,7 @@ point_coefficients = {
 
 @extend_schema(
     summary="Log waste disposal",
-    description="Record waste disposal for the authenticated user. Automatically calculates points and CO2 emissions, updates user totals, and progresses the first joined incomplete challenge (oldest by joined_date). Awards achievements when challenges are completed.",
+    description="Record waste disposal for the authenticated user. Automatically calculates points and CO2 emissions and updates user totals. Progress on the first joined incomplete challenge (oldest by joined_date) and achievements for completed challenges are applied asynchronously by the waste event worker after the response, so they may not be visible immediately.",
     request=UserWasteSerializer,
     responses={
         201: OpenApiResponse(
@@ -71,68 +74,17 @@ def create_user_waste(request):
     serializer = UserWasteSerializer(data=request.data)
     
     try:
-        if serializer.is_valid():            # Save the waste record
-            waste_record = serializer.save(user=request.user)
-            logged_amount = waste_record.amount
-            waste_type = waste_record.waste.type
+        if serializer.is_valid():
+            waste_type = serializer.validated_data['waste_type'].upper()
+            logged_amount = serializer.validated_data['amount']
 
             # Calculate CO2 and points for this waste
             co2_emission = get_co2_emission(logged_amount, waste_type)
             points = logged_amount * point_coefficients.get(waste_type, 0)
 
-            # Update user's total points and CO2 using F() to prevent race conditions
-            request.user.total_points = F('total_points') + points
-            request.user.total_co2 = F('total_co2') + co2_emission
-            request.user.save()
-
-            # Get the challenges the user is participating in, ordered by joined_date (oldest first)
-            user_challenges = UserChallenge.objects.filter(user=request.user).order_by('joined_date')
-
-            # Only progress the first challenge (oldest joined, not yet completed)
-            first_incomplete_challenge = None
-            for user_challenge in user_challenges:
-                challenge = user_challenge.challenge
-                # Check if this challenge is not yet completed
-                if challenge.current_progress < challenge.target_amount:
-                    first_incomplete_challenge = challenge
-                    break
-            
-            # Update only the first incomplete challenge
-            if first_incomplete_challenge:
-                challenge = first_incomplete_challenge
-                challenge.current_progress = F('current_progress') + logged_amount # F expression ensures that the update is atomic
-                challenge.save() # Save the F expression to the database
-
-                # Refresh the challenge instance to get the updated value
-                challenge.refresh_from_db()
-
-                # Distribute achievements if challenge is completed
-                if challenge.current_progress >= challenge.target_amount:
-
-                    challenge.current_progress = challenge.target_amount
-
-                    # fetch all users that are participating in the challenge
-                    users_in_challenge = UserChallenge.objects.filter(challenge=challenge).values_list('user', flat=True)
-                    participants = Users.objects.filter(id__in=users_in_challenge)
-                    
-                    for user_instance in participants:
-
-                        # assert that challenge.reward exists
-                        if challenge.reward is None:
-                            raise ObjectDoesNotExist("Challenge reward does not exist. The reward achievement should be automatically generated in our new API, so this is likely a server issue.")
-
-                        # Check if the achievement already exists for the user
-                        if not UserAchievements.objects.filter(user=user_instance, achievement=challenge.reward).exists():
-                            # Create achievement for the user
-                            UserAchievements.objects.create(user=user_instance, achievement=challenge.reward, earned_at=timezone.now())
-                    
-                    # Send notifications to all participants about challenge completion
-                    send_bulk_notifications(
-                        participants,
-                        f"🎉 Challenge '{challenge.title}' completed! You've earned the achievement '{challenge.reward.title}'!"
-                    )
-
-                    challenge.save()
+            # Save the record, the totals delta and a WasteLogEvent in one short
+            # transaction; challenge progress, badges and activity run after commit.
+            record_waste_log(serializer, request.user, points, co2_emission)
 
             # Refresh user object to get actual values after F() expressions
             request.user.refresh_from_db()
@@ -159,6 +111,107 @@ def create_user_waste(request):
         )
 
 
+@extend_schema(
+    summary="Bulk log waste disposal",
+    description="Record many waste entries in one request (e.g. offline sync from the mobile app). Rows are validated together; valid rows are inserted in bulk, user totals are updated once, and challenge progress and badges are evaluated once for the whole batch. Invalid rows are reported per index and do not block the valid ones.",
+    request={
+        'application/json': {
+            'type': 'object',
+            'properties': {
+                'entries': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'waste_type': {'type': 'string', 'enum': ['PLASTIC', 'PAPER', 'GLASS', 'METAL', 'ELECTRONIC', 'OIL&FATS', 'ORGANIC']},
+                            'amount': {'type': 'number', 'format': 'float'},
+                            'date': {'type': 'string', 'format': 'date-time', 'description': 'When the waste was logged offline (defaults to now)'},
+                        },
+                        'required': ['waste_type', 'amount'],
+                    },
+                }
+            },
+            'required': ['entries'],
+        }
+    },
+    responses={
+        201: OpenApiResponse(description="All entries recorded"),
+        207: OpenApiResponse(description="Some entries recorded; `errors` lists the rejected rows by index"),
+        400: OpenApiResponse(description="Bad request - no valid entries, or the batch is empty or too large"),
+        401: OpenApiResponse(description="Unauthorized - authentication required"),
+        500: OpenApiResponse(description="Internal server error")
+    },
+    examples=[
+        OpenApiExample(
+            'Partial success',
+            value={
+                'message': '2 of 3 waste entries recorded',
+                'created': 2,
+                'data': [
+                    {'id': 16, 'type': 'PLASTIC', 'amount': 1.5, 'date': '2025-11-20T09:00:00Z'},
+                    {'id': 17, 'type': 'PAPER', 'amount': 0.4, 'date': '2025-11-21T18:30:00Z'}
+                ],
+                'errors': [
+                    {'index': 2, 'errors': {'amount': ['Amount must be greater than zero.']}}
+                ]
+            },
+            response_only=True,
+        )
+    ],
+    tags=['Waste Management']
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_user_wastes(request):
+    """
+    Create many waste records for the authenticated user in one request.
+
+    Required POST data:
+    - entries: list of {waste_type, amount, date (optional)}
+    """
+    entries = request.data.get('entries') if isinstance(request.data, dict) else None
+    max_entries = getattr(settings, 'WASTE_BULK_MAX_ENTRIES', 500)
+    if not isinstance(entries, list) or not entries:
+        return Response({'error': 'entries must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(entries) > max_entries:
+        return Response(
+            {'error': f'At most {max_entries} entries can be imported per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    wastes = {w.type: w for w in Waste.objects.all()}
+    valid, errors = [], []
+    for index, row in enumerate(entries):
+        entry = BulkWasteEntrySerializer(data=row, context={'wastes': wastes})
+        if not entry.is_valid():
+            errors.append({'index': index, 'errors': entry.errors})
+            continue
+        valid.append(entry.validated_data)
+
+    if not valid:
+        return Response({'error': 'No valid entries', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    waste_types = [data['waste'].type for data in valid]
+    amounts = [data['amount'] for data in valid]
+    co2_emission = sum(waste_co2_batch(waste_types, amounts))
+    points = sum(amount * point_coefficients.get(t, 0) for t, amount in zip(waste_types, amounts))
+
+    try:
+        created = record_waste_batch(request.user, valid, points, co2_emission)
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    return Response({
+        'message': f'{len(created)} of {len(entries)} waste entries recorded',
+        'created': len(created),
+        'data': UserWasteSerializer(created, many=True).data,
+        'errors': errors,
+    }, status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED)
+
+
 @extend_schema(
     summary="Get user's waste statistics",
     description="Retrieve comprehensive waste disposal statistics for the authenticated user. Returns data grouped by waste type (PLASTIC, PAPER, GLASS, METAL, ELECTRONIC, OIL&FATS, ORGANIC) with total amounts and individual waste records including creation timestamps.",
@@ -385,6 +438,91 @@ def get_user_wastes_by_username(request, username):
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@extend_schema(
+    summary="Get waste time series",
+    description="Waste amount, CO2, points and entry count per day, week (starting Monday) or month for a date range, read from the daily rollups (updated by `build_waste_rollups`, so recent logs may take a minute to appear). `scope=me` returns the authenticated user's series, `scope=global` the system-wide one. Periods without logs are returned as zeros.",
+    parameters=[
+        OpenApiParameter(name='scope', type=str, enum=['me', 'global'], location=OpenApiParameter.QUERY, description='me (default, requires authentication) or global'),
+        OpenApiParameter(name='granularity', type=str, enum=['day', 'week', 'month'], location=OpenApiParameter.QUERY, description='Bucket size (default: day)'),
+        OpenApiParameter(name='start', type=str, location=OpenApiParameter.QUERY, description='First day, YYYY-MM-DD (default: 29 days before end)'),
+        OpenApiParameter(name='end', type=str, location=OpenApiParameter.QUERY, description='Last day, YYYY-MM-DD (default: today)'),
+        OpenApiParameter(name='waste_type', type=str, location=OpenApiParameter.QUERY, description='Only this waste type (PLASTIC, PAPER, ...)'),
+    ],
+    responses={
+        200: OpenApiResponse(
+            description="Series retrieved successfully",
+            examples=[
+                OpenApiExample(
+                    'Weekly series',
+                    value={
+                        'message': 'Waste series retrieved successfully',
+                        'data': {
+                            'scope': 'me',
+                            'granularity': 'week',
+                            'start': '2025-12-01',
+                            'end': '2025-12-14',
+                            'updated_at': '2025-12-14T10:00:00Z',
+                            'series': [
+                                {'period': '2025-12-01', 'amount': 3.5, 'co2': 0.81, 'points': 0.75, 'entries': 4},
+                                {'period': '2025-12-08', 'amount': 0.0, 'co2': 0.0, 'points': 0.0, 'entries': 0}
+                            ]
+                        }
+                    }
+                )
+            ]
+        ),
+        400: OpenApiResponse(description="Bad request - invalid dates, granularity or scope, or range too long"),
+        401: OpenApiResponse(description="Unauthorized - scope=me requires authentication"),
+    },
+    tags=['Waste Management']
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_waste_series(request):
+    """
+    Waste time series from the daily rollups.
+    Query parameters: scope, granularity, start, end, waste_type
+    """
+    scope = request.query_params.get('scope', 'me')
+    granularity = request.query_params.get('granularity', 'day')
+    if scope not in ('me', 'global'):
+        return Response({'error': 'scope must be me or global'}, status=status.HTTP_400_BAD_REQUEST)
+    if granularity not in GRANULARITIES:
+        return Response({'error': 'granularity must be day, week or month'}, status=status.HTTP_400_BAD_REQUEST)
+    if scope == 'me' and not request.user.is_authenticated:
+        return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    try:
+        end = date.fromisoformat(request.query_params['end']) if 'end' in request.query_params else timezone.now().date()
+        start = date.fromisoformat(request.query_params['start']) if 'start' in request.query_params else end - timedelta(days=29)
+    except ValueError:
+        return Response({'error': 'start and end must be dates in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    max_days = getattr(settings, 'WASTE_SERIES_MAX_DAYS', 1830)
+    if start > end or (end - start).days >= max_days:
+        return Response(
+            {'error': f'start must not be after end, and the range is limited to {max_days} days'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    waste_type = request.query_params.get('waste_type')
+    series = waste_series(
+        start, end, granularity,
+        user=request.user if scope == 'me' else None,
+        waste_type=waste_type.upper() if waste_type else None,
+    )
+    return Response({
+        'message': 'Waste series retrieved successfully',
+        'data': {
+            'scope': scope,
+            'granularity': granularity,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'updated_at': rollup_updated_at(),
+            'series': series,
+        }
+    }, status=status.HTTP_200_OK)
+
+
 @extend_schema(
     summary="Get top users leaderboard",
     description="Retrieve top 10 users with highest waste contributions (points and CO2 emissions). Users whose waste stats are not visible to the requester (per their privacy settings or anonymization) are omitted. If authenticated, also returns current user's stats and ranking.",
@@ -577,25 +715,11 @@ def get_co2_emission(amount_kg, waste_type):
     """
     Local CO2 emission calculator using internal carbon factors
     that mimic Climatiq activity_id structure.
-    """
-    # Get mapped activity id
-    activity_id = settings.WASTE_TYPE_TO_ACTIVITY_ID.get(
-        waste_type,
-        'waste_type_disposal_mixed_unspecified'
-    )
-
-    # Get factor from local registry
-    factor = settings.LOCAL_EMISSION_FACTORS.get(activity_id)
-
-    # If unknown type → return 0
-    if factor is None:
-        return 0.0
 
-    # CO2e = weight * factor
-    co2e = amount_kg * factor
-
-    # Apply rounding
-    return round(co2e, settings.CARBON_DECIMALS)
+    Factors are resolved once into carbon.factors' compiled table; unknown
+    types map to the mixed/unspecified activity (0 when it has no factor).
+    """
+    return waste_co2(amount_kg, waste_type)
     
 #import parsers for file upload
 from rest_framework.decorators import parser_classes
@@ -4,6 +4,8 @@ from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+
+from carbon.factors import get_factor_table, waste_co2, waste_co2_batch
 @override_settings(
     CARBON_FACTORS={
         "pet_bottle_500ml": 0.04,          # kg CO2e per bottle
@@ -116,3 +118,36 @@ class LocalCarbonFromJsonViewTests(TestCase):
 
 
 
+
+
+class FactorTableTests(TestCase):
+    def test_batch_matches_per_row_computation(self):
+        types = ["PLASTIC", "PAPER", "GLASS", "ORGANIC", "OIL&FATS", "UNKNOWN"] * 50
+        amounts = [0.5 + i * 0.37 for i in range(len(types))]
+
+        batch = waste_co2_batch(types, amounts)
+
+        self.assertEqual(len(batch), len(types))
+        for value, t, amount in zip(batch, types, amounts):
+            self.assertEqual(value, waste_co2(amount, t))
+        self.assertEqual(waste_co2(3.0, "UNKNOWN"), 0.0)
+
+    @override_settings(
+        WASTE_TYPE_TO_ACTIVITY_ID={"PLASTIC": "unit"},
+        LOCAL_EMISSION_FACTORS={"unit": 1.0},
+        CARBON_DECIMALS=2,
+    )
+    def test_batch_rounds_like_round_at_half_way_values(self):
+        # 2.675 is stored just below the half-way point: round() gives 2.67.
+        self.assertEqual(waste_co2_batch(["PLASTIC"] * 2, [2.675, 0.125]), [2.67, 0.12])
+        self.assertEqual(waste_co2_batch(["PLASTIC"], [2.675]), [waste_co2(2.675, "PLASTIC")])
+
+    def test_table_is_rebuilt_when_settings_change(self):
+        before = get_factor_table()
+        with override_settings(
+            WASTE_TYPE_TO_ACTIVITY_ID={"PLASTIC": "custom"},
+            LOCAL_EMISSION_FACTORS={"custom": 2.0},
+        ):
+            self.assertEqual(waste_co2(1.5, "PLASTIC"), 3.0)
+        self.assertIsNot(get_factor_table(), before)
+        self.assertEqual(get_factor_table().waste_factors, before.waste_factors)
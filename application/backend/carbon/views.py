@@ -1,33 +1,14 @@
-from decimal import Decimal, ROUND_HALF_UP
 from typing import Any, Dict, List
 
-from django.conf import settings  
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from .factors import FACTOR_ALIASES, get_factor_table  # noqa: F401  (FACTOR_ALIASES re-exported)
 
-def _round_kg(x: float) -> float:
-    p = getattr(settings, "CARBON_DECIMALS", 6)
-    return float(Decimal(str(x)).quantize(Decimal(f"1e-{p}"), rounding=ROUND_HALF_UP))
-
-
-# Map incoming item names to the .gov-backed factor keys you keep in settings.CARBON_FACTORS
-# Feel free to extend this with Turkish aliases etc.
-FACTOR_ALIASES: Dict[str, str] = {
-    "bottle": "pet_bottle_500ml",           # NIH/NEMS range 0.034–0.046 kg CO2e (fabrication stage)
-    "pet_bottle": "pet_bottle_500ml",
-    "pet_bottle_500ml": "pet_bottle_500ml",
 
-    "can": "aluminum_can_12oz",             # Derived from EPA WARM v16 + EPA avg can mass
-    "aluminum_can": "aluminum_can_12oz",
-    "aluminium_can": "aluminum_can_12oz",
-    "aluminum_can_12oz": "aluminum_can_12oz",
-
-    "glass_bottle": "glass_beer_bottle_12oz",  # Derived from EPA WARM v16 + EPA bottle mass
-    "beer_bottle": "glass_beer_bottle_12oz",
-    "glass_beer_bottle_12oz": "glass_beer_bottle_12oz",
-}
+def _round_kg(x: float) -> float:
+    return get_factor_table().round_half_up(x)
 
 
 class LocalCarbonFromJsonView(APIView):
@@ -43,13 +24,14 @@ class LocalCarbonFromJsonView(APIView):
 
     Notes:
     - Factors are taken from settings.CARBON_FACTORS (floats, kg CO2e per ITEM).
-    - We allow user-friendly names via FACTOR_ALIASES → canonical keys.
+    - We allow user-friendly names via FACTOR_ALIASES → canonical keys
+      (both resolved once into carbon.factors' compiled table).
     """
 
     def post(self, request):
-        # 1) Load factors from settings
-        factors: Dict[str, float] = getattr(settings, "CARBON_FACTORS", {})
-        if not factors:
+        # 1) Compiled factor table (built once from settings)
+        table = get_factor_table()
+        if not table.item_factors:
             return Response(
                 {"detail": "CARBON_FACTORS not configured in Django settings."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -87,15 +69,13 @@ class LocalCarbonFromJsonView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Resolve alias → canonical factor key
-            canonical = FACTOR_ALIASES.get(name, name)
-
-            # Factor lookup
-            if canonical not in factors:
+            # Resolve name/alias → (canonical factor key, kg CO2e per item)
+            resolved = table.resolve_item(name)
+            if resolved is None:
                 unmatched.append(raw_name or f"(empty at row {idx})")
                 continue
 
-            per = float(factors[canonical])          # kg CO2e per item
+            canonical, per = resolved
             sub = per * count
             total += sub
 
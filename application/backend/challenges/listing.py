@@ -0,0 +1,70 @@
+"""
+Active challenges and the cached public listing.
+
+`Challenge.is_active` (not completed, deadline not passed) is stored so the
+listing reads it through the (is_public, is_active, deadline) index instead of
+comparing current_progress with target_amount on every row. Between sweeps a
+challenge can still be flagged active after its deadline, so queries also
+check the deadline; the index covers that range too.
+
+The anonymous listing is cached per page for CHALLENGE_LIST_CACHE_TTL
+seconds in the shared cache. Cache keys carry a version that is bumped after
+commit whenever a challenge is saved, deleted, completed or swept (also from
+the worker containers), so changes show up immediately and the TTL only
+bounds how stale current_progress can get.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Challenge
+
+VERSION_KEY = "challenges:public-listing:version"
+
+
+def active_q(prefix="", now=None):
+    """
+    Q for an active challenge; `prefix` (e.g. "challenge__") applies it
+    through a relation.
+    """
+    now = now or timezone.now()
+    return Q(**{f"{prefix}is_active": True}) & (
+        Q(**{f"{prefix}deadline__isnull": True}) | Q(**{f"{prefix}deadline__gt": now})
+    )
+
+
+def active_challenges(queryset=None, now=None):
+    """Challenges that are not completed and not past their deadline."""
+    queryset = Challenge.objects.all() if queryset is None else queryset
+    return queryset.filter(active_q(now=now))
+
+
+def invalidate_public_listing():
+    """Bump the listing version once the current transaction commits."""
+    # Bumping before commit would let a read in between re-cache the old rows.
+    transaction.on_commit(_bump_version)
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # No version yet (or it was evicted): any new value invalidates old keys.
+        # An int, so Redis can INCR it.
+        cache.set(VERSION_KEY, int(timezone.now().timestamp() * 1_000_000), None)
+
+
+def listing_cache_key(url):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        _bump_version()
+        version = cache.get(VERSION_KEY)
+    return f"challenges:public-listing:{version}:{hashlib.md5(url.encode()).hexdigest()}"
+
+
+def listing_cache_ttl():
+    return getattr(settings, "CHALLENGE_LIST_CACHE_TTL", 15)
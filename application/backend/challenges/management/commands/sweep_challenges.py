@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from challenges.sweeper import sweep_challenges
+
+
+class Command(BaseCommand):
+    help = "Mark challenges whose deadline has passed (or that are completed) as inactive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and sweep periodically',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=60.0,
+            help='Seconds between sweeps (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            swept = sweep_challenges()
+            self.stdout.write(self.style.SUCCESS(f"Marked {swept} challenge(s) inactive."))
+            return
+
+        self.stdout.write(self.style.SUCCESS("Challenge sweeper started."))
+        while True:
+            swept = sweep_challenges()
+            if swept:
+                self.stdout.write(f"Marked {swept} challenge(s) inactive.")
+            time.sleep(options['poll_interval'])
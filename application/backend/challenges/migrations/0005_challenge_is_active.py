@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 00:19
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+def mark_inactive(apps, schema_editor):
+    Challenge = apps.get_model('challenges', 'Challenge')
+    Challenge.objects.filter(
+        Q(current_progress__gte=F('target_amount')) | Q(deadline__lte=timezone.now())
+    ).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0004_challenge_deadline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(mark_inactive, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['is_public', 'is_active', 'deadline'], name='challenge_public_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['creator', 'is_active', 'deadline'], name='challenge_creator_active_idx'),
+        ),
+    ]
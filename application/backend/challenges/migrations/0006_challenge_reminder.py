@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 00:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0005_challenge_is_active'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(max_length=16)),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('recipients', models.PositiveIntegerField(default=0)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='challenges.challenge')),
+            ],
+            options={
+                'db_table': 'ChallengeReminder',
+                'constraints': [models.UniqueConstraint(fields=('challenge', 'window'), name='challenge_reminder_window_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 00:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_participants(apps, schema_editor):
+    Challenge = apps.get_model('challenges', 'Challenge')
+    UserChallenge = apps.get_model('challenges', 'UserChallenge')
+    counts = (
+        UserChallenge.objects.filter(challenge=OuterRef('pk'))
+        .order_by().values('challenge').annotate(n=Count('id')).values('n')
+    )
+    Challenge.objects.update(
+        participant_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0006_challenge_reminder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='last_contributor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='progress_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(count_participants, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from api.models import Achievements, Users
 
 
@@ -11,10 +12,49 @@ class Challenge(models.Model):
     reward = models.ForeignKey(Achievements, models.DO_NOTHING, blank=True, null=True)
     creator = models.ForeignKey(Users, models.DO_NOTHING, blank=True, null=True)
     deadline = models.DateTimeField(blank=True, null=True)
+    # Not completed and not past the deadline. Recomputed on save; queryset
+    # updates (progress) and `python manage.py sweep_challenges` keep it current.
+    is_active = models.BooleanField(default=True)
+    # Denormalized for listings: kept in step by UserChallenge signals.
+    participant_count = models.PositiveIntegerField(default=0)
+    # Progress snapshot, written by the same UPDATE that advances progress.
+    last_contributor = models.ForeignKey(Users, models.SET_NULL, blank=True, null=True, related_name='+')
+    progress_updated_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = 'Challenge'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['is_public', 'is_active', 'deadline'], name='challenge_public_active_idx'),
+            models.Index(fields=['creator', 'is_active', 'deadline'], name='challenge_creator_active_idx'),
+        ]
+
+    @property
+    def progress_percentage(self):
+        if not self.target_amount:
+            return None
+        return round(min(self.current_progress / self.target_amount * 100, 100), 1)
+
+    def compute_is_active(self, now=None):
+        if self.target_amount is not None and self.current_progress >= self.target_amount:
+            return False
+        return self.deadline is None or self.deadline > (now or timezone.now())
+
+    # Written only by queryset UPDATEs; a full save() of a stale instance must not roll them back.
+    MAINTAINED_FIELDS = ('participant_count', 'last_contributor', 'progress_updated_at')
+
+    def save(self, *args, **kwargs):
+        self.is_active = self.compute_is_active()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.MAINTAINED_FIELDS
+            ]
+            kwargs['update_fields'] = update_fields
+        if update_fields is not None and 'is_active' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'is_active']
+        super().save(*args, **kwargs)
 
 
 class UserChallenge(models.Model):
@@ -26,3 +66,21 @@ class UserChallenge(models.Model):
         db_table = 'UserChallenge'
         unique_together = (('user', 'challenge'),) # these two together becomes primary key
         ordering = ['-joined_date']
+
+
+class ChallengeReminder(models.Model):
+    """
+    Deadline reminder already sent for a challenge in a reminder window
+    (e.g. "24h"). Written in the same transaction as the notifications, so a
+    reminder is delivered at most once however often the scheduler runs.
+    """
+    challenge = models.ForeignKey(Challenge, models.CASCADE, related_name='reminders')
+    window = models.CharField(max_length=16)
+    sent_at = models.DateTimeField(default=timezone.now)
+    recipients = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'ChallengeReminder'
+        constraints = [
+            models.UniqueConstraint(fields=['challenge', 'window'], name='challenge_reminder_window_uniq'),
+        ]
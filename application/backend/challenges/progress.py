@@ -0,0 +1,154 @@
+"""
+Challenge progress for logged waste.
+
+A waste log advances the user's oldest-joined challenge that is still
+incomplete. The challenge is found with one joined query and advanced with
+conditional UPDATEs, so concurrent logs can neither overshoot the target
+nor complete the same challenge twice. Completion rewards every participant
+with one bulk INSERT, whatever the challenge size.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.activities.utils.event_writer import EventWriter
+from api.models import UserAchievements, Users, Visibility
+from notifications.models import Notification
+from notifications.utils import send_bulk_notifications
+
+from .listing import invalidate_public_listing
+from .models import Challenge, UserChallenge
+from .snapshot import invalidate_progress
+
+# Attempts before giving up when concurrent logs keep moving the target row.
+MAX_ATTEMPTS = 5
+
+
+class ProgressContention(Exception):
+    """Concurrent logs kept moving the challenge row for MAX_ATTEMPTS tries."""
+
+
+@dataclass
+class ProgressResult:
+    challenge_id: int
+    completed: bool
+    awarded: int = 0
+
+
+def first_incomplete_challenge(user_id):
+    """(challenge_id, target_amount) of the oldest-joined incomplete challenge, or None."""
+    return (
+        UserChallenge.objects.filter(
+            user_id=user_id,
+            challenge__current_progress__lt=F("challenge__target_amount"),
+        )
+        .order_by("joined_date", "id")
+        .values_list("challenge_id", "challenge__target_amount")
+        .first()
+    )
+
+
+def advance_challenge_progress(user, amount) -> Optional[ProgressResult]:
+    """
+    Add `amount` to the user's first incomplete challenge. Completing it caps
+    progress at the target and awards the reward to all participants.
+    Returns None when the user has no incomplete challenge, and raises
+    ProgressContention when every attempt lost its UPDATE to a concurrent log,
+    so the caller can retry instead of dropping the amount.
+    """
+    for _ in range(MAX_ATTEMPTS):
+        found = first_incomplete_challenge(user.id)
+        if found is None:
+            return None
+        challenge_id, target = found
+        still_open = Challenge.objects.filter(pk=challenge_id, current_progress__lt=F("target_amount"))
+        snapshot = dict(last_contributor_id=user.id, progress_updated_at=timezone.now())
+
+        # This log reaches the target: only one writer can win this UPDATE.
+        if still_open.filter(current_progress__gte=F("target_amount") - amount).update(
+            current_progress=F("target_amount"), is_active=False, **snapshot
+        ):
+            _progress_changed(challenge_id)
+            return complete_challenge(challenge_id)
+
+        if still_open.filter(current_progress__lt=F("target_amount") - amount).update(
+            current_progress=F("current_progress") + amount, **snapshot
+        ):
+            _progress_changed(challenge_id)
+            return ProgressResult(challenge_id=challenge_id, completed=False)
+        # Another log changed the row between our SELECT and UPDATEs; re-read.
+    raise ProgressContention(f"challenge progress for user {user.id} kept changing; gave up after {MAX_ATTEMPTS} attempts")
+
+
+def _progress_changed(challenge_id):
+    transaction.on_commit(lambda: invalidate_progress(challenge_id))
+
+
+def complete_challenge(challenge_id) -> ProgressResult:
+    invalidate_public_listing()
+    challenge = Challenge.objects.select_related("reward").get(pk=challenge_id)
+    if challenge.reward is None:
+        raise ObjectDoesNotExist("Challenge reward does not exist. The reward achievement should be automatically generated in our new API, so this is likely a server issue.")
+
+    participant_ids = list(
+        UserChallenge.objects.filter(challenge_id=challenge_id).values_list("user_id", flat=True)
+    )
+    awarded = award_achievement(participant_ids, challenge.reward)
+
+    send_bulk_notifications(
+        participant_ids,
+        f"🎉 Challenge '{challenge.title}' completed! You've earned the achievement '{challenge.reward.title}'!",
+        category=Notification.CHALLENGE,
+    )
+    return ProgressResult(challenge_id=challenge_id, completed=True, awarded=awarded)
+
+
+def award_achievement(user_ids, achievement):
+    """
+    Give `achievement` to every user in `user_ids` that lacks it, with one
+    INSERT. bulk_create bypasses post_save, so the activity events the
+    UserAchievements signal would emit are written here in bulk as well.
+    """
+    already = set(
+        UserAchievements.objects.filter(achievement=achievement, user_id__in=user_ids)
+        .values_list("user_id", flat=True)
+    )
+    new_ids = [uid for uid in user_ids if uid not in already]
+    if not new_ids:
+        return 0
+
+    UserAchievements.objects.bulk_create(
+        [UserAchievements(user_id=uid, achievement=achievement, earned_at=timezone.now()) for uid in new_ids],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    # Same visibility rule as should_publish_waste_and_achievements().
+    public = dict(
+        Users.objects.filter(id__in=new_ids, is_anonymous=False, waste_stats_privacy="public")
+        .values_list("id", "username")
+    )
+    if public:
+        award_ids = dict(
+            UserAchievements.objects.filter(achievement=achievement, user_id__in=list(public))
+            .values_list("user_id", "id")
+        )
+        title = achievement.title
+        events = [
+            dict(
+                activity_type="Create",
+                actor_id=username,
+                object_type="UserAchievement",
+                object_id=str(award_ids[uid]),
+                summary=f"User {username} earned achievement {title}",
+                visibility=Visibility.PUBLIC,
+            )
+            for uid, username in public.items()
+            if uid in award_ids
+        ]
+        transaction.on_commit(lambda: EventWriter.log_events(events))
+    return len(new_ids)
@@ -0,0 +1,110 @@
+"""
+Deadline reminders for challenge participants.
+
+`schedule_reminders` finds every active challenge whose deadline falls in the
+window, claims a ChallengeReminder row per (challenge, window), loads the
+participants of all claimed challenges with one query and inserts all
+notifications with send_notification_batch, in one transaction. The unique
+(challenge, window) constraint makes the run idempotent: challenges already
+reminded are skipped, and a concurrent run that claimed the same challenges
+first makes this one roll back instead of notifying twice. Real-time pushes
+go through the notification outbox, whose dispatcher sends them concurrently.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from notifications.models import Notification
+from notifications.utils import send_notification_batch
+
+from .listing import active_challenges
+from .models import ChallengeReminder, UserChallenge
+
+
+@dataclass
+class ReminderReport:
+    challenges: int = 0
+    notifications: int = 0
+    conflict: bool = False
+
+
+def window_name(hours):
+    return f"{hours}h"
+
+
+def _time_left(remaining):
+    seconds = remaining.total_seconds()
+    if seconds < 3600:
+        return f"{int(seconds / 60)} minutes"
+    if seconds < 86400:
+        return f"{int(seconds / 3600)} hours"
+    return f"{int(seconds / 86400)} days"
+
+
+def reminder_message(challenge, now):
+    message = f"⏰ Reminder: Challenge '{challenge.title}' deadline in {_time_left(challenge.deadline - now)}!"
+    if challenge.target_amount:
+        pct = challenge.current_progress / challenge.target_amount * 100
+        message += (
+            f" Current progress: {challenge.current_progress:.1f}/{challenge.target_amount} kg ({pct:.0f}%)"
+        )
+    return message
+
+
+def due_challenges(hours, now=None):
+    """Active challenges with a deadline in (now, now + hours] not yet reminded in this window."""
+    now = now or timezone.now()
+    already = ChallengeReminder.objects.filter(challenge=OuterRef("pk"), window=window_name(hours))
+    return active_challenges(now=now).filter(
+        deadline__isnull=False, deadline__lte=now + timedelta(hours=hours)
+    ).exclude(Exists(already))
+
+
+def participants_by_challenge(challenge_ids):
+    participants = defaultdict(list)
+    rows = (
+        UserChallenge.objects.filter(challenge_id__in=challenge_ids)
+        .order_by()
+        .values_list("challenge_id", "user_id")
+    )
+    for challenge_id, user_id in rows:
+        participants[challenge_id].append(user_id)
+    return participants
+
+
+def schedule_reminders(hours=24, now=None, dry_run=False):
+    now = now or timezone.now()
+    report = ReminderReport()
+    try:
+        with transaction.atomic():
+            challenges = list(
+                due_challenges(hours, now).only("id", "title", "deadline", "target_amount", "current_progress")
+            )
+            if not challenges:
+                return report
+            participants = participants_by_challenge([c.id for c in challenges])
+            messages = [
+                (user_id, reminder_message(challenge, now))
+                for challenge in challenges
+                for user_id in participants.get(challenge.id, ())
+            ]
+            report.challenges = len(challenges)
+            report.notifications = len(messages)
+            if dry_run:
+                return report
+            ChallengeReminder.objects.bulk_create([
+                ChallengeReminder(
+                    challenge=challenge, window=window_name(hours), sent_at=now,
+                    recipients=len(participants.get(challenge.id, ())),
+                )
+                for challenge in challenges
+            ])
+            send_notification_batch(messages, category=Notification.REMINDER)
+    except IntegrityError:
+        # Another run claimed some of these challenges; it sends their reminders.
+        return ReminderReport(conflict=True)
+    return report
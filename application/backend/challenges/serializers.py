@@ -1,8 +1,17 @@
 from rest_framework import serializers
-from .models import Challenge, UserChallenge, Achievements
+from rest_framework.settings import api_settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
 from django.utils import timezone
+from api.models import Follow, Users
+from .listing import active_q
+from .snapshot import last_contributor_for
+from .models import Challenge, UserChallenge, Achievements
 
 class ChallengeSerializer(serializers.ModelSerializer):
+    progress_percentage = serializers.FloatField(read_only=True)
+    last_contributor = serializers.SerializerMethodField()
+
     class Meta:
         model = Challenge
         fields = [
@@ -14,8 +23,40 @@ class ChallengeSerializer(serializers.ModelSerializer):
             'is_public', 
             'reward', 
             'creator',
-            'deadline'
+            'deadline',
+            'participant_count',
+            'progress_percentage',
+            'last_contributor',
+            'progress_updated_at',
         ]
+        read_only_fields = ['participant_count', 'progress_updated_at']
+
+    def get_last_contributor(self, obj):
+        '''
+        The last contributor's id, or None when their waste stats are hidden
+        from the viewer. Without a request in the context (cached snapshots)
+        the viewer is treated as anonymous.
+        '''
+        request = self.context.get('request')
+        viewer = request.user if request else None
+        contributor = obj.last_contributor
+        if contributor is None:
+            return None
+        viewer_follows = None
+        if viewer is not None and viewer.is_authenticated:
+            viewer_follows = contributor.id in self._followed_ids(viewer)
+        if last_contributor_for(viewer, contributor, viewer_follows=viewer_follows) is None:
+            return None
+        return obj.last_contributor_id
+
+    def _followed_ids(self, viewer):
+        # Shared by every row of a many=True serializer, so a listing checks
+        # followers-only contributors with one query instead of one per row.
+        if '_followed_ids' not in self.context:
+            self.context['_followed_ids'] = set(
+                Follow.objects.filter(follower=viewer).values_list('following_id', flat=True)
+            )
+        return self.context['_followed_ids']
 
     def validate(self, data):
         # Make deadline required
@@ -39,55 +80,60 @@ class ChallengeSerializer(serializers.ModelSerializer):
         
 
 class ChallengeParticipationSerializer(serializers.ModelSerializer):
+    MAX_ACTIVE_CHALLENGES = 3
+
     class Meta:
         model = UserChallenge
         fields = ['challenge', 'joined_date']
 
     def validate(self, data):
         '''
-        Ensure that the challenge is public and the user is not already participating.
-        Also enforce the 3 challenge limit per user.
-        Enforce deadline: cannot join after deadline.
+        Ensure that the challenge is public (or the user's own) and its deadline has not passed.
+        Duplicate participation and the 3 challenge limit are checked in create(), in the
+        same transaction as the insert.
         '''
-        from django.utils import timezone
         user = self.context['request'].user
         challenge = data['challenge']
 
         # Check if the challenge is public or if the user is the challenge creator
-        if not challenge.is_public and challenge.creator != user:
+        if not challenge.is_public and challenge.creator_id != user.id:
             raise serializers.ValidationError("You can only join public challenges.")
-        
-        # Check if the user is already participating in the challenge
-        if UserChallenge.objects.filter(user=user, challenge=challenge).exists():
-            raise serializers.ValidationError("You are already participating in this challenge.")
 
         # Enforce deadline: cannot join after deadline
         if challenge.deadline and challenge.deadline <= timezone.now():
             raise serializers.ValidationError("You cannot join this challenge because the deadline has passed.")
 
-        # Check if the user has reached the maximum number of active (incomplete) challenges (3)
-        from django.db.models import F, Q
-        active_challenge_count = UserChallenge.objects.filter(
-            user=user
-        ).filter(
-            Q(challenge__target_amount__isnull=True) |
-            Q(challenge__current_progress__lt=F('challenge__target_amount'))
-        ).count()
-        if active_challenge_count >= 3:
-            raise serializers.ValidationError("You can only participate in a maximum of 3 active challenges at a time.")
-        
         return data
-    
+
+    @staticmethod
+    def _error(message):
+        # Same shape as errors raised from validate().
+        return serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+
     def create(self, validated_data):
         '''
-        Automatically set the user and joined_date when creating a new participation record.
-        Enforce deadline: cannot complete after deadline.
+        Check-and-insert the participation in one transaction. The user's row is locked
+        so concurrent joins by the same user see each other's rows; one query counts
+        both an existing participation and the user's active challenges, and the
+        (user, challenge) unique constraint backs up the duplicate check.
         '''
-        from django.utils import timezone
-        challenge = validated_data['challenge']
-        if challenge.deadline and challenge.deadline <= timezone.now():
-            raise serializers.ValidationError("You cannot join or complete this challenge because the deadline has passed.")
         user = self.context['request'].user
-        validated_data['user'] = user
-        validated_data['joined_date'] = timezone.now()
-        return UserChallenge.objects.create(**validated_data)
+        challenge = validated_data['challenge']
+        with transaction.atomic():
+            list(Users.objects.select_for_update().filter(pk=user.pk).values_list('pk', flat=True))
+            counts = UserChallenge.objects.filter(user=user).aggregate(
+                already=Count('id', filter=Q(challenge=challenge)),
+                # Checks the deadline too: is_active lags until the sweeper runs.
+                active=Count('id', filter=active_q('challenge__')),
+            )
+            if counts['already']:
+                raise self._error("You are already participating in this challenge.")
+            if counts['active'] >= self.MAX_ACTIVE_CHALLENGES:
+                raise self._error("You can only participate in a maximum of 3 active challenges at a time.")
+            try:
+                with transaction.atomic():
+                    return UserChallenge.objects.create(
+                        user=user, challenge=challenge, joined_date=timezone.now()
+                    )
+            except IntegrityError:
+                raise self._error("You are already participating in this challenge.")
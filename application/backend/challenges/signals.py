@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.activities.utils.field_tracker import FieldTracker
+from api.models import Users
+from api.utils.system_stats import CACHE_KEY as SYSTEM_STATS_CACHE_KEY
+
+from .listing import invalidate_public_listing
+from .models import Challenge, UserChallenge
+from .snapshot import invalidate_progress
+
+privacy_tracker = FieldTracker(Users, ["waste_stats_privacy", "is_anonymous"], name="challenges")
+
+
+@receiver(post_save, sender=Challenge, dispatch_uid="challenge_listing_saved")
+@receiver(post_delete, sender=Challenge, dispatch_uid="challenge_listing_deleted")
+def invalidate_listing(sender, instance, **kwargs):
+    invalidate_public_listing()
+    invalidate_progress(instance.pk)
+
+
+@receiver(post_save, sender=UserChallenge, dispatch_uid="challenge_participant_joined")
+def count_participant_joined(sender, instance, created, **kwargs):
+    if created:
+        Challenge.objects.filter(pk=instance.challenge_id).update(participant_count=F("participant_count") + 1)
+        _participants_changed(instance.challenge_id)
+
+
+@receiver(post_delete, sender=UserChallenge, dispatch_uid="challenge_participant_left")
+def count_participant_left(sender, instance, **kwargs):
+    Challenge.objects.filter(pk=instance.challenge_id).update(
+        participant_count=Greatest(F("participant_count") - 1, 0)
+    )
+    _participants_changed(instance.challenge_id)
+
+
+def _participants_changed(challenge_id):
+    # After commit: a read in between would cache the old count again.
+    transaction.on_commit(lambda: invalidate_progress(challenge_id))
+
+
+@receiver(post_save, sender=Users, dispatch_uid="challenge_contributor_privacy")
+def contributor_privacy_changed(sender, instance, created, **kwargs):
+    """
+    The cached anonymous listing and system statistics show last contributor
+    ids only for users whose waste stats are public; drop them when a user
+    changes those settings.
+    """
+    if created or not privacy_tracker.pop_changes(instance, kwargs.get("update_fields")):
+        return
+    invalidate_public_listing()
+    transaction.on_commit(lambda: cache.delete(SYSTEM_STATS_CACHE_KEY))
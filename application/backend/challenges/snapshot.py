@@ -0,0 +1,79 @@
+"""
+Cached per-challenge progress snapshots.
+
+Progress, percentage, participant count and last contributor all live on the
+Challenge row (the count maintained by UserChallenge signals, the contributor
+written by the progress UPDATE), so a snapshot is one query. It is cached per
+challenge for CHALLENGE_PROGRESS_CACHE_TTL seconds and dropped whenever the
+challenge, its participants or its progress change.
+
+The cached snapshot only holds the last contributor's id: whether a viewer
+may see who that was depends on the contributor's waste stats privacy and
+anonymization, so ChallengeProgressView resolves it per request with
+`last_contributor_for`.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from api.models import Users
+from api.profile.anonymity_utils import display_name_for_viewer
+from api.profile.privacy_utils import can_view_waste_stats
+
+from .models import Challenge
+
+
+def _key(challenge_id):
+    return f"challenges:progress:{challenge_id}"
+
+
+def invalidate_progress(challenge_id):
+    cache.delete(_key(challenge_id))
+
+
+def build_progress_snapshot(challenge):
+    return {
+        "challenge_id": challenge.id,
+        "current_progress": challenge.current_progress,
+        "target_amount": challenge.target_amount,
+        "percentage": challenge.progress_percentage,
+        "participant_count": challenge.participant_count,
+        "is_active": challenge.is_active,
+        "updated_at": challenge.progress_updated_at,
+        # Used for the visibility checks; not part of the response.
+        "last_contributor_id": challenge.last_contributor_id,
+        "is_public": challenge.is_public,
+        "creator_id": challenge.creator_id,
+    }
+
+
+def get_progress_snapshot(challenge_id):
+    """Snapshot dict for the challenge (from the cache when fresh), or None if it does not exist."""
+    key = _key(challenge_id)
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+    challenge = Challenge.objects.filter(pk=challenge_id).first()
+    if challenge is None:
+        return None
+    snapshot = build_progress_snapshot(challenge)
+    cache.set(key, snapshot, getattr(settings, "CHALLENGE_PROGRESS_CACHE_TTL", 60))
+    return snapshot
+
+
+def last_contributor_for(viewer, user, viewer_follows=None):
+    """
+    Name to show `viewer` for a challenge's last contributor, or None when
+    there is none or their waste stats are hidden from the viewer.
+    `viewer_follows` may carry an already-known follow state.
+    """
+    if user is None or not can_view_waste_stats(viewer, user, viewer_follows=viewer_follows):
+        return None
+    return display_name_for_viewer(viewer, user)
+
+
+def load_contributor(user_id):
+    if user_id is None:
+        return None
+    return Users.objects.filter(pk=user_id).only(
+        "id", "username", "waste_stats_privacy", "is_anonymous", "anonymous_identifier"
+    ).first()
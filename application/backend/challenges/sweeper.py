@@ -0,0 +1,24 @@
+"""
+Deadline sweeper for Challenge.is_active.
+
+Saves recompute is_active and completion clears it in the progress UPDATE,
+but nothing writes to a challenge when its deadline passes. The sweeper
+clears the flag for those (and for any challenge completed by a queryset
+update elsewhere) with one UPDATE through the is_active indexes.
+"""
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .listing import invalidate_public_listing
+from .models import Challenge
+
+
+def sweep_challenges(now=None):
+    """Mark expired or completed challenges inactive. Returns the number changed."""
+    now = now or timezone.now()
+    swept = Challenge.objects.filter(is_active=True).filter(
+        Q(deadline__lte=now) | Q(current_progress__gte=F("target_amount"))
+    ).update(is_active=False)
+    if swept:
+        invalidate_public_listing()
+    return swept
@@ -1,11 +1,23 @@
 import uuid
+from datetime import timedelta
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from challenges.models import Challenge, UserChallenge
+from api.models import Follow
+from notifications.models import Notification, NotificationCounter, NotificationOutbox
+
+from challenges.models import Challenge, ChallengeReminder, UserChallenge
+from challenges.progress import advance_challenge_progress
+from challenges.reminders import schedule_reminders
+from challenges.sweeper import sweep_challenges
 
 User = get_user_model()
 
@@ -15,6 +27,8 @@ class ChallengeTests(TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
+        # Invalidations only run on commit, which TestCase never reaches.
+        cache.clear()
         self.client = APIClient()
 
         # Generate unique emails for each test run
@@ -130,6 +144,8 @@ class ChallengeParticipationTests(TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
+        # Invalidations only run on commit, which TestCase never reaches.
+        cache.clear()
         self.client = APIClient()
 
         # Generate unique emails for each test run
@@ -339,3 +355,327 @@ class ChallengeParticipationTests(TestCase):
         # Check that completed challenge is NOT in the results
         challenge_ids = [c['id'] for c in response.data['results']]
         self.assertNotIn(completed_challenge.id, challenge_ids)
+
+
+class ChallengeActiveStateTests(TestCase):
+    """is_active maintenance and the cached public listing."""
+
+    def setUp(self):
+        # Invalidations only run on commit, which TestCase never reaches.
+        cache.clear()
+        self.client = APIClient()
+        self.creator = User.objects.create_user(
+            email="active_creator@example.com", username="active_creator", password="password123"
+        )
+
+    def make(self, **kwargs):
+        kwargs.setdefault('title', 'Active Challenge')
+        kwargs.setdefault('is_public', True)
+        return Challenge.objects.create(creator=self.creator, **kwargs)
+
+    def listed_ids(self, **params):
+        response = self.client.get('/api/challenges/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [c['id'] for c in response.data['results']]
+
+    def test_save_computes_is_active(self):
+        self.assertTrue(self.make(target_amount=10, current_progress=5).is_active)
+        self.assertFalse(self.make(target_amount=10, current_progress=10).is_active)
+        expired = self.make(deadline=timezone.now() - timedelta(hours=1))
+        self.assertFalse(expired.is_active)
+
+        # Extending the deadline reactivates it.
+        expired.deadline = timezone.now() + timedelta(days=1)
+        expired.save(update_fields=['deadline'])
+        expired.refresh_from_db()
+        self.assertTrue(expired.is_active)
+
+    def test_sweeper_deactivates_expired_challenges(self):
+        soon = self.make(deadline=timezone.now() + timedelta(hours=1))
+        later = self.make(deadline=timezone.now() + timedelta(days=3))
+
+        self.assertEqual(sweep_challenges(now=timezone.now() + timedelta(hours=2)), 1)
+        soon.refresh_from_db()
+        later.refresh_from_db()
+        self.assertFalse(soon.is_active)
+        self.assertTrue(later.is_active)
+        self.assertEqual(sweep_challenges(now=timezone.now() + timedelta(hours=2)), 0)
+
+    def test_public_listing_is_cached_and_invalidated(self):
+        first = self.make()
+        self.assertEqual(self.listed_ids(), [first.id])
+
+        # Queryset updates bypass invalidation: the cached page is served.
+        Challenge.objects.filter(pk=first.pk).update(title='Renamed')
+        response = self.client.get('/api/challenges/')
+        self.assertEqual(response.data['results'][0]['title'], 'Active Challenge')
+
+        # A saved challenge invalidates the cached pages once it commits.
+        with self.captureOnCommitCallbacks() as callbacks:
+            second = self.make()
+            self.assertEqual(self.listed_ids(), [first.id])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.listed_ids(), [second.id, first.id])
+
+        # Expired challenges drop out of the listing even before a sweep.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make(deadline=timezone.now() + timedelta(hours=1))
+            Challenge.objects.filter(pk=second.pk).update(deadline=timezone.now() - timedelta(hours=1))
+            sweep_challenges()
+        self.assertNotIn(second.id, self.listed_ids())
+
+    def test_listing_page_size(self):
+        for _ in range(3):
+            self.make()
+        response = self.client.get('/api/challenges/', {'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+
+class ChallengeReminderTests(TestCase):
+    """Deadline reminders are sent once per challenge and window."""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.users = [
+            User.objects.create_user(email=f"remind{i}@example.com", username=f"remind{i}", password="pw")
+            for i in range(3)
+        ]
+        self.soon = self.make("Soon", hours=5, target_amount=10, current_progress=2.5)
+        self.open_ended = self.make("Open", hours=20, target_amount=None)
+        self.later = self.make("Later", hours=72)
+        for user in self.users:
+            UserChallenge.objects.create(user=user, challenge=self.soon, joined_date=self.now)
+        UserChallenge.objects.create(user=self.users[0], challenge=self.open_ended, joined_date=self.now)
+        UserChallenge.objects.create(user=self.users[0], challenge=self.later, joined_date=self.now)
+
+    def make(self, title, hours, **kwargs):
+        kwargs.setdefault('target_amount', 10)
+        return Challenge.objects.create(
+            title=title, is_public=True, deadline=self.now + timedelta(hours=hours), **kwargs
+        )
+
+    def test_reminders_sent_once_per_window(self):
+        report = schedule_reminders(hours=24, now=self.now)
+        self.assertEqual((report.challenges, report.notifications), (2, 4))
+
+        reminders = Notification.objects.filter(category=Notification.REMINDER)
+        self.assertEqual(reminders.count(), 4)
+        self.assertEqual(NotificationOutbox.objects.count(), 4)
+        self.assertIn("2.5/10.0 kg (25%)", reminders.filter(user=self.users[1]).get().message)
+        # users[0] got two different reminders in the same batch.
+        self.assertEqual(NotificationCounter.objects.get(user=self.users[0]).unread, 2)
+        self.assertEqual(
+            ChallengeReminder.objects.get(challenge=self.soon, window="24h").recipients, 3
+        )
+
+        # Running again sends nothing; a wider window only reminds the new challenge.
+        self.assertEqual(schedule_reminders(hours=24, now=self.now).notifications, 0)
+        self.assertEqual(schedule_reminders(hours=96, now=self.now).challenges, 3)
+
+    def test_same_named_challenges_each_send_their_reminder(self):
+        twin = self.make("Soon", hours=5, target_amount=10, current_progress=2.5)
+        UserChallenge.objects.create(user=self.users[1], challenge=twin, joined_date=self.now)
+
+        schedule_reminders(hours=24, now=self.now)
+        reminders = Notification.objects.filter(category=Notification.REMINDER, user=self.users[1])
+        self.assertEqual(reminders.count(), 2)
+        self.assertEqual(len(set(reminders.values_list('message', flat=True))), 1)
+        self.assertEqual(ChallengeReminder.objects.get(challenge=twin).recipients, 1)
+
+    def test_dry_run_and_completed_challenges(self):
+        Challenge.objects.filter(pk=self.soon.pk).update(is_active=False)
+
+        report = schedule_reminders(hours=24, now=self.now, dry_run=True)
+        self.assertEqual((report.challenges, report.notifications), (1, 1))
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(ChallengeReminder.objects.exists())
+
+
+class ChallengeProgressSnapshotTests(TestCase):
+    """participant_count maintenance and the cached progress endpoint."""
+
+    def setUp(self):
+        # Invalidations only run on commit, which TestCase never reaches.
+        cache.clear()
+        self.client = APIClient()
+        self.creator = User.objects.create_user(email="snap_c@example.com", username="snap_c", password="pw")
+        self.member = User.objects.create_user(email="snap_m@example.com", username="snap_m", password="pw")
+        self.challenge = Challenge.objects.create(
+            title="Snapshot", is_public=True, target_amount=10, creator=self.creator
+        )
+
+    def join(self, user, challenge=None):
+        return UserChallenge.objects.create(
+            user=user, challenge=challenge or self.challenge, joined_date=timezone.now()
+        )
+
+    def progress(self):
+        return self.client.get(f'/api/challenges/{self.challenge.id}/progress/')
+
+    def test_participant_count_follows_joins_and_leaves(self):
+        stale = Challenge.objects.get(pk=self.challenge.pk)
+        self.join(self.creator)
+        membership = self.join(self.member)
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.participant_count, 2)
+
+        # Saving an instance loaded before the joins keeps the count.
+        stale.title = "Renamed"
+        stale.save()
+        self.challenge.refresh_from_db()
+        self.assertEqual((self.challenge.title, self.challenge.participant_count), ("Renamed", 2))
+
+        membership.delete()
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.participant_count, 1)
+
+        response = self.client.get('/api/challenges/')
+        self.assertEqual(response.data['results'][0]['participant_count'], 1)
+
+    def test_progress_snapshot_refreshes_when_progress_advances(self):
+        self.join(self.member)
+        response = self.progress()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['percentage'], response.data['last_contributor']), (0.0, None))
+        self.assertEqual(response.data['participant_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            advance_challenge_progress(self.member, 2.5)
+
+        response = self.progress()
+        self.assertEqual(response.data['current_progress'], 2.5)
+        self.assertEqual(response.data['percentage'], 25.0)
+        self.assertEqual(response.data['last_contributor'], 'snap_m')
+        self.assertIsNotNone(response.data['updated_at'])
+        self.assertNotIn('creator_id', response.data)
+
+    def test_join_refreshes_progress_after_commit(self):
+        self.assertEqual(self.progress().data['participant_count'], 0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.join(self.member)
+            # A read before the join commits must not re-cache the old count.
+            self.assertEqual(self.progress().data['participant_count'], 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.progress().data['participant_count'], 1)
+
+    def test_invalidation_reaches_other_cache_connections(self):
+        """A worker process invalidating through its own connection refreshes the web process's reads."""
+        web, worker = caches.create_connection('default'), caches.create_connection('default')
+        with patch('challenges.snapshot.cache', web):
+            self.assertEqual(self.progress().data['participant_count'], 0)
+        with patch('challenges.snapshot.cache', worker), self.captureOnCommitCallbacks(execute=True):
+            self.join(self.member)
+        with patch('challenges.snapshot.cache', web):
+            self.assertEqual(self.progress().data['participant_count'], 1)
+
+    def test_last_contributor_respects_waste_stats_privacy(self):
+        self.join(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            advance_challenge_progress(self.member, 2.5)
+        self.assertEqual(self.progress().data['last_contributor'], 'snap_m')
+        listing = self.client.get('/api/challenges/')
+        self.assertEqual(listing.data['results'][0]['last_contributor'], self.member.id)
+
+        self.member.waste_stats_privacy = 'private'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.save(update_fields=['waste_stats_privacy'])
+        self.assertIsNone(self.progress().data['last_contributor'])
+        listing = self.client.get('/api/challenges/')
+        self.assertIsNone(listing.data['results'][0]['last_contributor'])
+
+        # The contributor still sees themselves; anonymization hides them from others.
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.progress().data['last_contributor'], 'snap_m')
+        self.member.waste_stats_privacy = 'public'
+        self.member.is_anonymous = True
+        self.member.save(update_fields=['waste_stats_privacy', 'is_anonymous'])
+        self.client.force_authenticate(user=self.creator)
+        self.assertIsNone(self.progress().data['last_contributor'])
+        listing = self.client.get('/api/challenges/')
+        self.assertIsNone(listing.data['results'][0]['last_contributor'])
+
+    def test_listing_checks_followers_only_contributors_with_one_query(self):
+        viewer = User.objects.create_user(email="snap_v@example.com", username="snap_v", password="pw")
+        contributors = []
+        for i in range(3):
+            contributor = User.objects.create_user(
+                email=f"snap_f{i}@example.com", username=f"snap_f{i}", password="pw", waste_stats_privacy='followers'
+            )
+            Challenge.objects.create(
+                title=f"Followers {i}", is_public=True, target_amount=10, creator=self.creator,
+                last_contributor=contributor,
+            )
+            contributors.append(contributor)
+        Follow.objects.create(follower=viewer, following=contributors[0])
+
+        self.client.force_authenticate(user=viewer)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/challenges/')
+        shown = {row['title']: row['last_contributor'] for row in response.data['results']}
+        self.assertEqual(shown['Followers 0'], contributors[0].id)
+        self.assertIsNone(shown['Followers 1'])
+        self.assertIsNone(shown['Followers 2'])
+        self.assertEqual(sum('"Follows"' in q['sql'] for q in queries.captured_queries), 1)
+
+    def test_private_progress_only_visible_to_creator(self):
+        Challenge.objects.filter(pk=self.challenge.pk).update(is_public=False)
+        self.assertEqual(self.progress().status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.creator)
+        self.assertEqual(self.progress().status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get('/api/challenges/999999/progress/').status_code, status.HTTP_404_NOT_FOUND
+        )
+
+
+class ChallengeJoinTests(TestCase):
+    """Transactional join: limit, duplicates and batched notifications."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.creator = User.objects.create_user(email="join_c@example.com", username="join_c", password="pw")
+        self.user = User.objects.create_user(email="join_u@example.com", username="join_u", password="pw")
+        self.client.force_authenticate(user=self.user)
+
+    def make(self, **kwargs):
+        return Challenge.objects.create(title="Join", is_public=True, target_amount=10, creator=self.creator, **kwargs)
+
+    def join(self, challenge):
+        return self.client.post('/api/challenges/participate/', {"challenge": challenge.id}, format='json')
+
+    def test_join_notifies_joiner_and_creator_after_commit(self):
+        challenge = self.make()
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.join(challenge)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(Notification.objects.exists())
+        for callback in callbacks:
+            callback()
+
+        notifications = Notification.objects.filter(category=Notification.CHALLENGE)
+        self.assertEqual(set(notifications.values_list('user_id', flat=True)), {self.user.id, self.creator.id})
+        self.assertEqual(NotificationOutbox.objects.count(), 2)
+
+        response = self.join(challenge)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already participating", str(response.data['errors']))
+
+    def test_limit_counts_only_active_challenges(self):
+        done = self.make()
+        UserChallenge.objects.create(user=self.user, challenge=done, joined_date=timezone.now())
+        Challenge.objects.filter(pk=done.pk).update(current_progress=10, is_active=False)
+        # Past its deadline but not swept yet: still flagged active, no longer counted.
+        expired = self.make()
+        UserChallenge.objects.create(user=self.user, challenge=expired, joined_date=timezone.now())
+        Challenge.objects.filter(pk=expired.pk).update(deadline=timezone.now() - timedelta(hours=1))
+        for _ in range(3):
+            self.assertEqual(self.join(self.make()).status_code, status.HTTP_201_CREATED)
+
+        response = self.join(self.make())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("maximum of 3 active challenges", str(response.data['errors']))
+        self.assertEqual(UserChallenge.objects.filter(user=self.user).count(), 5)
@@ -6,11 +6,13 @@ from .views import (
     ChallengeParticipationView,
     ChallengeEnrolledView,
     ChallengeUserEnrolledView,
+    ChallengeProgressView,
 )
 
 urlpatterns = [
     path('', ChallengeListCreateView.as_view(), name='challenge-list-create'),
     path('<int:pk>/update/', ChallengeUpdateView.as_view(), name='challenge-update'),
+    path('<int:pk>/progress/', ChallengeProgressView.as_view(), name='challenge-progress'),
     path('<int:pk>/delete/', ChallengeDeleteView.as_view(), name='challenge-delete'),
     path('participate/', ChallengeParticipationView.as_view(), name='challenge-participation'),
     path('enrolled/', ChallengeEnrolledView.as_view(), name='challenge-enrolled'),
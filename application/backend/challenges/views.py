@@ -1,11 +1,24 @@
 from rest_framework import generics, permissions, status
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.core.cache import cache
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
 from django.contrib.auth import get_user_model
-from django.db.models import Q, F
+from django.db import transaction
+from django.db.models import Q
+from .listing import active_challenges, listing_cache_key, listing_cache_ttl
+from .snapshot import get_progress_snapshot, last_contributor_for, load_contributor
 from .models import Challenge, UserChallenge
 from .serializers import ChallengeSerializer, ChallengeParticipationSerializer
-from notifications.utils import send_notification, send_bulk_notifications
+from notifications.models import Notification
+from notifications.utils import send_notification_batch
+
+class ChallengePagination(PageNumberPagination):
+    page_size = 60
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 
 @extend_schema(
     tags=['Challenges'],
@@ -40,10 +53,11 @@ class ChallengeListCreateView(generics.ListCreateAPIView):
     queryset = Challenge.objects.all()
     serializer_class = ChallengeSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = ChallengePagination
 
     @extend_schema(
-        summary="List all incomplete challenges",
-        description="Retrieve all incomplete challenges (excluding completed ones where current_progress >= target_amount). Authenticated users see public incomplete challenges and their own incomplete private challenges. Unauthenticated users see only public incomplete challenges."
+        summary="List all active challenges",
+        description="Retrieve active challenges (not completed and not past their deadline), paginated with `page` and `page_size` (max 100). Authenticated users see public active challenges and their own active private challenges. Unauthenticated users see only public active challenges; that listing is cached for a few seconds."
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -58,21 +72,32 @@ class ChallengeListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         '''
         Customize the queryset to show public challenges to everyone and non-public challenges only to their creators.
-        Exclude completed challenges (where current_progress >= target_amount).
+        Only active challenges (not completed, deadline not passed) are listed.
         '''
-        from django.db.models import Q
         user = self.request.user
-        
-        # Filter out completed challenges
-        incomplete_filter = Q(current_progress__lt=F('target_amount')) | Q(target_amount__isnull=True)
-        
+        # The serializer checks the last contributor's privacy settings.
+        queryset = Challenge.objects.select_related('last_contributor')
+
         if user.is_authenticated:
-            # Authorized users can see their own incomplete challenges and public incomplete challenges
-            return (Challenge.objects.filter(is_public=True) | Challenge.objects.filter(creator=user)).filter(incomplete_filter)
+            # Authorized users can see their own active challenges and public active challenges
+            return active_challenges(queryset.filter(Q(is_public=True) | Q(creator=user)))
         else:
-            # Unauthenticated users can only see public incomplete challenges
-            return Challenge.objects.filter(is_public=True).filter(incomplete_filter)
-        
+            # Unauthenticated users can only see public active challenges
+            return active_challenges(queryset.filter(is_public=True))
+
+    def list(self, request, *args, **kwargs):
+        '''
+        Serve the anonymous (public-only) listing from the cache.
+        '''
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        key = listing_cache_key(request.build_absolute_uri())
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, listing_cache_ttl())
+        return Response(data)
+
     def perform_create(self, serializer):
         '''
         Set the creator of the challenge to the current user when creating a new challenge.
@@ -80,6 +105,46 @@ class ChallengeListCreateView(generics.ListCreateAPIView):
         serializer.save(creator=self.request.user)
 
 
+@extend_schema(
+    summary="Get challenge progress",
+    description="Progress snapshot for a progress bar: current progress, target, percentage, participant count, last contributor and when progress last changed. Private challenges are only visible to their creator. The last contributor is null when their waste stats are hidden from the viewer (waste_stats_privacy or anonymization). Served from a per-challenge cache that is refreshed whenever progress changes.",
+    responses={
+        200: OpenApiResponse(
+            description="Progress retrieved successfully",
+            examples=[
+                OpenApiExample(
+                    'Success Response',
+                    value={
+                        'challenge_id': 5,
+                        'current_progress': 42.5,
+                        'target_amount': 100.0,
+                        'percentage': 42.5,
+                        'participant_count': 18,
+                        'is_active': True,
+                        'last_contributor': 'recycler42',
+                        'updated_at': '2025-11-22T14:30:00Z'
+                    }
+                )
+            ]
+        ),
+        404: OpenApiResponse(description="Challenge not found")
+    },
+    tags=['Challenges']
+)
+class ChallengeProgressView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        snapshot = get_progress_snapshot(pk)
+        if snapshot is None or not (
+            snapshot['is_public'] or (request.user.is_authenticated and snapshot['creator_id'] == request.user.id)
+        ):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        data = {k: v for k, v in snapshot.items() if k not in ('is_public', 'creator_id', 'last_contributor_id')}
+        data['last_contributor'] = last_contributor_for(request.user, load_contributor(snapshot['last_contributor_id']))
+        return Response(data)
+
+
 @extend_schema(
     summary="Update a challenge",
     description="Update challenge details. Public challenges can only be updated by admins. Private challenges can only be updated by their creator. Cannot manually update current_progress.",
@@ -209,23 +274,21 @@ class ChallengeParticipationView(generics.CreateAPIView):
         return context
     
     def perform_create(self, serializer):
-        """Override to send notification after joining challenge"""
+        """Queue the joiner's and creator's notifications as one batch after commit"""
         user_challenge = serializer.save()
         challenge = user_challenge.challenge
-        
-        # Send notification to user
+        user = user_challenge.user
+
         deadline_info = f" Deadline: {challenge.deadline.strftime('%B %d, %Y at %I:%M %p')}" if challenge.deadline else ""
-        send_notification(
-            user_challenge.user,
-            f"You've joined the challenge '{challenge.title}'! Target: {challenge.target_amount} kg.{deadline_info}"
-        )
-        
+        messages = [(
+            user.id,
+            f"You've joined the challenge '{challenge.title}'! Target: {challenge.target_amount} kg.{deadline_info}",
+        )]
         # Notify challenge creator if it's not the same user
-        if challenge.creator and challenge.creator != user_challenge.user:
-            send_notification(
-                challenge.creator,
-                f"{user_challenge.user.username} has joined your challenge '{challenge.title}'!"
-            )
+        if challenge.creator_id and challenge.creator_id != user.id:
+            messages.append((challenge.creator_id, f"{user.username} has joined your challenge '{challenge.title}'!"))
+
+        transaction.on_commit(lambda: send_notification_batch(messages, category=Notification.CHALLENGE))
 
 
 @extend_schema(
@@ -0,0 +1,75 @@
+"""
+Small in-process cache of websocket users keyed by access-token `jti`.
+
+Reconnecting clients re-send the same access token, so the user lookup is
+done once per token (bounded by the token's own expiry) instead of once per
+`authenticate` message. Only the fields the consumer needs are cached.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+@dataclass(frozen=True)
+class SocketUser:
+    id: int
+    username: str
+
+
+class TokenUserCache:
+    def __init__(self, ttl=None, max_size=None):
+        self.ttl = ttl if ttl is not None else getattr(settings, "NOTIFICATION_WS_USER_CACHE_TTL", 300)
+        self.max_size = max_size or getattr(settings, "NOTIFICATION_WS_USER_CACHE_SIZE", 10000)
+        self._entries = OrderedDict()
+
+    def get(self, jti):
+        entry = self._entries.get(jti)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at <= time.time():
+            self._entries.pop(jti, None)
+            return None
+        self._entries.move_to_end(jti)
+        return user
+
+    def set(self, jti, user, token_exp=None):
+        expires_at = time.time() + self.ttl
+        if token_exp:
+            expires_at = min(expires_at, token_exp)
+        self._entries[jti] = (user, expires_at)
+        self._entries.move_to_end(jti)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+token_user_cache = TokenUserCache()
+
+
+async def aget_token_user(access):
+    """
+    Resolve a validated AccessToken to a SocketUser, hitting the database
+    only on a cache miss. Raises User.DoesNotExist for unknown or inactive users.
+    """
+    jti = access.get("jti")
+    if jti:
+        cached = token_user_cache.get(jti)
+        if cached is not None:
+            return cached
+
+    user_id = access.get("user_id")
+    if not user_id:
+        raise ValueError("Token missing user_id claim")
+    row = await User.objects.filter(id=user_id, is_active=True).values("id", "username").aget()
+    user = SocketUser(id=row["id"], username=row["username"])
+    if jti:
+        token_user_cache.set(jti, user, token_exp=access.get("exp"))
+    return user
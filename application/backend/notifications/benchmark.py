@@ -0,0 +1,169 @@
+"""
+Connection-scale benchmark for NotificationConsumer.
+
+Opens many websocket connections against the consumer in-process (via
+channels' WebsocketCommunicator), authenticates them, fans notifications out
+through the channel layer and measures connect rate, delivery latency and
+memory per connection. Used by `manage.py bench_notification_sockets`.
+"""
+import asyncio
+import secrets
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import List
+
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import ActivityEvent
+
+from .auth_cache import token_user_cache
+from .consumers import NotificationConsumer
+
+User = get_user_model()
+
+BENCH_USER_PREFIX = "wsbench_"
+
+
+@dataclass
+class BenchmarkReport:
+    connections: int
+    users: int
+    connect_seconds: float
+    deliveries: int = 0
+    lost: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    memory_bytes: int = 0
+
+    @property
+    def connect_rate(self):
+        return self.connections / self.connect_seconds if self.connect_seconds else 0.0
+
+    @property
+    def memory_per_connection(self):
+        return self.memory_bytes / self.connections if self.connections else 0
+
+    def percentile(self, pct):
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+def create_bench_users(count):
+    """
+    Create `count` throwaway users for one run and return them with access
+    tokens. Usernames carry a per-run suffix, so existing accounts (even
+    ones named wsbench_*) are never reused or touched.
+    """
+    run = secrets.token_hex(4)
+    users = []
+    for i in range(count):
+        username = f"{BENCH_USER_PREFIX}{run}_{i}"
+        user = User.objects.create_user(email=f"{username}@bench.invalid", username=username, password=None)
+        users.append((user, str(AccessToken.for_user(user))))
+    return users
+
+
+def using_test_database():
+    """Whether the default connection points at a test database (as under `manage.py test`)."""
+    name = str(connection.settings_dict["NAME"])
+    test_name = connection.settings_dict.get("TEST", {}).get("NAME")
+    if test_name:
+        return name == test_name
+    return name.startswith("test_") or (connection.vendor == "sqlite" and connection.creation.is_in_memory_db(name))
+
+
+def delete_bench_users(users):
+    """
+    Delete the users created by `create_bench_users` for this run, and nothing
+    else, together with the Person activity events their creation and
+    deletion logged (ActivityEvent has no FK to cascade from).
+    """
+    # Keyed on the run's unique usernames: the "deleted" events are written
+    # after Django has cleared the instances' pks.
+    events = ActivityEvent.objects.filter(object_type="Person", actor_id__in=[user.username for user, _ in users])
+    with transaction.atomic():
+        deleted = User.objects.filter(pk__in=[user.pk for user, _ in users]).delete()[0]
+        # Registered after the activity signals' own on_commit writers, so it
+        # also removes the "deleted" events they log.
+        transaction.on_commit(events.delete)
+    return deleted
+
+
+async def _open(token, semaphore, timeout):
+    async with semaphore:
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        connected, _ = await communicator.connect(timeout=timeout)
+        if not connected:
+            raise RuntimeError("Websocket connection refused")
+        await communicator.send_json_to({"action": "authenticate", "token": token})
+        reply = await communicator.receive_json_from(timeout=timeout)
+        if reply.get("type") != "auth_success":
+            raise RuntimeError(f"Authentication failed: {reply}")
+        return communicator
+
+
+async def _receive_latencies(communicator, expected, timeout):
+    latencies, lost = [], 0
+    for _ in range(expected):
+        try:
+            data = await communicator.receive_json_from(timeout=timeout)
+        except asyncio.TimeoutError:
+            lost += 1
+            continue
+        latencies.append((time.perf_counter() - data["sent_at"]) * 1000)
+    return latencies, lost
+
+
+async def run_benchmark(users, connections, rounds=3, connect_concurrency=200, timeout=10):
+    """
+    `users` is a list of (user, token) pairs; connections are spread over
+    them round-robin, so each fan-out reaches connections / len(users)
+    sockets per user group.
+    """
+    token_user_cache.clear()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    semaphore = asyncio.Semaphore(connect_concurrency)
+    started = time.perf_counter()
+    sockets = await asyncio.gather(*(
+        _open(users[i % len(users)][1], semaphore, timeout) for i in range(connections)
+    ))
+    connect_seconds = time.perf_counter() - started
+
+    current, _ = tracemalloc.get_traced_memory()
+    report = BenchmarkReport(
+        connections=connections,
+        users=len(users),
+        connect_seconds=connect_seconds,
+        memory_bytes=max(0, current - baseline),
+    )
+    tracemalloc.stop()
+
+    layer = get_channel_layer()
+    try:
+        for round_no in range(rounds):
+            receivers = [
+                asyncio.ensure_future(_receive_latencies(socket, 1, timeout)) for socket in sockets
+            ]
+            await asyncio.gather(*(
+                layer.group_send(
+                    f"user_{user.id}",
+                    {"type": "notify", "data": {"id": round_no, "message": "bench", "sent_at": time.perf_counter()}},
+                )
+                for user, _ in users
+            ))
+            for latencies, lost in await asyncio.gather(*receivers):
+                report.latencies_ms.extend(latencies)
+                report.deliveries += len(latencies)
+                report.lost += lost
+    finally:
+        await asyncio.gather(*(socket.disconnect() for socket in sockets))
+    return report
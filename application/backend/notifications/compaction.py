@@ -0,0 +1,129 @@
+"""
+Retention and compaction for the Notification table.
+
+Old *read* notifications in high-volume categories (challenge reminders,
+badges) are collapsed into one read digest per user per day, and read
+notifications older than the retention window are deleted in small batches.
+Unread notifications are never selected, and every delete goes through
+counters.delete_notifications, so unread counters stay exact either way.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .counters import delete_notifications
+from .models import Notification
+
+
+@dataclass
+class CompactionResult:
+    digested: int = 0
+    digests_created: int = 0
+    expired_deleted: int = 0
+
+    @property
+    def reclaimed(self):
+        return self.digested - self.digests_created + self.expired_deleted
+
+
+def _day_bounds(day):
+    start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def _digest_message(day, counts):
+    labels = dict(Notification.CATEGORY_CHOICES)
+    parts = ", ".join(f"{labels.get(category, category)}: {n}" for category, n in counts.items())
+    return f"Daily digest for {day:%Y-%m-%d} — {parts}"
+
+
+def digest_old_notifications(older_than_days=None, categories=None, batch_size=500, dry_run=False, now=None):
+    """
+    Replace each user-day of old read notifications in `categories` with one
+    digest row. Only whole UTC days before the cutoff are compacted, and a
+    user-day with a single notification is left alone. Digests are stamped
+    with their insert time, not the day they cover (the message names it),
+    so notification listings leave them out of the default page.
+
+    Returns (notifications_digested, digests_created).
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, "NOTIFICATION_DIGEST_AFTER_DAYS", 30)
+    if categories is None:
+        categories = getattr(settings, "NOTIFICATION_DIGEST_CATEGORIES", [Notification.REMINDER, Notification.BADGE])
+    now = now or timezone.now()
+    cutoff, _ = _day_bounds((now - timedelta(days=older_than_days)).date())
+
+    candidates = Notification.objects.filter(read=True, category__in=categories, created_at__lt=cutoff)
+    groups = (
+        candidates.annotate(day=TruncDate("created_at"))
+        .values("user_id", "day", "category")
+        .annotate(n=Count("id"))
+        .order_by("user_id", "day", "category")
+    )
+
+    user_days = OrderedDict()
+    for row in groups:
+        user_days.setdefault((row["user_id"], row["day"]), OrderedDict())[row["category"]] = row["n"]
+    user_days = [(key, counts) for key, counts in user_days.items() if sum(counts.values()) > 1]
+
+    digested = 0
+    created = 0
+    for i in range(0, len(user_days), batch_size):
+        batch = user_days[i:i + batch_size]
+        if dry_run:
+            digested += sum(sum(counts.values()) for _, counts in batch)
+            created += len(batch)
+            continue
+
+        with transaction.atomic():
+            digests = []
+            for (user_id, day), counts in batch:
+                start, end = _day_bounds(day)
+                digested += delete_notifications(
+                    candidates.filter(user_id=user_id, created_at__gte=start, created_at__lt=end)
+                )
+                digests.append(Notification(
+                    user_id=user_id,
+                    message=_digest_message(day, counts),
+                    category=Notification.DIGEST,
+                    read=True,
+                ))
+            Notification.objects.bulk_create(digests)
+            created += len(digests)
+    return digested, created
+
+
+def delete_expired_notifications(retention_days=None, batch_size=5000, dry_run=False, now=None):
+    """Delete read notifications older than `retention_days`, `batch_size` rows per transaction."""
+    if retention_days is None:
+        retention_days = getattr(settings, "NOTIFICATION_RETENTION_DAYS", 365)
+    now = now or timezone.now()
+    expired = Notification.objects.filter(read=True, created_at__lt=now - timedelta(days=retention_days))
+    if dry_run:
+        return expired.count()
+
+    deleted = 0
+    while True:
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += delete_notifications(Notification.objects.filter(id__in=ids))
+
+
+def compact_notifications(digest_after_days=None, retention_days=None, categories=None,
+                          batch_size=5000, dry_run=False, now=None):
+    now = now or timezone.now()
+    result = CompactionResult()
+    # Expire first so rows about to be dropped are not digested.
+    result.expired_deleted = delete_expired_notifications(retention_days, batch_size, dry_run, now)
+    result.digested, result.digests_created = digest_old_notifications(
+        digest_after_days, categories, dry_run=dry_run, now=now
+    )
+    return result
@@ -1,13 +1,18 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import sync_to_async
 from rest_framework_simplejwt.tokens import AccessToken
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
+from . import counters
+from .auth_cache import aget_token_user
 from .models import Notification
 
 User = get_user_model()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -16,10 +21,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         self.is_authenticated_user = False
         self.group_names = set()
 
-        # Optional: join an anonymous group (not used for per-user notifications)
-        anon_group = "user_anon"
-        await self.channel_layer.group_add(anon_group, self.channel_name)
-        self.group_names.add(anon_group)
+        # Optional: join an anonymous group (not used for per-user notifications).
+        # Off by default: every connection would join it, making its membership O(connections).
+        if getattr(settings, "NOTIFICATIONS_JOIN_ANON_GROUP", False):
+            anon_group = "user_anon"
+            await self.channel_layer.group_add(anon_group, self.channel_name)
+            self.group_names.add(anon_group)
 
         await self.accept()
         print(f"WebSocket connected (unauthenticated) channel={self.channel_name}")
@@ -52,10 +59,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
             try:
                 access = AccessToken(token)
-                user_id = access.get("user_id")
-                if not user_id:
-                    raise ValueError("Token missing user_id claim")
-                user = await sync_to_async(User.objects.get)(id=user_id)
+                user = await aget_token_user(access)
             except Exception as e:
                 await self.send(text_data=json.dumps({"type": "auth_error", "detail": "Invalid token."}))
                 await self.close()
@@ -75,27 +79,79 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             if not self.is_authenticated_user:
                 await self.send(text_data=json.dumps({"type": "auth_required"}))
                 return
-            notifications = await self.get_notifications()
-            await self.send(text_data=json.dumps({"notifications": notifications}))
+            try:
+                since_id = self._cursor(data, "since_id")
+                before_id = self._cursor(data, "before_id")
+                page_size = self._cursor(data, "page_size") or DEFAULT_PAGE_SIZE
+            except ValueError as e:
+                await self.send(text_data=json.dumps({"type": "error", "detail": str(e)}))
+                return
+            page_size = min(page_size, MAX_PAGE_SIZE)
+
+            notifications, has_more = await self.get_notifications(since_id, before_id, page_size)
+            await self.send(text_data=json.dumps({
+                "type": "notifications",
+                "notifications": notifications,
+                "has_more": has_more,
+            }))
+            return
 
-    @sync_to_async
-    def get_notifications(self):
+        if action == "unread_count":
+            if not self.is_authenticated_user:
+                await self.send(text_data=json.dumps({"type": "auth_required"}))
+                return
+            count = await self.get_unread_count()
+            await self.send(text_data=json.dumps({"type": "unread_count", "count": count}))
+
+    @staticmethod
+    def _cursor(data, key):
+        value = data.get(key)
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"'{key}' must be a positive integer.")
+        return value
+
+    async def get_notifications(self, since_id=None, before_id=None, page_size=DEFAULT_PAGE_SIZE):
+        """
+        One page of notifications, newest first.
+        - since_id: only notifications newer than this id (what a reconnecting client missed)
+        - before_id: only notifications older than this id (scroll back)
+        has_more is True when further rows exist past the oldest one returned;
+        the client continues with before_id set to that row's id.
+        """
         if not self.is_authenticated_user or not self.user:
-            return []  # no stored notifications for anonymous
+            return [], False  # no stored notifications for anonymous
 
-        notifications = Notification.objects.filter(
-            user=self.user
-        ).order_by("-created_at")
+        # Digests carry their compaction time, not the day they cover; they
+        # are listed over REST (digests=true) rather than paged here.
+        notifications = Notification.objects.filter(user_id=self.user.id).exclude(category=Notification.DIGEST)
+        if since_id is not None:
+            notifications = notifications.filter(id__gt=since_id)
+        if before_id is not None:
+            notifications = notifications.filter(id__lt=before_id)
+
+        # ids increase with created_at, so the pk is the cursor.
+        page = notifications.order_by("-id").values("id", "message", "created_at", "read")[:page_size + 1]
+        rows = [row async for row in page.aiterator()]
+        has_more = len(rows) > page_size
 
         return [
             {
-                "id": n.id,
-                "message": n.message,
-                "created_at": n.created_at.isoformat(),
-                "read": n.read,
+                "id": n["id"],
+                "message": n["message"],
+                "created_at": n["created_at"].isoformat(),
+                "read": n["read"],
             }
-            for n in notifications
-        ]
+            for n in rows[:page_size]
+        ], has_more
+
+    async def get_unread_count(self):
+        return await counters.aget_unread_count(self.user.id)
+
+    async def unread_count(self, event):
+        """Counter update queued by mark-read / mark-all-read."""
+        await self.send(text_data=json.dumps({"type": "unread_count", "count": event["data"]["count"]}))
 
     async def notify(self, event):
         """
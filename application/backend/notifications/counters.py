@@ -0,0 +1,131 @@
+"""
+Maintained unread-notification counters.
+
+Every write that changes how many unread notifications a user has calls
+`adjust_unread` / `bulk_adjust_unread` with the delta, as a single atomic
+UPDATE on the user's counter row. A missing row is (re)built from the
+notification table, which already reflects the triggering write, so callers
+must adjust *after* inserting or updating notifications. There is no
+post_delete receiver (it would turn bulk deletes into per-row fetches), so
+code that deletes notifications goes through `delete_notifications`.
+"""
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, NotificationCounter
+from .outbox import enqueue
+
+
+def _count_unread(user_ids):
+    rows = (
+        Notification.objects.filter(user_id__in=user_ids, read=False)
+        .values("user_id")
+        .annotate(n=Count("id"))
+        .values_list("user_id", "n")
+    )
+    counts = dict(rows)
+    return {uid: counts.get(uid, 0) for uid in user_ids}
+
+
+def adjust_unread(user_id, delta):
+    """Apply `delta` to one user's unread counter."""
+    bulk_adjust_unread([user_id], delta)
+
+
+def bulk_adjust_unread(user_ids, delta=1):
+    """Apply the same `delta` to several users' counters with one UPDATE."""
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids or not delta:
+        return
+    with transaction.atomic():
+        existing = set(
+            NotificationCounter.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True)
+        )
+        if existing:
+            NotificationCounter.objects.filter(user_id__in=existing).update(
+                unread=Greatest(F("unread") + delta, 0)
+            )
+        missing = [uid for uid in user_ids if uid not in existing]
+        if missing:
+            try:
+                with transaction.atomic():
+                    NotificationCounter.objects.bulk_create(
+                        [NotificationCounter(user_id=uid, unread=n) for uid, n in _count_unread(missing).items()]
+                    )
+            except IntegrityError:
+                # Created concurrently; fall back to the atomic increment.
+                NotificationCounter.objects.filter(user_id__in=missing).update(
+                    unread=Greatest(F("unread") + delta, 0)
+                )
+
+
+def adjust_unread_counts(deltas):
+    """Apply per-user deltas ({user_id: delta}), one UPDATE per distinct delta."""
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        by_delta[delta].append(user_id)
+    for delta, user_ids in by_delta.items():
+        bulk_adjust_unread(user_ids, delta)
+
+
+def delete_notifications(queryset):
+    """
+    Delete the notifications in `queryset` and take the unread ones off their
+    users' counters. Returns the number of notifications deleted.
+    """
+    with transaction.atomic():
+        # Lock the unread rows so a concurrent mark-read can't decrement them as well.
+        unread = defaultdict(int)
+        for user_id in queryset.filter(read=False).select_for_update().values_list("user_id", flat=True):
+            unread[user_id] -= 1
+        _, per_model = queryset.delete()
+        adjust_unread_counts(unread)
+    return per_model.get(Notification._meta.label, 0)
+
+
+def lock_counters(user_ids):
+    """
+    Row-lock the users' counters until the transaction ends, creating missing
+    ones first. Every unread insert adjusts its user's counter before it
+    commits, so while the locks are held no other unread notification for
+    these users can commit.
+    """
+    user_ids = sorted(set(user_ids))
+    existing = set(NotificationCounter.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+    missing = [uid for uid in user_ids if uid not in existing]
+    if missing:
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=uid, unread=n) for uid, n in _count_unread(missing).items()],
+            ignore_conflicts=True,
+        )
+    # Ordered, so concurrent batches lock shared users in the same order.
+    list(NotificationCounter.objects.select_for_update().filter(user_id__in=user_ids).order_by("user_id").values_list("user_id"))
+
+
+def get_unread_count(user_id):
+    """Current unread total, building the counter row on first use."""
+    unread = NotificationCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+    if unread is not None:
+        return unread
+    unread = _count_unread([user_id])[user_id]
+    NotificationCounter.objects.get_or_create(user_id=user_id, defaults={"unread": unread})
+    return unread
+
+
+async def aget_unread_count(user_id):
+    """Async read of the counter; only a missing row falls back to the sync rebuild."""
+    unread = await (
+        NotificationCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).afirst()
+    )
+    if unread is not None:
+        return unread
+    return await sync_to_async(get_unread_count)(user_id)
+
+
+def push_unread_count(user_id):
+    """Queue an `unread_count` websocket event with the user's current total."""
+    enqueue(user_id, {"type": "unread_count", "data": {"count": get_unread_count(user_id)}})
@@ -0,0 +1,71 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from notifications.benchmark import create_bench_users, delete_bench_users, run_benchmark, using_test_database
+
+LAYERS = {
+    'memory': {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+}
+
+
+class Command(BaseCommand):
+    help = "Open N websocket consumers in-process, fan out notifications and report connect rate, latency and memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=1000, help='Concurrent websocket connections (default: 1000)')
+        parser.add_argument('--users', type=int, default=100, help='Distinct users the connections are spread over (default: 100)')
+        parser.add_argument('--rounds', type=int, default=3, help='Fan-out rounds to time (default: 3)')
+        parser.add_argument('--connect-concurrency', type=int, default=200, help='Handshakes in flight at once (default: 200)')
+        parser.add_argument(
+            '--layer',
+            choices=['memory', 'settings'],
+            default='memory',
+            help="'memory' uses channels' in-memory layer; 'settings' uses CHANNEL_LAYERS (e.g. a local Redis)",
+        )
+        parser.add_argument('--keep-users', action='store_true', help="Keep this run's wsbench_* users instead of deleting them")
+        parser.add_argument(
+            '--allow-non-test-db',
+            action='store_true',
+            help='Run against the configured (non-test) database; the run creates and deletes wsbench_* users there',
+        )
+
+    def handle(self, *args, **options):
+        if options['connections'] < 1 or options['users'] < 1:
+            raise CommandError("--connections and --users must be positive")
+        if not using_test_database() and not options['allow_non_test_db']:
+            raise CommandError(
+                "This benchmark writes users to the configured database "
+                f"({connection.settings_dict['NAME']}); pass --allow-non-test-db to run it there anyway"
+            )
+
+        users = create_bench_users(min(options['users'], options['connections']))
+        try:
+            if options['layer'] == 'memory':
+                with override_settings(CHANNEL_LAYERS=LAYERS['memory']):
+                    report = self._run(users, options)
+            else:
+                report = self._run(users, options)
+        finally:
+            if not options['keep_users']:
+                delete_bench_users(users)
+
+        self.stdout.write(f"Connections: {report.connections} over {report.users} user(s)")
+        self.stdout.write(f"Connect + auth: {report.connect_seconds:.2f}s ({report.connect_rate:.0f} conn/s)")
+        self.stdout.write(f"Memory per connection: {report.memory_per_connection / 1024:.1f} KiB")
+        self.stdout.write(
+            f"Delivery latency ms: p50={report.percentile(50):.2f} "
+            f"p95={report.percentile(95):.2f} p99={report.percentile(99):.2f}"
+        )
+        style = self.style.SUCCESS if not report.lost else self.style.WARNING
+        self.stdout.write(style(f"Delivered {report.deliveries} message(s), lost {report.lost}."))
+
+    def _run(self, users, options):
+        # async_to_sync keeps thread-sensitive ORM calls on this thread's connection.
+        return async_to_sync(run_benchmark)(
+            users,
+            options['connections'],
+            rounds=options['rounds'],
+            connect_concurrency=options['connect_concurrency'],
+        )
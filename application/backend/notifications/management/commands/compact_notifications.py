@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from notifications.compaction import compact_notifications
+
+
+class Command(BaseCommand):
+    help = "Collapse old read notifications into daily digests and delete read notifications past retention."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--digest-after-days',
+            type=int,
+            default=None,
+            help='Digest read notifications older than this (default: NOTIFICATION_DIGEST_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=None,
+            help='Delete read notifications older than this (default: NOTIFICATION_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--categories',
+            nargs='+',
+            default=None,
+            help='Categories to digest (default: NOTIFICATION_DIGEST_CATEGORIES)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per transaction (default: 5000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be compacted',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        result = compact_notifications(
+            digest_after_days=options['digest_after_days'],
+            retention_days=options['retention_days'],
+            categories=options['categories'],
+            batch_size=options['batch_size'],
+            dry_run=dry_run,
+        )
+
+        prefix = "[DRY RUN] Would reclaim" if dry_run else "Reclaimed"
+        style = self.style.WARNING if dry_run else self.style.SUCCESS
+        self.stdout.write(f"Expired read notifications: {result.expired_deleted}")
+        self.stdout.write(f"Digested {result.digested} notification(s) into {result.digests_created} digest(s)")
+        self.stdout.write(style(f"{prefix} {result.reclaimed} row(s)."))
@@ -0,0 +1,81 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import dispatch_pending, purge_delivered
+
+
+class Command(BaseCommand):
+    help = "Deliver queued real-time notifications from the outbox to the channel layer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', 500),
+            help='Rows claimed per batch (default: NOTIFICATION_OUTBOX_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'NOTIFICATION_SEND_CONCURRENCY', 100),
+            help='Maximum channel-layer sends in flight (default: NOTIFICATION_SEND_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=getattr(settings, 'NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 8),
+            help='Give up on a push after this many failed attempts',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for new rows instead of draining once',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the outbox is empty (with --loop)',
+        )
+        parser.add_argument(
+            '--purge-hours',
+            type=int,
+            default=24,
+            help='Delete delivered rows older than this many hours',
+        )
+
+    def drain(self, options):
+        totals = [0, 0, 0]
+        while True:
+            claimed, delivered, failed = dispatch_pending(
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+                max_attempts=options['max_attempts'],
+            )
+            totals = [totals[0] + claimed, totals[1] + delivered, totals[2] + failed]
+            # A short batch means nothing else is due right now.
+            if claimed < options['batch_size']:
+                return totals
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            claimed, delivered, failed = self.drain(options)
+            purged = purge_delivered(options['purge_hours'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Delivered {delivered} of {claimed} push(es); {failed} rescheduled or failed; purged {purged}."
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS("Notification dispatcher started."))
+        last_purge = time.monotonic()
+        while True:
+            claimed, delivered, failed = self.drain(options)
+            if failed:
+                self.stdout.write(self.style.WARNING(f"{failed} push(es) failed and were rescheduled."))
+            if time.monotonic() - last_purge > 3600:
+                purge_delivered(options['purge_hours'])
+                last_purge = time.monotonic()
+            if not claimed:
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 23:30
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='category',
+            field=models.CharField(choices=[('general', 'General'), ('reminder', 'Challenge reminder'), ('badge', 'Badge earned'), ('challenge', 'Challenge'), ('social', 'Social'), ('digest', 'Digest')], default='general', max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['read', 'created_at'], name='notif_read_created_idx'),
+        ),
+    ]
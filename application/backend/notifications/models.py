@@ -1,16 +1,86 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 user = get_user_model()
 # Create your models here.
 class Notification(models.Model):
+    GENERAL = 'general'
+    REMINDER = 'reminder'
+    BADGE = 'badge'
+    CHALLENGE = 'challenge'
+    SOCIAL = 'social'
+    DIGEST = 'digest'
+    CATEGORY_CHOICES = [
+        (GENERAL, 'General'),
+        (REMINDER, 'Challenge reminder'),
+        (BADGE, 'Badge earned'),
+        (CHALLENGE, 'Challenge'),
+        (SOCIAL, 'Social'),
+        (DIGEST, 'Digest'),
+    ]
+
     user = models.ForeignKey(user, on_delete=models.CASCADE)
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add so compaction can date digests to the day they summarise.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     read = models.BooleanField(default=False)
+    category = models.CharField(max_length=16, choices=CATEGORY_CHOICES, default=GENERAL)
 
     class Meta:
         ordering = ['-created_at']  # newest first
+        indexes = [
+            # Unread listings and counts are range scans on this index.
+            models.Index(fields=['user', 'read', 'created_at'], name='notif_user_read_created_idx'),
+            # Retention and compaction sweeps over old read rows.
+            models.Index(fields=['read', 'created_at'], name='notif_read_created_idx'),
+        ]
+
+
+    def __str__(self):
+        return f"Notification for {self.user.username}: {self.message[:20]}..."
+
+class NotificationOutbox(models.Model):
+    """
+    A pending real-time push. Rows are written in the same transaction as the
+    notification and delivered by `manage.py dispatch_notifications`, so
+    request threads never talk to the channel layer themselves.
+    """
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (DELIVERED, 'Delivered'),
+        (FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(user, on_delete=models.CASCADE, related_name='notification_outbox')
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox')
+    payload = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notif_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Outbox {self.pk} for user {self.user_id} ({self.status})"
+
 
+class NotificationCounter(models.Model):
+    """
+    Per-user unread total, kept in step with Notification writes so the unread
+    badge never has to COUNT(*) the user's notifications.
+    """
+    user = models.OneToOneField(user, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Notification for {self.user.username}: {self.message[:20]}..."
\ No newline at end of file
+        return f"{self.user_id}: {self.unread} unread"
@@ -0,0 +1,165 @@
+"""
+Real-time delivery outbox.
+
+Callers record pushes with `enqueue` inside their own transaction; the
+`dispatch_notifications` worker claims due rows in batches, sends them to the
+channel layer with a bounded number of sends in flight, and reschedules
+failures with exponential backoff until they succeed or give up.
+"""
+import asyncio
+import random
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import NotificationOutbox
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def notify_event(notification_id, message, created_at, read=False, extra_data=None):
+    """Event sent to the consumer's `notify` handler."""
+    data = {
+        "id": notification_id,
+        "message": message,
+        "created_at": created_at.isoformat(),
+        "read": read,
+    }
+    if extra_data:
+        data.update(extra_data)
+    return {"type": "notify", "data": data}
+
+
+def enqueue(user_id, payload, notification_id=None):
+    """Record one pending push. Becomes visible to the dispatcher on commit."""
+    return NotificationOutbox.objects.create(
+        user_id=user_id,
+        notification_id=notification_id,
+        payload=payload,
+    )
+
+
+def enqueue_many(rows, batch_size=None):
+    """Record many pushes at once; `rows` are (user_id, payload, notification_id) tuples."""
+    if batch_size is None:
+        batch_size = _setting("NOTIFICATION_BULK_CHUNK_SIZE", 1000)
+    return NotificationOutbox.objects.bulk_create(
+        [
+            NotificationOutbox(user_id=user_id, payload=payload, notification_id=notification_id)
+            for user_id, payload, notification_id in rows
+        ],
+        batch_size=batch_size,
+    )
+
+
+def queue_realtime_notification(user_id, message, notif_id, created_at):
+    """Queue the `notify` push for an already stored Notification."""
+    return enqueue(user_id, notify_event(notif_id, message, created_at), notification_id=notif_id)
+
+
+def backoff_delay(attempts):
+    """Seconds to wait before retry number `attempts` (1-based), with jitter."""
+    base = _setting("NOTIFICATION_OUTBOX_BACKOFF_BASE", 2)
+    cap = _setting("NOTIFICATION_OUTBOX_BACKOFF_MAX", 300)
+    delay = min(cap, base * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim_batch(batch_size, lease_seconds, now=None):
+    """
+    Lock and lease up to `batch_size` due rows. The lease pushes
+    next_attempt_at forward so parallel dispatchers skip these rows, and a
+    crashed dispatcher's rows become due again once the lease expires.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationOutbox.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if rows:
+            NotificationOutbox.objects.filter(id__in=[r.id for r in rows]).update(
+                next_attempt_at=now + timedelta(seconds=lease_seconds)
+            )
+    return rows
+
+
+async def _send_all(channel_layer, rows, concurrency):
+    """Send every row with at most `concurrency` sends in flight; returns {id: error}."""
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = {}
+
+    async def send_one(row):
+        async with semaphore:
+            try:
+                await channel_layer.group_send(f"user_{row.user_id}", row.payload)
+            except Exception as e:
+                errors[row.id] = f"{type(e).__name__}: {e}"
+
+    await asyncio.gather(*(send_one(row) for row in rows))
+    return errors
+
+
+def _record_results(rows, errors, max_attempts):
+    now = timezone.now()
+    delivered = [r.id for r in rows if r.id not in errors]
+    if delivered:
+        NotificationOutbox.objects.filter(id__in=delivered).update(
+            status=NotificationOutbox.DELIVERED,
+            delivered_at=now,
+            last_error="",
+        )
+
+    failed = [r for r in rows if r.id in errors]
+    for row in failed:
+        row.attempts += 1
+        row.last_error = errors[row.id][:1000]
+        if row.attempts >= max_attempts:
+            row.status = NotificationOutbox.FAILED
+        else:
+            row.next_attempt_at = now + timedelta(seconds=backoff_delay(row.attempts))
+    if failed:
+        NotificationOutbox.objects.bulk_update(failed, ["attempts", "last_error", "status", "next_attempt_at"])
+    return len(delivered), len(failed)
+
+
+def dispatch_pending(batch_size=None, concurrency=None, max_attempts=None, lease_seconds=60):
+    """
+    Deliver one batch of due pushes.
+
+    Returns (claimed, delivered, failed). The batch size and concurrency form
+    the in-flight window: a new batch is only claimed after the previous one
+    has been fully acknowledged or rescheduled.
+    """
+    batch_size = batch_size or _setting("NOTIFICATION_OUTBOX_BATCH_SIZE", 500)
+    concurrency = concurrency or _setting("NOTIFICATION_SEND_CONCURRENCY", 100)
+    max_attempts = max_attempts or _setting("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 8)
+
+    rows = claim_batch(batch_size, lease_seconds)
+    if not rows:
+        return 0, 0, 0
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        errors = {r.id: "No channel layer configured" for r in rows}
+    else:
+        errors = async_to_sync(_send_all)(channel_layer, rows, concurrency)
+
+    delivered, failed = _record_results(rows, errors, max_attempts)
+    return len(rows), delivered, failed
+
+
+def purge_delivered(older_than_hours=24):
+    """Drop delivered rows; they only matter until the push has gone out."""
+    cutoff = timezone.now() - timedelta(hours=older_than_hours)
+    deleted, _ = NotificationOutbox.objects.filter(
+        status=NotificationOutbox.DELIVERED, delivered_at__lt=cutoff
+    ).delete()
+    return deleted
@@ -26,3 +26,7 @@ class NotificationMarkAllReadResponseSerializer(serializers.Serializer):
     message = serializers.CharField()
     updated_count = serializers.IntegerField()
 
+
+
+class NotificationUnreadCountResponseSerializer(serializers.Serializer):
+    unread_count = serializers.IntegerField()
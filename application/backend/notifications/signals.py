@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .counters import adjust_unread
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification, dispatch_uid="notification_unread_counter")
+def count_new_unread(sender, instance: Notification, created: bool, **kwargs):
+    # Read-state changes go through queryset updates that adjust the counter
+    # themselves, and deletes through counters.delete_notifications; there is
+    # deliberately no post_delete receiver because it would turn bulk deletes
+    # into per-row fetches.
+    if created and not instance.read:
+        adjust_unread(instance.user_id, 1)
@@ -1,3 +1,337 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import ActivityEvent
+from notifications.auth_cache import TokenUserCache, aget_token_user, token_user_cache
+from notifications.benchmark import create_bench_users, delete_bench_users
+from notifications.compaction import compact_notifications
+from notifications.consumers import NotificationConsumer
+from notifications.counters import delete_notifications
+from notifications.models import Notification, NotificationCounter, NotificationOutbox
+from notifications.outbox import dispatch_pending
+from notifications.utils import send_bulk_notifications, send_notification, send_notification_batch
+
+User = get_user_model()
+
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+class BrokenLayer:
+    async def group_send(self, group, message):
+        raise ConnectionError("redis down")
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class BulkNotificationTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(email=f"bulk{i}@example.com", username=f"bulk{i}", password="pw")
+            for i in range(5)
+        ]
+
+    def test_bulk_insert_in_chunks(self):
+        created = send_bulk_notifications(User.objects.filter(username__startswith="bulk"), "hello", chunk_size=2)
+
+        self.assertEqual(len(created), 5)
+        self.assertTrue(all(n.id for n in created))
+        self.assertEqual(Notification.objects.filter(message="hello").count(), 5)
+        self.assertEqual(NotificationOutbox.objects.filter(status=NotificationOutbox.PENDING).count(), 5)
+
+    def test_empty_recipients(self):
+        self.assertEqual(send_bulk_notifications([], "nobody"), [])
+
+    def test_repeated_message_reads_distinct_ids_back_without_returning(self):
+        user = self.users[0]
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            first = send_notification_batch([(user.id, "Same"), (self.users[1].id, "Same")])
+            second = send_notification_batch([(user.id, "Same")])
+
+        ids = [n.id for n in first + second]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(set(Notification.objects.filter(message="Same").values_list("id", flat=True)), set(ids))
+        # Every row got exactly one push.
+        self.assertEqual(sorted(NotificationOutbox.objects.values_list("notification_id", flat=True)), sorted(ids))
+        self.assertEqual(NotificationCounter.objects.get(user=user).unread, 2)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class OutboxDispatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="outbox@example.com", username="outbox", password="pw")
+
+    def test_dispatcher_delivers_queued_push(self):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"user_{self.user.id}", channel)
+
+        notification = send_notification(self.user, "queued")
+
+        claimed, delivered, failed = dispatch_pending()
+        self.assertEqual((claimed, delivered, failed), (1, 1, 0))
+        event = async_to_sync(layer.receive)(channel)
+        self.assertEqual(event["type"], "notify")
+        self.assertEqual(event["data"]["id"], notification.id)
+        row = NotificationOutbox.objects.get()
+        self.assertEqual(row.status, NotificationOutbox.DELIVERED)
+        self.assertIsNotNone(row.delivered_at)
+
+    def test_failed_send_is_retried_with_backoff_then_given_up(self):
+        send_notification(self.user, "flaky")
+
+        with patch("notifications.outbox.get_channel_layer", return_value=BrokenLayer()):
+            self.assertEqual(dispatch_pending(max_attempts=2), (1, 0, 1))
+            row = NotificationOutbox.objects.get()
+            self.assertEqual(row.status, NotificationOutbox.PENDING)
+            self.assertEqual(row.attempts, 1)
+            self.assertGreater(row.next_attempt_at, timezone.now())
+            self.assertIn("redis down", row.last_error)
+
+            # Not due yet, so nothing is claimed.
+            self.assertEqual(dispatch_pending(max_attempts=2), (0, 0, 0))
+
+            NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+            dispatch_pending(max_attempts=2)
+            self.assertEqual(NotificationOutbox.objects.get().status, NotificationOutbox.FAILED)
+
+    def test_command_drains_outbox(self):
+        send_bulk_notifications([self.user], "one")
+        call_command("dispatch_notifications", stdout=StringIO())
+        self.assertFalse(NotificationOutbox.objects.filter(status=NotificationOutbox.PENDING).exists())
+
+
+def ws_exchange(token, *payloads):
+    """Authenticate a websocket with `token`, send each payload and collect one reply per payload."""
+    async def run():
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        await communicator.connect()
+        await communicator.send_json_to({"action": "authenticate", "token": token})
+        await communicator.receive_json_from()
+        replies = []
+        for payload in payloads:
+            await communicator.send_json_to(payload)
+            replies.append(await communicator.receive_json_from())
+        await communicator.disconnect()
+        return replies
+
+    return async_to_sync(run)()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class NotificationConsumerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="ws@example.com", username="wsuser", password="pw")
+        self.token = str(AccessToken.for_user(self.user))
+        self.notifications = [
+            Notification.objects.create(user=self.user, message=f"n{i}", read=i < 2) for i in range(5)
+        ]
+
+    def exchange(self, *payloads):
+        return ws_exchange(self.token, *payloads)
+
+    def test_fetch_pages_with_cursors(self):
+        ids = [n.id for n in self.notifications]
+        first, older, missed = self.exchange(
+            {"action": "fetch_notifications", "page_size": 2},
+            {"action": "fetch_notifications", "page_size": 2, "before_id": ids[3]},
+            {"action": "fetch_notifications", "since_id": ids[2]},
+        )
+
+        self.assertEqual([n["id"] for n in first["notifications"]], [ids[4], ids[3]])
+        self.assertTrue(first["has_more"])
+        self.assertEqual([n["id"] for n in older["notifications"]], [ids[2], ids[1]])
+        self.assertTrue(older["has_more"])
+        self.assertEqual([n["id"] for n in missed["notifications"]], [ids[4], ids[3]])
+        self.assertFalse(missed["has_more"])
+
+    def test_unread_count_and_bad_cursor(self):
+        count, error = self.exchange(
+            {"action": "unread_count"},
+            {"action": "fetch_notifications", "since_id": "abc"},
+        )
+        self.assertEqual(count, {"type": "unread_count", "count": 3})
+        self.assertEqual(error["type"], "error")
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="count@example.com", username="counter", password="pw")
+        self.other = User.objects.create_user(email="count2@example.com", username="counter2", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def unread(self):
+        return self.client.get("/api/notifications/unread-count/").data["unread_count"]
+
+    def test_counter_follows_create_and_mark_read(self):
+        first = send_notification(self.user, "one")
+        send_bulk_notifications([self.user, self.other], "two")
+        self.assertEqual(self.unread(), 2)
+        self.assertEqual(NotificationCounter.objects.get(user=self.other).unread, 1)
+
+        self.client.post(f"/api/notifications/{first.id}/read/")
+        self.client.post(f"/api/notifications/{first.id}/read/")
+        self.assertEqual(self.unread(), 1)
+
+        self.client.post("/api/notifications/read-all/")
+        self.assertEqual(self.unread(), 0)
+        self.assertTrue(
+            NotificationOutbox.objects.filter(user=self.user, payload__type="unread_count").exists()
+        )
+
+    def test_deleting_unread_rows_decrements_counters(self):
+        send_bulk_notifications([self.user, self.other], "one")
+        send_bulk_notifications([self.user, self.other], "two")
+        Notification.objects.filter(user=self.user, message="one").update(read=True)
+        NotificationCounter.objects.filter(user=self.user).update(unread=1)
+
+        deleted = delete_notifications(Notification.objects.all())
+
+        self.assertEqual(deleted, 4)
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 0)
+        self.assertEqual(NotificationCounter.objects.get(user=self.other).unread, 0)
+
+    def test_missing_counter_is_rebuilt_from_table(self):
+        send_notification(self.user, "one")
+        NotificationCounter.objects.all().delete()
+        self.assertEqual(self.unread(), 1)
+        send_notification(self.user, "two")
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 2)
+
+
+class CompactionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="compact@example.com", username="compact", password="pw")
+        self.now = timezone.now()
+        # Midday, so the rows below stay on one UTC day whatever time the suite runs.
+        old_day = (self.now - timedelta(days=60)).replace(hour=12, minute=0, second=0, microsecond=0)
+        for i in range(3):
+            self.make(Notification.REMINDER, old_day + timedelta(minutes=i))
+        self.make(Notification.BADGE, old_day + timedelta(minutes=5))
+        self.make(Notification.REMINDER, old_day, read=False)
+        self.make(Notification.SOCIAL, old_day)
+        self.make(Notification.REMINDER, self.now - timedelta(days=1))
+        self.make(Notification.BADGE, self.now - timedelta(days=500))
+
+    def make(self, category, created_at, read=True):
+        return Notification.objects.create(
+            user=self.user, message=category, category=category, read=read, created_at=created_at
+        )
+
+    def test_digests_old_read_rows_and_expires(self):
+        result = compact_notifications(now=self.now)
+
+        self.assertEqual(result.expired_deleted, 1)
+        self.assertEqual((result.digested, result.digests_created), (4, 1))
+        self.assertEqual(result.reclaimed, 4)
+
+        digest = Notification.objects.get(category=Notification.DIGEST)
+        self.assertTrue(digest.read)
+        self.assertIn("Challenge reminder: 3", digest.message)
+        self.assertIn("Badge earned: 1", digest.message)
+        # Unread, non-digestible and recent rows are kept.
+        self.assertEqual(Notification.objects.filter(read=False).count(), 1)
+        self.assertEqual(Notification.objects.filter(category=Notification.SOCIAL).count(), 1)
+        self.assertEqual(Notification.objects.count(), 4)
+
+    @override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+    def test_digests_stay_off_the_default_pages(self):
+        seen = Notification.objects.order_by("-id").first().id
+        compact_notifications(now=self.now)
+        digest = Notification.objects.get(category=Notification.DIGEST)
+        newest = Notification.objects.exclude(category=Notification.DIGEST).latest("created_at")
+
+        missed, page = ws_exchange(
+            str(AccessToken.for_user(self.user)),
+            {"action": "fetch_notifications", "since_id": seen},
+            {"action": "fetch_notifications"},
+        )
+        # The digest is not replayed as missed, nor listed above the
+        # notifications it is older than.
+        self.assertEqual(missed["notifications"], [])
+        self.assertEqual(page["notifications"][0]["id"], newest.id)
+        self.assertNotIn(digest.id, [n["id"] for n in page["notifications"]])
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        listing = client.get("/api/notifications/").data["results"]
+        self.assertEqual(listing[0]["id"], newest.id)
+        self.assertNotIn(digest.id, [n["id"] for n in listing])
+        digests = client.get("/api/notifications/?digests=true").data["results"]
+        self.assertEqual([n["id"] for n in digests], [digest.id])
+
+    def test_dry_run_reports_without_deleting(self):
+        out = StringIO()
+        call_command("compact_notifications", "--dry-run", stdout=out)
+        self.assertIn("[DRY RUN] Would reclaim 4 row(s).", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 8)
+
+
+class TokenUserCacheTests(TestCase):
+    def setUp(self):
+        token_user_cache.clear()
+        self.addCleanup(token_user_cache.clear)
+        self.user = User.objects.create_user(email="jti@example.com", username="jtiuser", password="pw")
+
+    def test_second_lookup_for_same_token_skips_database(self):
+        access = AccessToken.for_user(self.user)
+        first = async_to_sync(aget_token_user)(access)
+        with self.assertNumQueries(0):
+            second = async_to_sync(aget_token_user)(access)
+        self.assertEqual(first, second)
+        self.assertEqual(second.username, "jtiuser")
+
+    def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        with self.assertRaises(User.DoesNotExist):
+            async_to_sync(aget_token_user)(AccessToken.for_user(self.user))
+
+    def test_entries_expire_and_are_bounded(self):
+        cache = TokenUserCache(ttl=60, max_size=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.set("c", "C")
+        self.assertIsNone(cache.get("a"))
+        cache.set("d", "D", token_exp=1)  # token already expired
+        self.assertIsNone(cache.get("d"))
+
+
+class SocketBenchmarkTests(TestCase):
+    def test_benchmark_command_reports_metrics(self):
+        bystander = User.objects.create_user(email="wsbench_0@example.com", username="wsbench_0", password="pw")
+        out = StringIO()
+        call_command("bench_notification_sockets", "--connections", "6", "--users", "3", "--rounds", "2", stdout=out)
+        output = out.getvalue()
+        self.assertIn("Connections: 6 over 3 user(s)", output)
+        self.assertIn("p95=", output)
+        self.assertIn("Delivered 12 message(s), lost 0.", output)
+        # Only the run's own users are removed.
+        self.assertEqual(list(User.objects.filter(username__startswith="wsbench_")), [bystander])
+
+    def test_bench_users_are_removed_with_their_activity_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            users = create_bench_users(2)
+        self.assertEqual(ActivityEvent.objects.filter(object_type="Person").count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(delete_bench_users(users), 2)
+        self.assertFalse(ActivityEvent.objects.filter(object_type="Person").exists())
+
+    def test_benchmark_refuses_a_non_test_database(self):
+        with patch("notifications.management.commands.bench_notification_sockets.using_test_database", return_value=False):
+            with self.assertRaises(CommandError):
+                call_command("bench_notification_sockets", "--connections", "1", "--users", "1", stdout=StringIO())
+        self.assertFalse(User.objects.filter(username__startswith="wsbench_").exists())
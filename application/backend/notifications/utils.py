@@ -1,138 +1,143 @@
 """
 Notification utility functions for sending notifications to users.
-Handles both database storage and real-time WebSocket delivery.
+Handles database storage; real-time WebSocket delivery is queued in the
+outbox and performed by `manage.py dispatch_notifications`.
 """
-import json
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from .counters import adjust_unread_counts, lock_counters
 from .models import Notification
+from .outbox import enqueue, enqueue_many, notify_event
 
 
-def send_notification(user, message):
+def send_notification(user, message, category=Notification.GENERAL):
     """
     Send a notification to a single user.
-    
+
     Args:
         user: User instance to receive the notification
         message: String message content
-        
+        category: Notification category (used by retention/compaction)
+
     Returns:
         The created Notification instance
     """
-    # Save to database
-    notification = Notification.objects.create(
-        user=user,
-        message=message
-    )
-    
-    # Send real-time via WebSocket
-    channel_layer = get_channel_layer()
-    if channel_layer:
-        try:
-            async_to_sync(channel_layer.group_send)(
-                f"user_{user.id}",
-                {
-                    "type": "notify",
-                    "data": {
-                        "id": notification.id,
-                        "message": notification.message,
-                        "created_at": notification.created_at.isoformat(),
-                        "read": False
-                    }
-                }
-            )
-        except Exception as e:
-            # Log error but don't fail the request
-            print(f"Error sending real-time notification: {e}")
-    
-    return notification
+    return send_custom_notification(user, message, category=category)
+
+
+def _user_ids(users):
+    if isinstance(users, QuerySet):
+        return list(users.values_list("id", flat=True))
+    return [getattr(u, "id", u) for u in users]
 
 
-def send_bulk_notifications(users, message):
+def send_bulk_notifications(users, message, chunk_size=None, category=Notification.GENERAL):
     """
     Send the same notification to multiple users.
-    
+
+    Rows and their outbox entries are inserted with bulk_create in chunks and
+    unread counters get one UPDATE per chunk (bulk_create skips post_save),
+    so a large fan-out costs a handful of statements and no channel-layer
+    round-trips inside the request.
+
     Args:
-        users: QuerySet or list of User instances
+        users: QuerySet or list of User instances (or user ids)
         message: String message content
-        
+        chunk_size: Rows per INSERT (default NOTIFICATION_BULK_CHUNK_SIZE)
+        category: Notification category (used by retention/compaction)
+
+    Returns:
+        List of created Notification instances
+    """
+    return send_notification_batch(
+        [(uid, message) for uid in dict.fromkeys(_user_ids(users))],
+        chunk_size=chunk_size,
+        category=category,
+    )
+
+
+def send_notification_batch(messages, chunk_size=None, category=Notification.GENERAL):
+    """
+    Send per-user messages in bulk, like send_bulk_notifications.
+
+    Args:
+        messages: Iterable of (user_id, message) pairs, one notification each
+            (equal pairs included, e.g. reminders for two same-named challenges)
+        chunk_size: Rows per INSERT (default NOTIFICATION_BULK_CHUNK_SIZE)
+        category: Notification category (used by retention/compaction)
+
     Returns:
         List of created Notification instances
     """
+    if chunk_size is None:
+        chunk_size = getattr(settings, "NOTIFICATION_BULK_CHUNK_SIZE", 1000)
+    pairs = list(messages)
+    if not pairs:
+        return []
+
     notifications = []
-    channel_layer = get_channel_layer()
-    
-    for user in users:
-        # Save to database
-        notification = Notification.objects.create(
-            user=user,
-            message=message
-        )
-        notifications.append(notification)
-        
-        # Send real-time via WebSocket
-        if channel_layer:
-            try:
-                async_to_sync(channel_layer.group_send)(
-                    f"user_{user.id}",
-                    {
-                        "type": "notify",
-                        "data": {
-                            "id": notification.id,
-                            "message": notification.message,
-                            "created_at": notification.created_at.isoformat(),
-                            "read": False
-                        }
-                    }
+    with transaction.atomic():
+        for i in range(0, len(pairs), chunk_size):
+            chunk = pairs[i:i + chunk_size]
+            returns_ids = connection.features.can_return_rows_from_bulk_insert
+            if not returns_ids:
+                # MySQL doesn't set pks on bulk_create. With the users' counters
+                # locked, their only rows above the current maximum are ours.
+                user_ids = {uid for uid, _ in chunk}
+                lock_counters(user_ids)
+                floor = Notification.objects.order_by("-id").values_list("id", flat=True).first() or 0
+            created = Notification.objects.bulk_create(
+                [Notification(user_id=uid, message=message, category=category) for uid, message in chunk],
+                batch_size=chunk_size,
+            )
+            if not returns_ids:
+                # One INSERT assigns increasing ids in row order.
+                ids = list(
+                    Notification.objects.filter(user_id__in=user_ids, category=category, id__gt=floor)
+                    .order_by("id").values_list("id", flat=True)
                 )
-            except Exception as e:
-                print(f"Error sending real-time notification to user {user.id}: {e}")
-    
+                if len(ids) != len(created):
+                    raise RuntimeError(f"Expected {len(created)} new notifications, found {len(ids)}")
+                for notification, pk in zip(created, ids):
+                    notification.pk = notification.id = pk
+
+            enqueue_many(
+                [(n.user_id, notify_event(n.id, n.message, n.created_at), n.id) for n in created],
+                batch_size=chunk_size,
+            )
+            # A user can get several messages in one chunk; one UPDATE per distinct count.
+            adjust_unread_counts(Counter(n.user_id for n in created))
+            notifications.extend(created)
+
     return notifications
 
 
-def send_custom_notification(user, message, extra_data=None):
+def send_custom_notification(user, message, extra_data=None, category=Notification.GENERAL):
     """
     Send a notification with custom data fields.
-    
+
     Args:
         user: User instance to receive the notification
         message: String message content
         extra_data: Optional dict of additional data to include in real-time notification
-        
+        category: Notification category (used by retention/compaction)
+
     Returns:
         The created Notification instance
     """
-    # Save to database
-    notification = Notification.objects.create(
-        user=user,
-        message=message
-    )
-    
-    # Prepare notification data
-    notification_data = {
-        "id": notification.id,
-        "message": notification.message,
-        "created_at": notification.created_at.isoformat(),
-        "read": False
-    }
-    
-    # Merge extra data if provided
-    if extra_data:
-        notification_data.update(extra_data)
-    
-    # Send real-time via WebSocket
-    channel_layer = get_channel_layer()
-    if channel_layer:
-        try:
-            async_to_sync(channel_layer.group_send)(
-                f"user_{user.id}",
-                {
-                    "type": "notify",
-                    "data": notification_data
-                }
-            )
-        except Exception as e:
-            print(f"Error sending custom notification: {e}")
-    
+    with transaction.atomic():
+        notification = Notification.objects.create(
+            user=user,
+            message=message,
+            category=category
+        )
+        enqueue(
+            user.id,
+            notify_event(notification.id, notification.message, notification.created_at, extra_data=extra_data),
+            notification_id=notification.id,
+        )
+
     return notification
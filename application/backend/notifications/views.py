@@ -1,15 +1,18 @@
+from django.db import transaction
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 
+from .counters import adjust_unread, get_unread_count, push_unread_count
 from .models import Notification
 from .serializers import (
     NotificationSerializer,
     NotificationListResponseSerializer,
     NotificationMarkReadResponseSerializer,
     NotificationMarkAllReadResponseSerializer,
+    NotificationUnreadCountResponseSerializer,
 )
 
 
@@ -26,11 +29,12 @@ class NotificationListView(generics.ListAPIView):
 
     @extend_schema(
         summary="List notifications",
-        description="List notifications for the authenticated user. Supports pagination and filtering unread notifications.",
+        description="List notifications for the authenticated user, newest first. Supports pagination and filtering unread notifications. Daily digests are listed separately with digests=true.",
         parameters=[
             OpenApiParameter(name="page", type=int, location=OpenApiParameter.QUERY, required=False),
             OpenApiParameter(name="page_size", type=int, location=OpenApiParameter.QUERY, required=False),
             OpenApiParameter(name="unread", type=bool, location=OpenApiParameter.QUERY, required=False, description="When true, returns only unread notifications."),
+            OpenApiParameter(name="digests", type=bool, location=OpenApiParameter.QUERY, required=False, description="When true, returns only daily digests of compacted notifications, which the default listing leaves out."),
         ],
         responses={200: NotificationListResponseSerializer},
         tags=["Notifications"],
@@ -40,6 +44,13 @@ class NotificationListView(generics.ListAPIView):
 
     def get_queryset(self):
         qs = Notification.objects.filter(user=self.request.user).order_by("-created_at")
+        # Digests are stamped when compaction runs, so they would sort above
+        # the current notifications they are older than.
+        digests = self.request.query_params.get("digests")
+        if isinstance(digests, str) and digests.lower() in {"1", "true", "yes"}:
+            qs = qs.filter(category=Notification.DIGEST)
+        else:
+            qs = qs.exclude(category=Notification.DIGEST)
         unread = self.request.query_params.get("unread")
         if isinstance(unread, str) and unread.lower() in {"1", "true", "yes"}:
             qs = qs.filter(read=False)
@@ -68,8 +79,12 @@ class NotificationMarkReadView(generics.GenericAPIView):
             return Response({"error": "Notification not found."}, status=status.HTTP_404_NOT_FOUND)
 
         if not n.read:
+            # Conditional UPDATE so a double click can't decrement twice.
+            with transaction.atomic():
+                if Notification.objects.filter(id=n.id, read=False).update(read=True):
+                    adjust_unread(request.user.id, -1)
+                    push_unread_count(request.user.id)
             n.read = True
-            n.save(update_fields=["read"])
 
         return Response(
             {"message": "Notification marked as read.", "notification": NotificationSerializer(n).data},
@@ -88,8 +103,26 @@ class NotificationMarkAllReadView(generics.GenericAPIView):
         tags=["Notifications"],
     )
     def post(self, request):
-        updated = Notification.objects.filter(user=request.user, read=False).update(read=True)
+        with transaction.atomic():
+            updated = Notification.objects.filter(user=request.user, read=False).update(read=True)
+            if updated:
+                adjust_unread(request.user.id, -updated)
+                push_unread_count(request.user.id)
         return Response(
             {"message": "All notifications marked as read.", "updated_count": updated},
             status=status.HTTP_200_OK,
         )
+
+
+class NotificationUnreadCountView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = NotificationUnreadCountResponseSerializer
+
+    @extend_schema(
+        summary="Unread notification count",
+        description="Returns the authenticated user's unread total from the maintained counter (no scan of the notification list).",
+        responses={200: NotificationUnreadCountResponseSerializer},
+        tags=["Notifications"],
+    )
+    def get(self, request):
+        return Response({"unread_count": get_unread_count(request.user.id)}, status=status.HTTP_200_OK)
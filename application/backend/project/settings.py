@@ -271,4 +271,97 @@ CHANNEL_LAYERS = {
             "hosts": [("redis", 6379)],  # 'redis' = docker-compose service name
         },
     },
-}
\ No newline at end of file
+}
+
+# Shared by the web process and the worker containers, so invalidations made by
+# a worker (challenge progress, sweeps, stats reconciliation) reach the web process.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://redis:6379/1",
+    },
+}
+
+if 'test' in sys.argv:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
+# Activity event retention
+# Whole months older than this are moved to compressed JSONL archives by
+# `python manage.py archive_activity_events`; listings only query this window.
+ACTIVITY_EVENT_RETENTION_DAYS = 180
+# Archives are kept outside MEDIA_ROOT because media/ is served publicly.
+ACTIVITY_ARCHIVE_ROOT = BASE_DIR / 'archives' / 'activity_events'
+
+# Notification fan-out
+# Rows per bulk INSERT and max concurrent channel-layer sends per fan-out.
+NOTIFICATION_BULK_CHUNK_SIZE = 1000
+NOTIFICATION_SEND_CONCURRENCY = 100
+# Outbox dispatcher (`python manage.py dispatch_notifications --loop`):
+# rows per batch, retry limit and exponential backoff bounds in seconds.
+NOTIFICATION_OUTBOX_BATCH_SIZE = 500
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 8
+NOTIFICATION_OUTBOX_BACKOFF_BASE = 2
+NOTIFICATION_OUTBOX_BACKOFF_MAX = 300
+# Notification compaction (`python manage.py compact_notifications`): read
+# notifications in these categories are folded into daily digests after
+# NOTIFICATION_DIGEST_AFTER_DAYS; read ones are deleted after the retention window.
+NOTIFICATION_DIGEST_AFTER_DAYS = 30
+NOTIFICATION_DIGEST_CATEGORIES = ['reminder', 'badge']
+NOTIFICATION_RETENTION_DAYS = 365
+# Websocket authentication cache: users resolved from an access token are
+# kept per token jti for this many seconds (never past the token's expiry).
+NOTIFICATION_WS_USER_CACHE_TTL = 300
+NOTIFICATION_WS_USER_CACHE_SIZE = 10000
+# Join every websocket to the shared "user_anon" group on connect (unused by
+# per-user notifications; enabling it makes that group's size O(connections)).
+NOTIFICATIONS_JOIN_ANON_GROUP = False
+
+# Waste-log pipeline: challenge progress, badges and activity for a waste log
+# are applied from WasteLogEvent rows by `python manage.py process_waste_events
+# --loop`. PROCESS_ON_COMMIT instead processes the request's own event in the
+# request thread right after commit (for tests and local runs without the worker).
+# Events failing MAX_ATTEMPTS times are marked failed and logged.
+WASTE_EVENTS_PROCESS_ON_COMMIT = False
+WASTE_EVENTS_BATCH_SIZE = 500
+WASTE_EVENTS_MAX_ATTEMPTS = 5
+WASTE_EVENTS_BACKOFF_BASE = 5
+# Maximum rows accepted by POST /api/waste/bulk/ in one request.
+WASTE_BULK_MAX_ENTRIES = 500
+# System statistics (/api/statistics/): the snapshot is cached for this many
+# seconds (dropped after each reconciliation); counters are spread over N slots to avoid a hot row, and
+# `python manage.py reconcile_system_stats --loop` resets them from the tables
+# every RECONCILE_INTERVAL seconds.
+STATISTICS_CACHE_TTL = 30
+STATISTICS_COUNTER_SLOTS = 8
+STATISTICS_RECONCILE_INTERVAL = 900
+STATISTICS_CHALLENGE_LIMIT = 50
+# Longest range, in days, served by GET /api/waste/series/ (filled by
+# `python manage.py build_waste_rollups --loop`).
+WASTE_SERIES_MAX_DAYS = 1830
+# Rollups only fold waste rows whose id was seen this many seconds ago, so rows
+# from transactions still in flight are not skipped; keep it above the longest
+# waste-logging transaction.
+WASTE_ROLLUP_SAFETY_LAG = 60
+# Anonymous GET /api/challenges/ pages are cached for this many seconds
+# (invalidated on challenge changes). `python manage.py sweep_challenges --loop`
+# clears Challenge.is_active once deadlines pass.
+CHALLENGE_LIST_CACHE_TTL = 15
+# GET /api/challenges/<id>/progress/ snapshots are cached per challenge for
+# this many seconds (dropped on progress, participant and challenge changes).
+CHALLENGE_PROGRESS_CACHE_TTL = 60
+# Cache-Control max-age for the recycling center endpoints; ETags change when
+# the catalog is reloaded.
+RECYCLING_CENTERS_MAX_AGE = 300
+# Limits for GET /api/recycling-centers/nearest/.
+RECYCLING_NEAREST_MAX_RADIUS_KM = 1000
+RECYCLING_NEAREST_MAX_K = 50
+# Workers check the recycling catalog version this often (seconds) and drop
+# their cached query results after `python manage.py load_recycling_centers`.
+RECYCLING_CATALOG_CHECK_INTERVAL = 30
+# Distinct recycling center queries (city, district, waste types) whose
+# encoded responses each worker keeps.
+RECYCLING_QUERY_CACHE_SIZE = 2048
@@ -29,16 +29,15 @@ const getWsUrl = () => {
 export const useNotifications = () => {
     const { token, isAuthenticated } = useAuth();
     const [notifications, setNotifications] = useState([]);
+    // The list only holds the newest page, so the unread total comes from the
+    // server's counter (the unread_count action and events), not the list.
+    const [unreadCount, setUnreadCount] = useState(0);
     const [isConnected, setIsConnected] = useState(false);
     const wsRef = useRef(null);
     const reconnectTimeoutRef = useRef(null);
     // Initialize with the correct URL immediately
     const [wsUrl] = useState(getWsUrl);
 
-    // Derive unread count from notifications list to ensure it's always in sync
-    // This prevents "ghost" counts or double counting duplicates
-    const unreadCount = notifications.filter(n => !n.read).length;
-
     const connect = useCallback(() => {
         if (!token || !isAuthenticated) return;
 
@@ -64,8 +63,12 @@ export const useNotifications = () => {
                 const data = JSON.parse(event.data);
 
                 if (data.type === 'auth_success') {
-                    // Once authenticated, fetch notifications
+                    // Once authenticated, fetch notifications and the unread total
                     ws.send(JSON.stringify({ action: "fetch_notifications" }));
+                    ws.send(JSON.stringify({ action: "unread_count" }));
+                } else if (data.type === 'unread_count') {
+                    // Reply to unread_count, or pushed after mark-read / mark-all-read
+                    setUnreadCount(data.count);
                 } else if (data.notifications) {
                     // Initial fetch response
                     setNotifications(data.notifications);
@@ -76,6 +79,8 @@ export const useNotifications = () => {
                         if (prev.some(n => n.id === data.id)) return prev;
                         return [data, ...prev];
                     });
+                    // Re-read the total rather than incrementing, so duplicates can't inflate it
+                    ws.send(JSON.stringify({ action: "unread_count" }));
 
                     // toast.info("You have a new notification");
                 }
@@ -114,7 +119,10 @@ export const useNotifications = () => {
     }, [connect]);
 
     const markAsRead = useCallback(async (notificationId) => {
-        // Optimistic update
+        // Optimistic update; the server pushes the exact total afterwards
+        if (notifications.some(n => n.id === notificationId && !n.read)) {
+            setUnreadCount(count => Math.max(count - 1, 0));
+        }
         setNotifications(prev => prev.map(n =>
             n.id === notificationId ? { ...n, read: true } : n
         ));
@@ -125,9 +133,10 @@ export const useNotifications = () => {
             console.error('Failed to mark notification as read:', error);
             // Revert on failure if strictly necessary, but usually acceptable to keep optimistic state
         }
-    }, []);
+    }, [notifications]);
 
     const markAllAsRead = useCallback(async () => {
+        setUnreadCount(0);
         setNotifications(prev => prev.map(n => ({ ...n, read: true })));
 
         try {